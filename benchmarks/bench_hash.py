@@ -0,0 +1,244 @@
+"""
+Measure hashing throughput, and compare it against a saved baseline.
+
+Covers `hash_file`, `hash_binary_file`, `bytes_iterator_hash`, and the
+`hash-md5` command, run in a new process, for each file size. Test files are
+generated once, in the data directory, and reused. Every run after the first
+reads from the page cache, so results track the code, not the storage.
+
+Each case is timed `--repeat` times, and the best run is kept. Small files are
+hashed in a loop, until a run takes at least `--min-time` seconds.
+
+With `--baseline`, a case fails if its throughput is more than `--threshold`
+below the baseline, and the exit status is 1. A missing baseline is written
+from this run. Baselines are only comparable on the same machine.
+
+Usage:
+    python benchmarks/bench_hash.py [--sizes 1K 1M 1G] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.2] [--update-baseline]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+from pbs_parse.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_parse.snippets.hash.file_hash import hash_binary_file, hash_file
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = ["1K", "64K", "1M", "64M", "1G", "4G"]
+SIZE_SUFFIXES = {"K": 2**10, "M": 2**20, "G": 2**30}
+PATTERN_SIZE = 2**20
+ITERATOR_BLOCK_SIZE = 2**16
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper()
+    if value[-1:] in SIZE_SUFFIXES:
+        return int(value[:-1]) * SIZE_SUFFIXES[value[-1]]
+    return int(value)
+
+
+def bench_file(data_dir: Path, size: int) -> Path:
+    """Get a file of `size` pseudo random bytes, writing it if needed."""
+    file_path = data_dir / f"bench_{size}.bin"
+    if file_path.is_file() and file_path.stat().st_size == size:
+        return file_path
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # A repeated block is enough, the hashes don't look for patterns.
+    pattern = random.Random(size).randbytes(PATTERN_SIZE)
+    temp_path = file_path.with_suffix(".tmp")
+    with open(temp_path, "wb") as file_out:
+        remaining = size
+        while remaining:
+            remaining -= file_out.write(pattern[: min(remaining, PATTERN_SIZE)])
+    os.replace(temp_path, file_path)
+    return file_path
+
+
+def run_hash_file(file_path: Path, algorithm: str) -> None:
+    hash_file(file_path, hashlib.new(algorithm))
+
+
+def run_hash_binary_file(file_path: Path, algorithm: str) -> None:
+    with open(file_path, "rb") as file_handle:
+        hash_binary_file(file_handle, hashlib.new(algorithm))
+
+
+def run_bytes_iterator_hash(file_path: Path, algorithm: str) -> None:
+    with open(file_path, "rb") as file_handle:
+        blocks = iter(partial(file_handle.read, ITERATOR_BLOCK_SIZE), b"")
+        bytes_iterator_hash(blocks, hashlib.new(algorithm))
+
+
+def run_cli_hash_md5(file_path: Path, algorithm: str) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "pbs_parse.cli.main_typer", "hash-md5", str(file_path)],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+CASES: dict[str, Callable[[Path, str], None]] = {
+    "hash_file": run_hash_file,
+    "hash_binary_file": run_hash_binary_file,
+    "bytes_iterator_hash": run_bytes_iterator_hash,
+    "cli_hash_md5": run_cli_hash_md5,
+}
+
+
+def time_case(
+    run: Callable[[], None], repeat: int, min_time: float
+) -> tuple[float, int]:
+    """
+    Time a case, looping it until a run takes `min_time`.
+
+    Returns:
+        The best time for one call, in seconds, and the calls in each run.
+    """
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = perf_counter()
+        for _ in range(number):
+            run()
+        best = min(best, perf_counter() - start)
+    return best / number, number
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+    results = []
+    print(f"{'case':<20} {'size':>14} {'calls':>7} {'ms/call':>10} {'MB/s':>10}")
+    for size in map(parse_size, args.sizes):
+        file_path = bench_file(args.data_dir, size)
+        for name in args.cases:
+            run = partial(CASES[name], file_path, args.algo)
+            # One warm up run, to read the file into the page cache.
+            run()
+            seconds, number = time_case(run, args.repeat, args.min_time)
+            mb_per_second = size / 1e6 / seconds
+            results.append(
+                {
+                    "case": name,
+                    "size": size,
+                    "calls": number,
+                    "repeat": args.repeat,
+                    "seconds": seconds,
+                    "mb_per_second": mb_per_second,
+                }
+            )
+            print(
+                f"{name:<20} {size:>14,} {number:>7} {seconds * 1e3:>10,.3f}"
+                f" {mb_per_second:>10,.1f}"
+            )
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "algorithm": args.algo,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Find the cases that are slower than the baseline by more than `threshold`.
+
+    Returns:
+        A description of each regression.
+    """
+    expected = {
+        (result["case"], result["size"]): result["mb_per_second"]
+        for result in baseline["results"]
+    }
+    if current.get("algorithm") != baseline.get("algorithm"):
+        return [
+            f"Baseline algorithm {baseline.get('algorithm')!r} "
+            f"does not match {current.get('algorithm')!r}."
+        ]
+    print(f"{'case':<20} {'size':>14} {'baseline':>10} {'MB/s':>10} {'change':>8}")
+    regressions = []
+    for result in current["results"]:
+        key = (result["case"], result["size"])
+        if key not in expected:
+            continue
+        change = result["mb_per_second"] / expected[key] - 1
+        flag = " FAIL" if change < -threshold else ""
+        print(
+            f"{result['case']:<20} {result['size']:>14,} {expected[key]:>10,.2f}"
+            f" {result['mb_per_second']:>10,.2f} {change:>+8.1%}{flag}"
+        )
+        if flag:
+            regressions.append(
+                f"{result['case']} at {result['size']:,} bytes: {change:+.1%}"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument(
+        "--algo", default="md5", help="The algorithm, hash-md5 always uses md5."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--data-dir", type=Path, default=Path(".bench", "data"))
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    parser.add_argument("--baseline", type=Path, help="Compare against these results.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="The largest allowed drop in throughput, as a fraction.",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Replace the baseline with this run, instead of comparing.",
+    )
+    args = parser.parse_args()
+    current = run_benchmarks(args)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(current, indent=2))
+        print(f"Results written to {args.output}")
+    if args.baseline is None:
+        return 0
+    if args.update_baseline or not args.baseline.is_file():
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    regressions = compare(
+        current, json.loads(args.baseline.read_text()), args.threshold
+    )
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
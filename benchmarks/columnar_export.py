@@ -0,0 +1,77 @@
+"""
+Compare the size, write, and read speed of columnar exports and JSON lines.
+
+Pairings are parsed once, before timing. Writing JSON lines includes converting
+each pairing to JSON, reading them includes `json.loads` of every line.
+Requires pyarrow.
+
+Usage:
+    python benchmarks/columnar_export.py [--pairings 100000] [--batch-size 10000]
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from synthetic_bid_package import write_synthetic_bid_package
+
+from pbs_parse.bid_package.export import export_pairings, read_tables
+from pbs_parse.bid_package.parser import parse_bid_package_file
+from pbs_parse.bid_package.serialize import pairing_to_json
+
+
+def directory_size(directory: Path) -> int:
+    return sum(file_path.stat().st_size for file_path in directory.iterdir())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pairings", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        file_path = temp_path / "bid_package.txt"
+        size = write_synthetic_bid_package(file_path, args.pairings)
+        pairings = list(parse_bid_package_file(file_path))
+        legs = sum(
+            len(duty.legs) for pairing in pairings for duty in pairing.duty_periods
+        )
+        print(f"{size:,} bytes, {len(pairings):,} pairings, {legs:,} legs")
+        print(f"{'format':<8} {'bytes':>14} {'write s':>9} {'read s':>9}")
+
+        json_path = temp_path / "pairings.jsonl"
+        start = perf_counter()
+        with open(json_path, "w", encoding="utf-8") as file_out:
+            for pairing in pairings:
+                file_out.write(pairing_to_json(pairing) + "\n")
+        write_seconds = perf_counter() - start
+        start = perf_counter()
+        with open(json_path, encoding="utf-8") as file_in:
+            records = [json.loads(line) for line in file_in]
+        read_seconds = perf_counter() - start
+        assert len(records) == len(pairings)
+        print(
+            f"{'jsonl':<8} {json_path.stat().st_size:>14,} "
+            f"{write_seconds:>9.3f} {read_seconds:>9.3f}"
+        )
+
+        for file_format in ("parquet", "arrow"):
+            directory = temp_path / file_format
+            start = perf_counter()
+            export_pairings(pairings, directory, file_format, args.batch_size)
+            write_seconds = perf_counter() - start
+            start = perf_counter()
+            tables = read_tables(directory, file_format)
+            read_seconds = perf_counter() - start
+            assert tables["legs"].num_rows == legs
+            print(
+                f"{file_format:<8} {directory_size(directory):>14,} "
+                f"{write_seconds:>9.3f} {read_seconds:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare the memory used to hold a parsed bid package, as dicts, as slots
+dataclasses, and as columns.
+
+Usage:
+    python benchmarks/memory_models.py [--pairings 20000]
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable
+
+from synthetic_bid_package import write_synthetic_bid_package
+
+from pbs_parse.bid_package.columnar import ColumnarPairings
+from pbs_parse.bid_package.parser import parse_bid_package_file
+
+
+def as_dicts(file_path: Path) -> list[dict[str, Any]]:
+    return [asdict(pairing) for pairing in parse_bid_package_file(file_path)]
+
+
+def as_dataclasses(file_path: Path) -> list:
+    return list(parse_bid_package_file(file_path))
+
+
+def as_columns(file_path: Path) -> ColumnarPairings:
+    return ColumnarPairings(parse_bid_package_file(file_path))
+
+
+def retained_bytes(load: Callable[[Path], Any], file_path: Path) -> int:
+    """The memory still allocated after `load` returns, while its result lives."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = load(file_path)
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pairings", type=int, default=20000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "bid_package.txt"
+        size = write_synthetic_bid_package(file_path, args.pairings)
+        columns = as_columns(file_path)
+        legs = len(columns.legs)
+        print(f"{args.pairings:,} pairings, {legs:,} legs, {size:,} bytes of text")
+        print(f"{'model':<12} {'MB':>10} {'bytes/leg':>10}")
+        for name, load in [
+            ("dicts", as_dicts),
+            ("dataclasses", as_dataclasses),
+            ("columns", as_columns),
+        ]:
+            retained = retained_bytes(load, file_path)
+            print(f"{name:<12} {retained / 1e6:>10.1f} {retained / legs:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measure the speedup of parsing a bid package to JSON with worker processes.
+
+Usage:
+    python benchmarks/parallel_parse.py [--pairings 100000] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from synthetic_bid_package import write_synthetic_bid_package
+
+from pbs_parse.bid_package.parallel import map_pairings_parallel
+from pbs_parse.bid_package.serialize import pairing_to_json
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pairings", type=int, default=100000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / "bid_package.txt"
+        size = write_synthetic_bid_package(file_path, args.pairings)
+        print(f"{size:,} bytes, {os.cpu_count()} CPUs")
+        print(f"{'jobs':>4} {'seconds':>10} {'MB/s':>10} {'speedup':>8}")
+        serial_seconds = None
+        expected = None
+        for jobs in args.jobs:
+            start = perf_counter()
+            lines = list(map_pairings_parallel(file_path, pairing_to_json, jobs=jobs))
+            seconds = perf_counter() - start
+            if expected is None:
+                expected, serial_seconds = lines, seconds
+            assert lines == expected, f"Output with {jobs} jobs differs."
+            print(
+                f"{jobs:>4} {seconds:>10.3f} {size / 1e6 / seconds:>10.1f}"
+                f" {serial_seconds / seconds:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Write large, valid, bid packages for benchmarks."""
+
+import random
+from pathlib import Path
+from typing import Iterator
+
+STATIONS = [
+    "ATL", "BOS", "BWI", "CLT", "DCA", "DEN", "DFW", "DTW", "EWR", "FLL",
+    "IAD", "IAH", "JFK", "LAS", "LAX", "LGA", "MCO", "MIA", "MSP", "ORD",
+    "PHL", "PHX", "SAN", "SEA", "SFO", "SLC", "TPA",
+]  # fmt: skip
+EQUIPMENT = ["320", "321", "738", "73H", "E75", "7M8"]
+MONTH = "NOV"
+
+
+def _duration(minutes: int) -> str:
+    return f"{minutes // 60}:{minutes % 60:02}"
+
+
+def _time(minutes: int) -> str:
+    minutes %= 24 * 60
+    return f"{minutes // 60:02}{minutes % 60:02}"
+
+
+def synthetic_bid_package_lines(pairings: int, seed: int = 0) -> Iterator[str]:
+    """
+    Make the lines of a bid package, with `pairings` random pairings.
+
+    The same seed makes the same package.
+    """
+    rng = random.Random(seed)
+    base = "BOS"
+    yield "# Synthetic PBS bid package\n"
+    for number in range(1000, 1000 + pairings):
+        equipment = rng.choice(EQUIPMENT)
+        days = rng.randint(1, 4)
+        operations = rng.randint(1, 8)
+        dates = sorted(rng.sample(range(1, 31), operations))
+        yield "\n"
+        yield f"SEQ {number} OPS {operations} BASE {base} EQP {equipment}\n"
+        yield "DATES " + " ".join(f"{day:02}{MONTH}" for day in dates) + "\n"
+        station = base
+        total_block = 0
+        for day in range(1, days + 1):
+            report = rng.randint(5 * 60, 14 * 60)
+            yield f"RPT {_time(report)}\n"
+            departure = report + 60
+            for leg in range(rng.randint(1, 4)):
+                last = day == days and leg == 3
+                arrival_station = base if last else rng.choice(STATIONS)
+                block = rng.randint(45, 330)
+                total_block += block
+                deadhead = "DH " if rng.random() < 0.05 else ""
+                yield (
+                    f"LEG {day} {deadhead}{rng.randint(1, 9999)} {station}"
+                    f" {_time(departure)} {arrival_station}"
+                    f" {_time(departure + block)} {equipment} {_duration(block)}\n"
+                )
+                station = arrival_station
+                departure += block + rng.randint(40, 90)
+            yield f"RLS {_time(departure - 25)}\n"
+            if day < days:
+                yield f"LO {station} {_duration(rng.randint(10 * 60, 30 * 60))}\n"
+        credit = max(total_block, days * 5 * 60)
+        tafb = days * 24 * 60 - rng.randint(0, 12 * 60)
+        yield f"TTL {_duration(total_block)} {_duration(credit)} {_duration(tafb)}\n"
+
+
+def write_synthetic_bid_package(file_path: Path, pairings: int, seed: int = 0) -> int:
+    """Write a synthetic bid package, and return its size in bytes."""
+    with open(file_path, "w", encoding="utf-8") as file_out:
+        file_out.writelines(synthetic_bid_package_lines(pairings, seed))
+    return file_path.stat().st_size
@@ -1,5 +1,6 @@
 import os
 import shutil
+from datetime import datetime
 from pathlib import Path
 
 import nox
@@ -36,6 +37,31 @@ def tests(session: nox.Session):
     session.run("pytest")
 
 
+@nox.session(default=False)
+def bench(session: nox.Session) -> None:
+    """
+    Run the hashing benchmarks, and fail if throughput dropped below the baseline.
+
+    Results are saved in .bench/, the first run saves .bench/baseline.json.
+    Arguments are passed to benchmarks/bench_hash.py, e.g.
+    `nox -s bench -- --sizes 1K 1M 64M` or `nox -s bench -- --update-baseline`.
+    """
+    session.install(".")
+    bench_dir = Path(".bench")
+    output = bench_dir / f"bench-{datetime.now():%Y%m%dT%H%M%S}.json"
+    session.run(
+        "python",
+        "benchmarks/bench_hash.py",
+        "--data-dir",
+        str(bench_dir / "data"),
+        "--output",
+        str(output),
+        "--baseline",
+        str(bench_dir / "baseline.json"),
+        *session.posargs,
+    )
+
+
 # It's a good idea to keep your dev session out of the default list
 # so it's not run twice accidentally
 @nox.session(default=False)
@@ -0,0 +1 @@
+"""Parse PBS (preferential bidding system) bid packages."""
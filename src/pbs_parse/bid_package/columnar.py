@@ -0,0 +1,256 @@
+"""
+Keep a whole bid package in memory, with each field in a typed array.
+
+Objects for millions of legs take gigabytes, columns of machine integers take a
+few bytes per field. Strings, e.g. stations, are stored once in a
+:py:class:`StringTable`, and columns hold their codes.
+
+Rows of each table are in parse order. Duty periods and legs have a column with
+the row of their parent, so the children of a row are a contiguous range that
+can be found by bisecting the parent column.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, fields
+from functools import partial
+from typing import Iterable, Iterator
+
+from pbs_parse.bid_package.models import DutyPeriod, Leg, Pairing
+
+NO_VALUE = -1
+
+
+def _column(typecode: str):
+    return field(default_factory=partial(array, typecode))
+
+
+class StringTable:
+    """Stores each distinct string once, and gives it an integer code."""
+
+    __slots__ = ("strings", "_codes")
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, code: int) -> str:
+        return self.strings[code]
+
+    def code(self, value: str) -> int:
+        """Get the code for a string, adding it if needed."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+@dataclass(slots=True)
+class _Columns:
+    def __len__(self) -> int:
+        return len(getattr(self, fields(self)[0].name))
+
+    def columns(self) -> dict[str, array]:
+        """The columns, by field name."""
+        return {column.name: getattr(self, column.name) for column in fields(self)}
+
+    def nbytes(self) -> int:
+        """The size of the column data, in bytes."""
+        return sum(column.itemsize * len(column) for column in self.columns().values())
+
+
+@dataclass(slots=True)
+class PairingColumns(_Columns):
+    number: array = _column("I")
+    operations: array = _column("H")
+    base: array = _column("I")
+    equipment: array = _column("I")
+    block: array = _column("I")
+    credit: array = _column("I")
+    tafb: array = _column("I")
+    line_number: array = _column("I")
+
+
+@dataclass(slots=True)
+class DateColumns(_Columns):
+    pairing: array = _column("I")
+    date: array = _column("I")
+
+
+@dataclass(slots=True)
+class DutyPeriodColumns(_Columns):
+    pairing: array = _column("I")
+    report: array = _column("H")
+    release: array = _column("H")
+    layover_station: array = _column("i")
+    layover_rest: array = _column("i")
+
+
+@dataclass(slots=True)
+class LegColumns(_Columns):
+    duty_period: array = _column("I")
+    day: array = _column("B")
+    flight: array = _column("I")
+    departure_station: array = _column("I")
+    departure_time: array = _column("H")
+    arrival_station: array = _column("I")
+    arrival_time: array = _column("H")
+    equipment: array = _column("I")
+    block: array = _column("H")
+    deadhead: array = _column("B")
+
+
+class ColumnarPairings:
+    """
+    Pairings stored as columns, with the same data as a list of
+    :py:class:`~pbs_parse.bid_package.models.Pairing`.
+
+    Indexing, or iterating, makes :py:class:`Pairing` objects as needed.
+
+    Args:
+        pairings: Pairings to add. Defaults to ().
+    """
+
+    def __init__(self, pairings: Iterable[Pairing] = ()):
+        self.strings = StringTable()
+        self.pairings = PairingColumns()
+        self.dates = DateColumns()
+        self.duty_periods = DutyPeriodColumns()
+        self.legs = LegColumns()
+        self.extend(pairings)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(pairings={len(self.pairings)}, "
+            f"duty_periods={len(self.duty_periods)}, legs={len(self.legs)})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.pairings)
+
+    def __iter__(self) -> Iterator[Pairing]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> Pairing:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pairing index out of range")
+        return self._pairing(index)
+
+    def nbytes(self) -> int:
+        """The size of the column data, in bytes, not counting the strings."""
+        return sum(
+            table.nbytes()
+            for table in (self.pairings, self.dates, self.duty_periods, self.legs)
+        )
+
+    def append(self, pairing: Pairing) -> None:
+        code = self.strings.code
+        pairing_row = len(self.pairings)
+        columns = self.pairings
+        columns.number.append(code(pairing.number))
+        columns.operations.append(pairing.operations)
+        columns.base.append(code(pairing.base))
+        columns.equipment.append(code(pairing.equipment))
+        columns.block.append(pairing.block)
+        columns.credit.append(pairing.credit)
+        columns.tafb.append(pairing.tafb)
+        columns.line_number.append(pairing.line_number)
+        for date in pairing.dates:
+            self.dates.pairing.append(pairing_row)
+            self.dates.date.append(code(date))
+        for duty in pairing.duty_periods:
+            self._append_duty_period(duty, pairing_row)
+
+    def extend(self, pairings: Iterable[Pairing]) -> None:
+        for pairing in pairings:
+            self.append(pairing)
+
+    def _append_duty_period(self, duty: DutyPeriod, pairing_row: int) -> None:
+        code = self.strings.code
+        duty_row = len(self.duty_periods)
+        columns = self.duty_periods
+        columns.pairing.append(pairing_row)
+        columns.report.append(duty.report)
+        columns.release.append(duty.release)
+        columns.layover_station.append(
+            NO_VALUE if duty.layover_station is None else code(duty.layover_station)
+        )
+        columns.layover_rest.append(
+            NO_VALUE if duty.layover_rest is None else duty.layover_rest
+        )
+        legs = self.legs
+        for leg in duty.legs:
+            legs.duty_period.append(duty_row)
+            legs.day.append(leg.day)
+            legs.flight.append(code(leg.flight))
+            legs.departure_station.append(code(leg.departure_station))
+            legs.departure_time.append(leg.departure_time)
+            legs.arrival_station.append(code(leg.arrival_station))
+            legs.arrival_time.append(leg.arrival_time)
+            legs.equipment.append(code(leg.equipment))
+            legs.block.append(leg.block)
+            legs.deadhead.append(leg.deadhead)
+
+    def _pairing(self, row: int) -> Pairing:
+        strings = self.strings
+        columns = self.pairings
+        dates = range(
+            bisect_left(self.dates.pairing, row), bisect_right(self.dates.pairing, row)
+        )
+        duties = range(
+            bisect_left(self.duty_periods.pairing, row),
+            bisect_right(self.duty_periods.pairing, row),
+        )
+        return Pairing(
+            number=strings[columns.number[row]],
+            operations=columns.operations[row],
+            base=strings[columns.base[row]],
+            equipment=strings[columns.equipment[row]],
+            dates=[strings[self.dates.date[date_row]] for date_row in dates],
+            duty_periods=[self._duty_period(duty_row) for duty_row in duties],
+            block=columns.block[row],
+            credit=columns.credit[row],
+            tafb=columns.tafb[row],
+            line_number=columns.line_number[row],
+        )
+
+    def _duty_period(self, row: int) -> DutyPeriod:
+        strings = self.strings
+        columns = self.duty_periods
+        legs = range(
+            bisect_left(self.legs.duty_period, row),
+            bisect_right(self.legs.duty_period, row),
+        )
+        layover_station = columns.layover_station[row]
+        layover_rest = columns.layover_rest[row]
+        return DutyPeriod(
+            report=columns.report[row],
+            release=columns.release[row],
+            legs=[self._leg(leg_row) for leg_row in legs],
+            layover_station=(
+                None if layover_station == NO_VALUE else strings[layover_station]
+            ),
+            layover_rest=None if layover_rest == NO_VALUE else layover_rest,
+        )
+
+    def _leg(self, row: int) -> Leg:
+        strings = self.strings
+        legs = self.legs
+        return Leg(
+            day=legs.day[row],
+            flight=strings[legs.flight[row]],
+            departure_station=strings[legs.departure_station[row]],
+            departure_time=legs.departure_time[row],
+            arrival_station=strings[legs.arrival_station[row]],
+            arrival_time=legs.arrival_time[row],
+            equipment=strings[legs.equipment[row]],
+            block=legs.block[row],
+            deadhead=bool(legs.deadhead[row]),
+        )
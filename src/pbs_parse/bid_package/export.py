@@ -0,0 +1,327 @@
+"""
+Export parsed pairings to columnar files, for loading into dataframes.
+
+Each table, pairings, dates, duty periods, and legs, is written to its own
+Parquet, or Arrow IPC, file in the output directory. Rows have an id, and child
+rows have the ids of their parents, so the tables can be joined::
+
+    legs.join(duty_periods, "duty_period_id").join(pairings, "pairing_id")
+
+Pairings are collected in a
+:py:class:`~pbs_parse.bid_package.columnar.ColumnarPairings`, and written a
+batch at a time, so memory use depends on the batch size, not on the size of
+the package.
+
+Requires :py:mod:`pyarrow`, install with `pip install pbs-parse[arrow]`.
+"""
+
+import os
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Literal
+
+from pbs_parse.bid_package.columnar import NO_VALUE, ColumnarPairings
+from pbs_parse.bid_package.models import Pairing
+
+if TYPE_CHECKING:
+    import pyarrow
+
+ExportFormat = Literal["parquet", "arrow"]
+
+EXPORT_FORMATS = ("parquet", "arrow")
+TABLES = ("pairings", "dates", "duty_periods", "legs")
+DEFAULT_BATCH_SIZE = 10000
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "Columnar export requires pyarrow, install with "
+            "`pip install pbs-parse[arrow]`."
+        ) from error
+    return pyarrow
+
+
+def _check_format(file_format: str) -> None:
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Export format must be one of {', '.join(EXPORT_FORMATS)}, "
+            f"got {file_format!r}."
+        )
+
+
+def table_path(directory: Path, table: str, file_format: ExportFormat) -> Path:
+    """The file for one table, e.g. `legs.parquet`."""
+    return directory / f"{table}.{file_format}"
+
+
+class _Batch:
+    """Converts the columns of a batch to Arrow arrays, with ids offset by `ids`."""
+
+    def __init__(self, pa: Any, batch: ColumnarPairings, ids: dict[str, int]):
+        self.pa = pa
+        self.batch = batch
+        self.ids = ids
+        self.strings = pa.array(batch.strings.strings, pa.string())
+
+    def integers(self, column: array, offset: int = 0) -> "pyarrow.Array":
+        pa = self.pa
+        arrow_type = {
+            "B": pa.uint8(),
+            "H": pa.uint16(),
+            "I": pa.uint32(),
+            "i": pa.int32(),
+        }[column.typecode]
+        values = pa.Array.from_buffers(
+            arrow_type, len(column), [None, pa.py_buffer(column)]
+        )
+        if offset:
+            values = pa.compute.add(values, pa.scalar(offset, arrow_type))
+        return values
+
+    def optional(self, column: array) -> "pyarrow.Array":
+        values = self.integers(column)
+        return self.pa.compute.if_else(
+            self.pa.compute.equal(values, NO_VALUE),
+            self.pa.scalar(None, values.type),
+            values,
+        )
+
+    def text(self, codes: "array | pyarrow.Array") -> "pyarrow.Array":
+        if isinstance(codes, array):
+            codes = self.integers(codes)
+        return self.strings.take(codes)
+
+    def row_ids(self, table: str, count: int) -> "pyarrow.Array":
+        start = self.ids[table]
+        return self.pa.array(range(start, start + count), self.pa.uint32())
+
+    def tables(self) -> dict[str, "pyarrow.Table"]:
+        pa, batch, ids = self.pa, self.batch, self.ids
+        pairings = batch.pairings
+        dates = batch.dates
+        duty_periods = batch.duty_periods
+        legs = batch.legs
+        duty_period_pairing = self.integers(duty_periods.pairing, ids["pairings"])
+        return {
+            "pairings": pa.table(
+                {
+                    "pairing_id": self.row_ids("pairings", len(pairings)),
+                    "number": self.text(pairings.number),
+                    "operations": self.integers(pairings.operations),
+                    "base": self.text(pairings.base),
+                    "equipment": self.text(pairings.equipment),
+                    "block": self.integers(pairings.block),
+                    "credit": self.integers(pairings.credit),
+                    "tafb": self.integers(pairings.tafb),
+                    "line_number": self.integers(pairings.line_number),
+                }
+            ),
+            "dates": pa.table(
+                {
+                    "pairing_id": self.integers(dates.pairing, ids["pairings"]),
+                    "date": self.text(dates.date),
+                }
+            ),
+            "duty_periods": pa.table(
+                {
+                    "duty_period_id": self.row_ids("duty_periods", len(duty_periods)),
+                    "pairing_id": duty_period_pairing,
+                    "report": self.integers(duty_periods.report),
+                    "release": self.integers(duty_periods.release),
+                    "layover_station": self.text(
+                        self.optional(duty_periods.layover_station)
+                    ),
+                    "layover_rest": self.optional(duty_periods.layover_rest),
+                }
+            ),
+            "legs": pa.table(
+                {
+                    "leg_id": self.row_ids("legs", len(legs)),
+                    "duty_period_id": self.integers(
+                        legs.duty_period, ids["duty_periods"]
+                    ),
+                    "pairing_id": duty_period_pairing.take(
+                        self.integers(legs.duty_period)
+                    ),
+                    "day": self.integers(legs.day),
+                    "flight": self.text(legs.flight),
+                    "departure_station": self.text(legs.departure_station),
+                    "departure_time": self.integers(legs.departure_time),
+                    "arrival_station": self.text(legs.arrival_station),
+                    "arrival_time": self.integers(legs.arrival_time),
+                    "equipment": self.text(legs.equipment),
+                    "block": self.integers(legs.block),
+                    "deadhead": self.integers(legs.deadhead).cast(pa.bool_()),
+                }
+            ),
+        }
+
+
+class ColumnarWriter:
+    """
+    Write batches of pairings to a columnar file for each table.
+
+    Use as a context manager, the files are finished on exit, or removed if an
+    exception was raised. Files are written under temporary names, and renamed
+    when they are finished, so a failed export leaves no partial tables. Every
+    table file is written, even with no pairings.
+
+    Args:
+        directory: The output directory. Created as needed.
+        file_format: `parquet`, or `arrow` for Arrow IPC files. Defaults to
+            `parquet`.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the format is not supported.
+    """
+
+    def __init__(self, directory: Path, file_format: ExportFormat = "parquet"):
+        _check_format(file_format)
+        self.pa = _import_pyarrow()
+        self.directory = directory
+        self.file_format = file_format
+        self.rows = dict.fromkeys(TABLES, 0)
+        self._writers: dict[str, Any] = {}
+        self._sinks: list[Any] = []
+        self._temp_paths: dict[Path, Path] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(directory={self.directory!r}, "
+            f"file_format={self.file_format!r})"
+        )
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_batch(self, pairings: Iterable[Pairing]) -> None:
+        """Write one batch of pairings to the tables."""
+        batch = ColumnarPairings(pairings)
+        tables = _Batch(self.pa, batch, self.rows).tables()
+        for name, table in tables.items():
+            self._writer(name, table.schema).write_table(table)
+            self.rows[name] += table.num_rows
+
+    def close(self) -> None:
+        """Finish the files, writing empty tables if nothing was written."""
+        if not self._writers:
+            self.write_batch(())
+        for writer in self._writers.values():
+            writer.close()
+        for sink in self._sinks:
+            sink.close()
+        self._writers.clear()
+        self._sinks.clear()
+        for temp_path, file_path in self._temp_paths.items():
+            os.replace(temp_path, file_path)
+        self._temp_paths.clear()
+
+    def abort(self) -> None:
+        """Remove the unfinished files, keeping any earlier export."""
+        # The files are removed anyway, so errors closing them don't matter.
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+        for sink in self._sinks:
+            try:
+                sink.close()
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+        self._writers.clear()
+        self._sinks.clear()
+        for temp_path in self._temp_paths:
+            temp_path.unlink(missing_ok=True)
+        self._temp_paths.clear()
+
+    def _writer(self, name: str, schema: "pyarrow.Schema") -> Any:
+        writer = self._writers.get(name)
+        if writer is not None:
+            return writer
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_path = table_path(self.directory, name, self.file_format)
+        temp_path = file_path.with_name(f".tmp-{file_path.name}")
+        self._temp_paths[temp_path] = file_path
+        file_path = temp_path
+        if self.file_format == "parquet":
+            writer = self.pa.parquet.ParquetWriter(file_path, schema)
+        else:
+            sink = self.pa.OSFile(str(file_path), "wb")
+            self._sinks.append(sink)
+            writer = self.pa.ipc.new_file(sink, schema)
+        self._writers[name] = writer
+        return writer
+
+
+def export_pairings(
+    pairings: Iterable[Pairing],
+    directory: Path,
+    file_format: ExportFormat = "parquet",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, int]:
+    """
+    Write pairings to a columnar file for each table, a batch at a time.
+
+    Args:
+        pairings: The pairings, e.g. from
+            :py:func:`~pbs_parse.bid_package.parser.parse_bid_package_file`.
+        directory: The output directory. Created as needed.
+        file_format: `parquet`, or `arrow` for Arrow IPC files. Defaults to
+            `parquet`.
+        batch_size: The number of pairings in each batch. Defaults to 10000.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the format is not supported.
+
+    Returns:
+        The number of rows written to each table.
+    """
+    batch: list[Pairing] = []
+    with ColumnarWriter(directory, file_format) as writer:
+        for pairing in pairings:
+            batch.append(pairing)
+            if len(batch) >= batch_size:
+                writer.write_batch(batch)
+                batch = []
+        if batch:
+            writer.write_batch(batch)
+    return writer.rows
+
+
+def read_tables(
+    directory: Path, file_format: ExportFormat = "parquet"
+) -> dict[str, "pyarrow.Table"]:
+    """
+    Read the tables written by :py:func:`export_pairings`.
+
+    Arrow IPC files are memory mapped, so reading them copies no data.
+
+    Returns:
+        Each table, by name.
+    """
+    _check_format(file_format)
+    pa = _import_pyarrow()
+    tables = {}
+    for name in TABLES:
+        file_path = table_path(directory, name, file_format)
+        if file_format == "parquet":
+            tables[name] = pa.parquet.read_table(file_path)
+        else:
+            with pa.memory_map(str(file_path)) as source:
+                tables[name] = pa.ipc.open_file(source).read_all()
+    return tables
@@ -0,0 +1,395 @@
+"""
+A sidecar index of a bid package, to read one pairing without parsing the file.
+
+The index is a SQLite database next to the package, e.g.
+`bid_package.txt.index.sqlite3`. It records the byte offset and length of each
+pairing, with its number, base, equipment, and dates, so a lookup seeks to the
+pairing, and parses only its lines.
+
+The index also records the SHA-256 digest of the package, computed while it is
+built. If the package's modification time changed, but not its size, the
+package is hashed again, and the index is only used if the digest still
+matches, e.g. the package was copied, or touched. The new modification time is
+then recorded, so the package is not hashed again on the next lookup. An index
+from an older parser is never used.
+"""
+
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from dataclasses import dataclass, field
+from hashlib import sha256
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from pbs_parse.bid_package.models import Pairing
+from pbs_parse.bid_package.parser import (
+    PAIRING_START,
+    PARSER_VERSION,
+    ParseError,
+    parse_pairings,
+)
+from pbs_parse.snippets.hash.file_hash import hash_file
+
+INDEX_VERSION = "1"
+INDEX_SUFFIX = ".index.sqlite3"
+HASH_METHOD = "sha256"
+PAIRING_START_BYTES = PAIRING_START.encode()
+
+SCHEMA = """
+CREATE TABLE source (
+    key TEXT PRIMARY KEY,
+    value NOT NULL
+);
+CREATE TABLE pairing (
+    number TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    byte_length INTEGER NOT NULL,
+    line_number INTEGER NOT NULL,
+    base TEXT NOT NULL,
+    equipment TEXT NOT NULL,
+    dates TEXT NOT NULL
+);
+"""
+# Indexes are created after the rows are inserted, which is faster.
+SCHEMA_INDEXES = """
+CREATE INDEX pairing_number ON pairing (number);
+CREATE INDEX pairing_base ON pairing (base, equipment);
+"""
+
+
+class StaleIndexError(Exception):
+    """The index does not match the bid package, or the parser version."""
+
+
+@dataclass
+class IndexEntry:
+    """Where a pairing is in the bid package, and its key attributes."""
+
+    number: str
+    offset: int
+    length: int
+    line_number: int
+    base: str
+    equipment: str
+    dates: list[str] = field(default_factory=list)
+
+
+def default_index_path(file_path: Path) -> Path:
+    """The sidecar index path for a bid package."""
+    return file_path.with_name(file_path.name + INDEX_SUFFIX)
+
+
+class _OffsetLines:
+    """
+    Iterate the decoded lines of a binary file, and hash them.
+
+    Records the offset of each `SEQ` line, and the offset after the last line.
+    """
+
+    def __init__(self, file_handle: BinaryIO):
+        self.file_handle = file_handle
+        self.hasher = sha256()
+        self.position = 0
+        self.line_offsets: dict[int, int] = {}
+
+    def __iter__(self) -> Iterator[str]:
+        hasher = self.hasher
+        line_offsets = self.line_offsets
+        for line_number, line in enumerate(self.file_handle, start=1):
+            hasher.update(line)
+            if line.lstrip().startswith(PAIRING_START_BYTES):
+                line_offsets[line_number] = self.position
+            self.position += len(line)
+            yield line.decode("utf-8")
+
+
+def _index_rows(lines: _OffsetLines) -> Iterator[tuple]:
+    for pairing in parse_pairings(lines):
+        offset = lines.line_offsets.pop(pairing.line_number)
+        lines.line_offsets.clear()
+        yield (
+            pairing.number,
+            offset,
+            lines.position - offset,
+            pairing.line_number,
+            pairing.base,
+            pairing.equipment,
+            " ".join(pairing.dates),
+        )
+
+
+def build_index(file_path: Path, index_path: Path | None = None) -> int:
+    """
+    Parse a bid package, and write its index.
+
+    The file is read once, for both the digest and the pairings. The index is
+    written to a temporary file, and renamed into place.
+
+    Args:
+        file_path: The bid package.
+        index_path: The index. Defaults to the sidecar path.
+
+    Raises:
+        ParseError: If the bid package is not valid.
+
+    Returns:
+        The number of pairings indexed.
+    """
+    index_path = index_path or default_index_path(file_path)
+    file_stat = os.stat(file_path)
+    file_descriptor, temp_name = tempfile.mkstemp(
+        dir=index_path.parent, prefix=".tmp-", suffix=INDEX_SUFFIX
+    )
+    os.close(file_descriptor)
+    temp_path = Path(temp_name)
+    try:
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.executescript(SCHEMA)
+            with open(file_path, "rb") as file_handle:
+                lines = _OffsetLines(file_handle)
+                count = connection.executemany(
+                    "INSERT INTO pairing VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    _index_rows(lines),
+                ).rowcount
+            connection.executescript(SCHEMA_INDEXES)
+            connection.executemany(
+                "INSERT INTO source VALUES (?, ?)",
+                {
+                    "index_version": INDEX_VERSION,
+                    "parser_version": PARSER_VERSION,
+                    "hash_method": HASH_METHOD,
+                    "file_hash": lines.hasher.hexdigest(),
+                    "size": file_stat.st_size,
+                    "mtime_ns": file_stat.st_mtime_ns,
+                }.items(),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(temp_path, index_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return max(count, 0)
+
+
+def _escape_like(value: str) -> str:
+    """Escape the `LIKE` wildcards in a value, so they match themselves."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class BidPackageIndex:
+    """
+    An index written by :py:func:`build_index`.
+
+    Use :py:func:`open_index` to open the index of a bid package, checking that
+    it is up to date.
+
+    Args:
+        index_path: The index.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        # Open read only, so a missing index is an error, instead of a new file.
+        self._connection = sqlite3.connect(
+            f"{index_path.resolve().as_uri()}?mode=ro", uri=True
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(index_path={self.index_path!r})"
+
+    def __enter__(self) -> "BidPackageIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM pairing").fetchone()
+        return count
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @property
+    def source(self) -> dict[str, str | int]:
+        """What the index was built from, e.g. `file_hash`, and `parser_version`."""
+        return dict(self._connection.execute("SELECT key, value FROM source"))
+
+    def check(self, file_path: Path, verify: bool = False) -> bool:
+        """
+        Check that the index matches the bid package, and the parser version.
+
+        Args:
+            file_path: The bid package.
+            verify: Compare the digest, even if the size, and modification time,
+                are unchanged. Defaults to False.
+
+        If the modification time changed, but the digest matches, the new time
+        is recorded in the index.
+
+        Returns:
+            True if the index can be used.
+        """
+        source = self.source
+        if (source.get("index_version"), source.get("parser_version")) != (
+            INDEX_VERSION,
+            PARSER_VERSION,
+        ):
+            return False
+        file_stat = os.stat(file_path)
+        if file_stat.st_size != source["size"]:
+            return False
+        if file_stat.st_mtime_ns == source["mtime_ns"] and not verify:
+            return True
+        if hash_file(file_path, sha256(), block_size="auto") != source["file_hash"]:
+            return False
+        if file_stat.st_mtime_ns != source["mtime_ns"]:
+            self._record_mtime(file_stat.st_mtime_ns)
+        return True
+
+    def _record_mtime(self, mtime_ns: int) -> None:
+        # The index is open read only, so update it with its own connection. An
+        # index that can't be written is still used, it is just hashed again.
+        try:
+            with closing(sqlite3.connect(self.index_path)) as connection:
+                with connection:
+                    connection.execute(
+                        "UPDATE source SET value = ? WHERE key = 'mtime_ns'",
+                        (mtime_ns,),
+                    )
+        except sqlite3.Error:
+            pass
+
+    def find(
+        self,
+        number: str | None = None,
+        base: str | None = None,
+        equipment: str | None = None,
+        date: str | None = None,
+    ) -> list[IndexEntry]:
+        """
+        Find pairings by their attributes. Every attribute given must match.
+
+        Args:
+            number: The pairing number. Defaults to None.
+            base: The base. Defaults to None.
+            equipment: The equipment. Defaults to None.
+            date: A date the pairing operates, e.g. `01NOV`. Defaults to None.
+
+        Returns:
+            The matching entries, in file order.
+        """
+        conditions = []
+        parameters = []
+        for column, value in (
+            ("number", number),
+            ("base", base),
+            ("equipment", equipment),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if date is not None:
+            conditions.append("' ' || dates || ' ' LIKE ? ESCAPE '\\'")
+            parameters.append(f"% {_escape_like(date)} %")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection.execute(
+            "SELECT number, byte_offset, byte_length, line_number, base, equipment, dates"
+            f" FROM pairing{where} ORDER BY byte_offset",
+            parameters,
+        )
+        return [
+            IndexEntry(*row[:6], dates=row[6].split())  # type: ignore[misc]
+            for row in rows
+        ]
+
+
+def open_index(
+    file_path: Path,
+    index_path: Path | None = None,
+    rebuild: bool = True,
+    verify: bool = False,
+) -> BidPackageIndex:
+    """
+    Open the index of a bid package, building it if it is missing, or stale.
+
+    Args:
+        file_path: The bid package.
+        index_path: The index. Defaults to the sidecar path.
+        rebuild: Build the index if needed. Defaults to True.
+        verify: Compare the digest, even if the package looks unchanged.
+            Defaults to False.
+
+    Raises:
+        StaleIndexError: If the index is missing, or stale, and `rebuild` is
+            False.
+        ParseError: If the index is built, and the bid package is not valid.
+
+    Returns:
+        The open index.
+    """
+    index_path = index_path or default_index_path(file_path)
+    if index_path.is_file():
+        index = BidPackageIndex(index_path)
+        try:
+            if index.check(file_path, verify=verify):
+                return index
+        except BaseException:
+            index.close()
+            raise
+        index.close()
+    if not rebuild:
+        raise StaleIndexError(
+            f"{index_path} is missing, or does not match {file_path}."
+        )
+    build_index(file_path, index_path)
+    return BidPackageIndex(index_path)
+
+
+def read_pairing(file_path: Path, entry: IndexEntry) -> Pairing:
+    """
+    Read, and parse, only the lines of one pairing.
+
+    Raises:
+        ParseError: If the lines are not one valid pairing, e.g. the file changed
+            after it was indexed.
+    """
+    with open(file_path, "rb") as file_handle:
+        file_handle.seek(entry.offset)
+        data = file_handle.read(entry.length)
+    lines = data.decode("utf-8").splitlines(keepends=True)
+    pairings = list(parse_pairings(lines, start_line=entry.line_number))
+    if len(pairings) != 1 or pairings[0].number != entry.number:
+        raise ParseError(
+            f"Expected pairing {entry.number}",
+            entry.line_number,
+            lines[0] if lines else "",
+        )
+    return pairings[0]
+
+
+def lookup_pairings(
+    file_path: Path,
+    number: str | None = None,
+    base: str | None = None,
+    equipment: str | None = None,
+    date: str | None = None,
+    index_path: Path | None = None,
+) -> list[Pairing]:
+    """
+    Find pairings with the index, and parse only those pairings.
+
+    The index is built first, if it is missing, or stale. See
+    :py:meth:`BidPackageIndex.find` for the arguments.
+
+    Returns:
+        The matching pairings, in file order.
+    """
+    with open_index(file_path, index_path) as index:
+        entries = index.find(number, base, equipment, date)
+    return [read_pairing(file_path, entry) for entry in entries]
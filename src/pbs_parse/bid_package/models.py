@@ -0,0 +1,61 @@
+"""
+The records parsed from a bid package.
+
+Times of day are minutes after midnight, local to the station. Durations are
+minutes.
+
+A monthly package has millions of legs, so the records use `__slots__`, and the
+parser interns station, equipment, and date codes, so each code is stored once.
+To keep a whole package in memory, use
+:py:class:`~pbs_parse.bid_package.columnar.ColumnarPairings`, which keeps the
+fields in typed arrays instead of objects.
+"""
+
+from dataclasses import dataclass, field
+
+
+class _Record:
+    """Pickles a slots dataclass as its constructor arguments, which is faster."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+
+@dataclass(slots=True)
+class Leg(_Record):
+    day: int
+    flight: str
+    departure_station: str
+    departure_time: int
+    arrival_station: str
+    arrival_time: int
+    equipment: str
+    block: int
+    deadhead: bool = False
+
+
+@dataclass(slots=True)
+class DutyPeriod(_Record):
+    report: int
+    release: int = 0
+    legs: list[Leg] = field(default_factory=list)
+    layover_station: str | None = None
+    layover_rest: int | None = None
+
+
+@dataclass(slots=True)
+class Pairing(_Record):
+    """A pairing, or trip: a sequence of duty periods, from base back to base."""
+
+    number: str
+    operations: int
+    base: str
+    equipment: str
+    dates: list[str] = field(default_factory=list)
+    duty_periods: list[DutyPeriod] = field(default_factory=list)
+    block: int = 0
+    credit: int = 0
+    tafb: int = 0
+    line_number: int = 0
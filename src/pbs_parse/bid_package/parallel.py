@@ -0,0 +1,203 @@
+"""
+Parse a bid package with several processes.
+
+The file is split into byte ranges that start at a pairing, found with a quick
+scan for `SEQ` lines. Each range is parsed in a worker process, and results are
+yielded in file order, so the output is the same as a serial parse. Line
+numbers, in records and errors, count from the start of the file, for files
+with `\n`, or `\r\n`, line endings.
+
+Sending records back from workers is costly, unpickling them in the main
+process takes about as long as parsing them. For the best scaling, convert each
+pairing in the worker, e.g. to JSON, with :py:func:`map_pairings_parallel`, so
+the main process only collects strings.
+"""
+
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from pbs_parse.bid_package.models import Pairing
+from pbs_parse.bid_package.parser import (
+    END_OF_INPUT,
+    PAIRING_START,
+    ParseError,
+    parse_bid_package_file,
+    parse_pairings,
+)
+from pbs_parse.snippets.hash.multi_file_hash import ordered_map
+
+R = TypeVar("R")
+
+CHUNKS_PER_JOB = 4
+MIN_CHUNK_SIZE = 2**20
+COUNT_BLOCK_SIZE = 2**20
+PAIRING_START_BYTES = b"\n" + PAIRING_START.encode() + b" "
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A byte range of a bid package, starting at a pairing, or the file start."""
+
+    start: int
+    end: int
+    start_line: int
+
+
+def _count_lines(file_handle, start: int, end: int) -> int:
+    file_handle.seek(start)
+    count = 0
+    remaining = end - start
+    while remaining:
+        block = file_handle.read(min(COUNT_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        count += block.count(b"\n")
+        remaining -= len(block)
+    return count
+
+
+def plan_chunks(file_path: Path, chunks: int) -> list[Chunk]:
+    """
+    Split a bid package into about `chunks` byte ranges, each starting at a pairing.
+
+    Ranges are about the same size, a range only starts at a `SEQ` line. Ranges
+    can be fewer than `chunks`, if pairings are large, or the file is small.
+
+    Args:
+        file_path: The bid package.
+        chunks: The number of ranges wanted.
+
+    Returns:
+        The ranges, in file order, covering the whole file.
+    """
+    size = os.stat(file_path).st_size
+    if size == 0 or chunks <= 1:
+        return [Chunk(0, size, 1)]
+    with (
+        open(file_path, "rb") as file_handle,
+        mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        boundaries = [0]
+        for index in range(1, chunks):
+            target = max(size * index // chunks, boundaries[-1], 1) - 1
+            found = mapped.find(PAIRING_START_BYTES, target)
+            if found == -1:
+                break
+            if found + 1 > boundaries[-1]:
+                boundaries.append(found + 1)
+        boundaries.append(size)
+        planned = []
+        start_line = 1
+        for start, end in zip(boundaries, boundaries[1:]):
+            planned.append(Chunk(start, end, start_line))
+            start_line += _count_lines(file_handle, start, end)
+    return planned
+
+
+def _first_line(file_handle, offset: int) -> str:
+    file_handle.seek(offset)
+    return file_handle.readline().decode("utf-8")
+
+
+def parse_chunk(
+    file_path: Path, chunk: Chunk, size: int | None = None
+) -> list[Pairing]:
+    """
+    Parse the pairings in one range of a bid package.
+
+    Errors are the same as a serial parse would raise. An unfinished pairing at
+    the end of a range is reported at the `SEQ` line that follows it.
+
+    Args:
+        file_path: The bid package.
+        chunk: The range, from :py:func:`plan_chunks`.
+        size: The file size, if known. Defaults to None.
+
+    Returns:
+        The pairings in the range.
+    """
+    if size is None:
+        size = os.stat(file_path).st_size
+    with open(file_path, "rb") as file_handle:
+        file_handle.seek(chunk.start)
+        data = file_handle.read(chunk.end - chunk.start)
+        # Split lines the same way as reading the file in text mode.
+        lines: Iterable[str] = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+        if chunk.end < size:
+            # The next pairing's SEQ line shows an unfinished pairing the same way
+            # as a serial parse, as an unexpected SEQ.
+            lines = chain(lines, [_first_line(file_handle, chunk.end)])
+    pairings = []
+    try:
+        pairings.extend(parse_pairings(lines, start_line=chunk.start_line))
+    except ParseError as error:
+        # The next pairing starts, but is not finished, at the end of the range.
+        if chunk.end == size or error.line != END_OF_INPUT:
+            raise
+    return pairings
+
+
+def _map_chunk(
+    func: Callable[[Pairing], R], file_path: Path, size: int, chunk: Chunk
+) -> list[R]:
+    return [func(pairing) for pairing in parse_chunk(file_path, chunk, size)]
+
+
+def _identity(pairing: Pairing) -> Pairing:
+    return pairing
+
+
+def map_pairings_parallel(
+    file_path: Path,
+    func: Callable[[Pairing], R],
+    jobs: int = 1,
+    chunks_per_job: int = CHUNKS_PER_JOB,
+) -> Iterator[R]:
+    """
+    Parse a bid package in worker processes, and call `func` on each pairing
+    in the worker.
+
+    Args:
+        file_path: The bid package.
+        func: Called on each pairing, must be picklable, e.g. a module level
+            function.
+        jobs: The number of worker processes. Defaults to 1, to parse in this
+            process.
+        chunks_per_job: Ranges per worker, more ranges balance the load better.
+            Defaults to 4.
+
+    Raises:
+        ParseError: The same error a serial parse would raise.
+
+    Yields:
+        The result for each pairing, in file order.
+    """
+    size = os.stat(file_path).st_size
+    chunk_count = min(jobs * chunks_per_job, size // MIN_CHUNK_SIZE)
+    if jobs <= 1 or chunk_count <= 1:
+        yield from map(func, parse_bid_package_file(file_path))
+        return
+    chunks = plan_chunks(file_path, chunk_count)
+    worker = partial(_map_chunk, func, file_path, size)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for results in ordered_map(executor, worker, chunks, window=jobs * 2):
+            yield from results
+
+
+def parse_bid_package_parallel(
+    file_path: Path, jobs: int = 1, chunks_per_job: int = CHUNKS_PER_JOB
+) -> Iterator[Pairing]:
+    """
+    Parse a bid package in worker processes.
+
+    The pairings are the same, and in the same order, as
+    :py:func:`~pbs_parse.bid_package.parser.parse_bid_package_file`.
+    """
+    return map_pairings_parallel(file_path, _identity, jobs, chunks_per_job)
@@ -0,0 +1,302 @@
+"""
+An on disk cache of parsed bid packages, keyed on the content of the package.
+
+Entries are named for the SHA-256 digest of the package, and the parser
+version, so an edited package, or a new parser, never reads a stale entry. With
+a :py:class:`~pbs_parse.snippets.hash.hash_cache.HashCache`, the digest of an
+unchanged package is found with a `stat` call, and a cache hit doesn't read the
+package at all.
+
+Two kinds of entry are kept: a stream of pickled batches of
+:py:class:`~pbs_parse.bid_package.models.Pairing` records, and JSON lines, as
+written by the `parse` command. Both are read, and written, a batch at a time,
+so memory use does not depend on the size of the package.
+
+The cache is bounded in size. The least recently used entries are removed when
+a new entry is stored.
+"""
+
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Callable, Iterable, Iterator, TypeVar
+
+from pbs_parse.bid_package.models import Pairing
+from pbs_parse.bid_package.parallel import (
+    map_pairings_parallel,
+    parse_bid_package_parallel,
+)
+from pbs_parse.bid_package.parser import PARSER_VERSION
+from pbs_parse.bid_package.serialize import pairing_to_json
+from pbs_parse.snippets.hash.file_hash import make_hashed_file
+
+if TYPE_CHECKING:
+    from pbs_parse.snippets.hash.hash_cache import HashCache
+
+T = TypeVar("T")
+
+DEFAULT_MAX_BYTES = 2**30
+PICKLE_BATCH_SIZE = 1000
+ENTRY_PATTERN = "*.v*.*"
+
+
+class DiscardEntry(Exception):
+    """Raise inside :py:meth:`ParseCache.write_entry` to not store the entry."""
+
+
+class ParseCache:
+    """
+    A directory of parsed bid packages, with least recently used eviction.
+
+    Args:
+        cache_dir: The directory. Created as needed.
+        max_bytes: The most bytes of entries to keep. Defaults to 2**30 (1G).
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"cache_dir={self.cache_dir!r}, max_bytes={self.max_bytes!r})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def entry_path(self, digest: str, kind: str) -> Path:
+        return self.cache_dir / f"{digest}.v{PARSER_VERSION}.{kind}"
+
+    def entries(self) -> list[Path]:
+        """Every entry, oldest used first."""
+        if not self.cache_dir.is_dir():
+            return []
+        entries = []
+        for entry in self.cache_dir.glob(ENTRY_PATTERN):
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry))
+            except FileNotFoundError:
+                continue
+        return [entry for _, entry in sorted(entries)]
+
+    def nbytes(self) -> int:
+        """The total size of the entries."""
+        total = 0
+        for entry in self.entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def open_entry(self, digest: str, kind: str) -> IO[bytes] | None:
+        """
+        Open an entry for reading, and mark it as used.
+
+        Returns:
+            The open entry, or None if there is no entry.
+        """
+        entry_path = self.entry_path(digest, kind)
+        try:
+            file_handle = open(entry_path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            # The modification time records when the entry was last used.
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return file_handle
+
+    @contextmanager
+    def write_entry(self, digest: str, kind: str) -> Iterator[IO[bytes]]:
+        """
+        Write an entry, which is stored when the `with` block finishes.
+
+        The entry is written to a temporary file, and renamed into place, so
+        readers never see a partial entry. If the block raises, or the generator
+        using it is closed early, nothing is stored. Raise :py:class:`DiscardEntry`
+        to leave the block without storing the entry, or an error.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, prefix=".tmp-", delete=False
+        ) as file_out:
+            temp_path = Path(file_out.name)
+            try:
+                yield file_out
+            except DiscardEntry:
+                file_out.close()
+                temp_path.unlink(missing_ok=True)
+                return
+            except BaseException:
+                file_out.close()
+                temp_path.unlink(missing_ok=True)
+                raise
+        os.replace(temp_path, self.entry_path(digest, kind))
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries, until the cache fits `max_bytes`.
+
+        Returns:
+            The number of entries removed.
+        """
+        sized = []
+        for entry in self.entries():
+            try:
+                sized.append((entry, entry.stat().st_size))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size in sized)
+        removed = 0
+        for entry, size in sized:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove every entry.
+
+        Returns:
+            The number of entries removed.
+        """
+        entries = self.entries()
+        for entry in entries:
+            entry.unlink(missing_ok=True)
+        return len(entries)
+
+
+def file_digest(file_path: Path, hash_cache: "HashCache | None" = None) -> str:
+    """The SHA-256 digest of a file, from the hash cache if it is unchanged."""
+    if hash_cache is None:
+        return make_hashed_file(file_path, sha256(), block_size="auto").file_hash
+    from pbs_parse.snippets.hash.hash_cache import cached_make_hashed_file
+
+    return cached_make_hashed_file(
+        file_path, sha256(), hash_cache, block_size="auto"
+    ).file_hash
+
+
+def _stat_key(file_path: Path) -> tuple[int, int, int]:
+    file_stat = os.stat(file_path)
+    return file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino
+
+
+def _cached(
+    file_path: Path,
+    cache: ParseCache,
+    hash_cache: "HashCache | None",
+    kind: str,
+    produce: Callable[[], Iterable[T]],
+    dump: Callable[[Iterable[T], IO[bytes]], Iterator[T]],
+    load: Callable[[IO[bytes]], Iterator[T]],
+) -> Iterator[T]:
+    before = _stat_key(file_path)
+    digest = file_digest(file_path, hash_cache)
+    cached = cache.open_entry(digest, kind)
+    if cached is not None:
+        with cached:
+            yield from load(cached)
+        return
+    with cache.write_entry(digest, kind) as file_out:
+        yield from dump(produce(), file_out)
+        if _stat_key(file_path) != before:
+            # Changed while parsing, the records may not match the digest.
+            raise DiscardEntry()
+
+
+def _dump_pickle(pairings: Iterable[Pairing], file_out: IO[bytes]) -> Iterator[Pairing]:
+    batch: list[Pairing] = []
+    for pairing in pairings:
+        batch.append(pairing)
+        yield pairing
+        if len(batch) >= PICKLE_BATCH_SIZE:
+            pickle.dump(batch, file_out, protocol=5)
+            batch = []
+    if batch:
+        pickle.dump(batch, file_out, protocol=5)
+
+
+def _load_pickle(file_in: IO[bytes]) -> Iterator[Pairing]:
+    while True:
+        try:
+            batch = pickle.load(file_in)
+        except EOFError:
+            return
+        yield from batch
+
+
+def _dump_json_lines(lines: Iterable[str], file_out: IO[bytes]) -> Iterator[str]:
+    for line in lines:
+        file_out.write(line.encode("utf-8") + b"\n")
+        yield line
+
+
+def _load_json_lines(file_in: IO[bytes]) -> Iterator[str]:
+    for line in file_in:
+        yield line.decode("utf-8").rstrip("\n")
+
+
+def cached_parse_bid_package(
+    file_path: Path,
+    cache: ParseCache,
+    hash_cache: "HashCache | None" = None,
+    jobs: int = 1,
+) -> Iterator[Pairing]:
+    """
+    Parse a bid package, or load the pairings from the cache.
+
+    On a miss, the pairings are stored as they are parsed. Nothing is stored if
+    the parse fails, iteration stops early, or the file changes while parsing.
+
+    Args:
+        file_path: The bid package.
+        cache: The cache.
+        hash_cache: Finds the digest of an unchanged file without reading it.
+            Defaults to None.
+        jobs: The number of worker processes used on a miss. Defaults to 1.
+
+    Yields:
+        Each pairing, in file order.
+    """
+    return _cached(
+        file_path,
+        cache,
+        hash_cache,
+        "pickle",
+        lambda: parse_bid_package_parallel(file_path, jobs=jobs),
+        _dump_pickle,
+        _load_pickle,
+    )
+
+
+def cached_parse_json_lines(
+    file_path: Path,
+    cache: ParseCache,
+    hash_cache: "HashCache | None" = None,
+    jobs: int = 1,
+) -> Iterator[str]:
+    """
+    Like :py:func:`cached_parse_bid_package`, but for each pairing as a line of
+    JSON, without the newline.
+    """
+    return _cached(
+        file_path,
+        cache,
+        hash_cache,
+        "jsonl",
+        lambda: map_pairings_parallel(file_path, pairing_to_json, jobs=jobs),
+        _dump_json_lines,
+        _load_json_lines,
+    )
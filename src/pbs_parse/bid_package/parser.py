@@ -0,0 +1,230 @@
+"""
+A streaming parser for line oriented PBS bid packages.
+
+A bid package is a text file of pairings. Each line starts with a tag::
+
+    # Comments, and blank lines, are ignored.
+    SEQ 5012 OPS 4 BASE BOS EQP 320
+    DATES 01NOV 08NOV 15NOV 22NOV
+    RPT 0545
+    LEG 1 1234 BOS 0645 ORD 0830 320 2:45
+    LEG 1 DH 567 ORD 0930 DEN 1115 738 2:45
+    RLS 1145
+    LO DEN 18:15
+    RPT 0530
+    LEG 2 890 DEN 0630 BOS 1205 320 3:35
+    RLS 1220
+    TTL 9:05 10:00 30:35
+
+`SEQ` starts a pairing, with its number, number of operations, base, and
+equipment. `DATES` lists the days it operates. Each duty period starts with
+`RPT` and its report time, has `LEG` lines for its flights, and ends with `RLS`
+and its release time. An optional `LO` line after `RLS` gives the layover
+station and rest. `TTL` ends the pairing, with its block, credit, and time away
+from base.
+
+A leg has its day of the pairing, an optional `DH` for a deadhead, the flight
+number, departure station and time, arrival station and time, equipment, and
+block time. Times of day are `HHMM`, durations are `H:MM`.
+
+Pairings are yielded one at a time, so memory use does not depend on the size
+of the file. Station, equipment, and date codes are interned.
+"""
+
+import io
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from pbs_parse.bid_package.models import DutyPeriod, Leg, Pairing
+from pbs_parse.snippets.hash.stream_input import open_decompressed, open_input
+
+PARSER_VERSION = "2"
+PAIRING_START = "SEQ"
+END_OF_INPUT = "<end of input>"
+# Limits of the columnar layout, see pbs_parse.bid_package.columnar.
+MAX_DAY = 2**8 - 1
+MAX_OPERATIONS = 2**16 - 1
+MAX_LEG_BLOCK = 2**16 - 1
+MAX_DURATION = 2**31 - 1
+
+
+class ParseError(ValueError):
+    """A line that is not valid in a bid package, or not valid where it is."""
+
+    def __init__(self, message: str, line_number: int, line: str):
+        super().__init__(f"Line {line_number}: {message}: {line.rstrip()!r}")
+        self.message = message
+        self.line_number = line_number
+        self.line = line
+
+    def __reduce__(self):
+        # Raised in worker processes, so it must survive pickling.
+        return self.__class__, (self.message, self.line_number, self.line)
+
+
+def parse_time(value: str) -> int:
+    """Parse a time of day, `HHMM`, to minutes after midnight."""
+    if len(value) != 4 or not value.isdigit():
+        raise ValueError(f"Invalid time {value!r}")
+    hours, minutes = int(value[:2]), int(value[2:])
+    if hours > 24 or minutes > 59:
+        raise ValueError(f"Invalid time {value!r}")
+    return hours * 60 + minutes
+
+
+def parse_duration(value: str) -> int:
+    """Parse a duration, `H:MM`, to minutes."""
+    hours, separator, minutes = value.partition(":")
+    if not separator or not hours.isdigit() or len(minutes) != 2:
+        raise ValueError(f"Invalid duration {value!r}")
+    if not minutes.isdigit() or int(minutes) > 59:
+        raise ValueError(f"Invalid duration {value!r}")
+    return _in_range(int(hours) * 60 + int(minutes), "Duration", 0, MAX_DURATION)
+
+
+def _in_range(value: int, name: str, minimum: int, maximum: int) -> int:
+    if not minimum <= value <= maximum:
+        raise ValueError(f"{name} {value} is not between {minimum} and {maximum}")
+    return value
+
+
+def _parse_seq(fields: list[str], line_number: int) -> Pairing:
+    if len(fields) != 8 or fields[2::2] != ["OPS", "BASE", "EQP"]:
+        raise ValueError("Expected SEQ <number> OPS <n> BASE <base> EQP <equipment>")
+    return Pairing(
+        number=fields[1],
+        operations=_in_range(int(fields[3]), "OPS", 0, MAX_OPERATIONS),
+        base=sys.intern(fields[5]),
+        equipment=sys.intern(fields[7]),
+        line_number=line_number,
+    )
+
+
+def _parse_leg(fields: list[str]) -> Leg:
+    deadhead = len(fields) > 2 and fields[2] == "DH"
+    if deadhead:
+        del fields[2]
+    if len(fields) != 9:
+        raise ValueError(
+            "Expected LEG <day> [DH] <flight> <departure> <time> <arrival> <time>"
+            " <equipment> <block>"
+        )
+    return Leg(
+        day=_in_range(int(fields[1]), "Day", 1, MAX_DAY),
+        flight=fields[2],
+        departure_station=sys.intern(fields[3]),
+        departure_time=parse_time(fields[4]),
+        arrival_station=sys.intern(fields[5]),
+        arrival_time=parse_time(fields[6]),
+        equipment=sys.intern(fields[7]),
+        block=_in_range(parse_duration(fields[8]), "Block", 0, MAX_LEG_BLOCK),
+        deadhead=deadhead,
+    )
+
+
+def _expect_fields(fields: list[str], count: int) -> None:
+    if len(fields) != count:
+        raise ValueError(f"Expected {count - 1} value(s) after {fields[0]}")
+
+
+def parse_pairings(lines: Iterable[str], start_line: int = 1) -> Iterator[Pairing]:
+    """
+    Parse pairings from the lines of a bid package.
+
+    Args:
+        lines: The lines, e.g. an open text file.
+        start_line: The line number of the first line, for error messages, and
+            :py:attr:`Pairing.line_number`. Defaults to 1.
+
+    Raises:
+        ParseError: If a line is not valid, or the last pairing is not finished.
+
+    Yields:
+        Each pairing, when its `TTL` line is read.
+    """
+    pairing: Pairing | None = None
+    duty: DutyPeriod | None = None
+    line_number = start_line - 1
+    for line_number, line in enumerate(lines, start=start_line):
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        tag = fields[0]
+        try:
+            if pairing is None:
+                if tag != PAIRING_START:
+                    raise ValueError(f"Expected {PAIRING_START}, got {tag}")
+                pairing = _parse_seq(fields, line_number)
+            elif tag == "DATES" and not pairing.duty_periods and duty is None:
+                pairing.dates.extend(map(sys.intern, fields[1:]))
+            elif tag == "RPT" and duty is None:
+                _expect_fields(fields, 2)
+                duty = DutyPeriod(report=parse_time(fields[1]))
+                pairing.duty_periods.append(duty)
+            elif tag == "LEG" and duty is not None:
+                duty.legs.append(_parse_leg(fields))
+            elif tag == "RLS" and duty is not None and duty.legs:
+                _expect_fields(fields, 2)
+                duty.release = parse_time(fields[1])
+                duty = None
+            elif tag == "LO" and duty is None and pairing.duty_periods:
+                _expect_fields(fields, 3)
+                last_duty = pairing.duty_periods[-1]
+                if last_duty.layover_station is not None:
+                    raise ValueError("Duty period already has a layover")
+                last_duty.layover_station = sys.intern(fields[1])
+                last_duty.layover_rest = parse_duration(fields[2])
+            elif tag == "TTL" and duty is None and pairing.duty_periods:
+                _expect_fields(fields, 4)
+                pairing.block = parse_duration(fields[1])
+                pairing.credit = parse_duration(fields[2])
+                pairing.tafb = parse_duration(fields[3])
+                yield pairing
+                pairing = None
+            else:
+                raise ValueError(f"Unexpected {tag}")
+        except ValueError as error:
+            raise ParseError(str(error), line_number, line) from error
+    if pairing is not None:
+        raise ParseError(
+            f"Pairing {pairing.number} has no TTL", line_number, END_OF_INPUT
+        )
+
+
+def parse_bid_package(file_handle: TextIO) -> Iterator[Pairing]:
+    """Parse pairings from an open bid package, from its current position."""
+    return parse_pairings(file_handle)
+
+
+def parse_bid_package_file(file_path: Path) -> Iterator[Pairing]:
+    """
+    Parse pairings from a bid package file.
+
+    The file is read a line at a time, and closed when the iterator finishes.
+    """
+    with open(file_path, encoding="utf-8") as file_handle:
+        yield from parse_pairings(file_handle)
+
+
+def parse_bid_package_input(
+    path: str | Path, member: str | None = None
+) -> Iterator[Pairing]:
+    """
+    Parse pairings from a bid package file, or stdin for `-`, decompressing it
+    while it is read, if it is compressed.
+
+    See :py:mod:`pbs_parse.snippets.hash.stream_input` for the compressions.
+
+    Args:
+        path: The bid package, or `-`.
+        member: The zip member to parse. Defaults to the first file.
+    """
+    with open_input(path) as file_handle:
+        with open_decompressed(file_handle, member=member) as stream:
+            text = io.TextIOWrapper(stream, encoding="utf-8")
+            try:
+                yield from parse_pairings(text)
+            finally:
+                # Leave the stream, which may be stdin, for its owner to close.
+                text.detach()
@@ -0,0 +1,56 @@
+"""Convert parsed records to JSON."""
+
+import json
+from typing import Any
+
+from pbs_parse.bid_package.models import DutyPeriod, Leg, Pairing
+
+
+def leg_to_dict(leg: Leg) -> dict[str, Any]:
+    return {
+        "day": leg.day,
+        "flight": leg.flight,
+        "departure_station": leg.departure_station,
+        "departure_time": leg.departure_time,
+        "arrival_station": leg.arrival_station,
+        "arrival_time": leg.arrival_time,
+        "equipment": leg.equipment,
+        "block": leg.block,
+        "deadhead": leg.deadhead,
+    }
+
+
+def duty_period_to_dict(duty: DutyPeriod) -> dict[str, Any]:
+    return {
+        "report": duty.report,
+        "release": duty.release,
+        "legs": [leg_to_dict(leg) for leg in duty.legs],
+        "layover_station": duty.layover_station,
+        "layover_rest": duty.layover_rest,
+    }
+
+
+def pairing_to_dict(pairing: Pairing) -> dict[str, Any]:
+    """
+    A pairing as a dict, the same as :py:func:`dataclasses.asdict`.
+
+    Written out by hand, since `asdict` deep copies every value, and takes most
+    of the time when writing JSON.
+    """
+    return {
+        "number": pairing.number,
+        "operations": pairing.operations,
+        "base": pairing.base,
+        "equipment": pairing.equipment,
+        "dates": list(pairing.dates),
+        "duty_periods": [duty_period_to_dict(duty) for duty in pairing.duty_periods],
+        "block": pairing.block,
+        "credit": pairing.credit,
+        "tafb": pairing.tafb,
+        "line_number": pairing.line_number,
+    }
+
+
+def pairing_to_json(pairing: Pairing) -> str:
+    """A pairing as one line of JSON, without the newline."""
+    return json.dumps(pairing_to_dict(pairing))
@@ -1,38 +1,1226 @@
-"""Command-line interface."""
+"""Command-line interface.
 
-from hashlib import md5
+The CLI is started for every file by schedulers, so startup time matters. Only
+light modules are imported here. Each command imports what it needs when it
+runs, see `tests/pbs_parse/test_startup.py`.
+"""
+
+import sys
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
 from pathlib import Path
 from time import perf_counter_ns
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated, Callable, Literal, Optional
 
 import typer
 
-from pbs_parse.snippets.hash.file_hash import hash_file
+if TYPE_CHECKING:
+    from cProfile import Profile
+    from hashlib import _Hash
+
+    from pbs_parse.snippets.hash.hash_cache import HashCache
+    from pbs_parse.snippets.profiling.phase_timer import PhaseTimer
+
+# Copies of snippet constants, so option defaults don't import the snippets.
+TREE_HASH_NAME = "blake2b-tree"
+DEFAULT_CHUNK_SIZE = "8M"
+DEFAULT_PARSE_CACHE_SIZE = "1G"
+STDIN = "-"
 
 
 def default_options(
     ctx: typer.Context,
     debug: Annotated[bool, typer.Option(help="Enable debug output.")] = False,
     verbosity: Annotated[int, typer.Option("-v", help="Verbosity.", count=True)] = 1,
+    profile: Annotated[
+        bool,
+        typer.Option(help="Report time and throughput per phase to stderr."),
+    ] = False,
+    profile_json: Annotated[
+        Optional[Path],
+        typer.Option(help="Append a JSON timing record for the run to this file."),
+    ] = None,
+    cprofile: Annotated[
+        Optional[Path],
+        typer.Option(help="Save cProfile stats for the main thread to this file."),
+    ] = None,
 ):
     """Hash a file."""
 
     ctx.ensure_object(dict)
     ctx.obj["START_TIME"] = perf_counter_ns()
     ctx.obj["DEBUG"] = debug
-    typer.echo(f"Verbosity: {verbosity}")
+    if verbosity > 1:
+        typer.echo(f"Verbosity: {verbosity}")
     ctx.obj["VERBOSITY"] = verbosity
+    if cprofile is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        ctx.call_on_close(partial(save_cprofile, profiler, cprofile))
+        profiler.enable()
+    if profile or profile_json is not None:
+        from pbs_parse.snippets.profiling.phase_timer import PhaseTimer
+
+        timer = PhaseTimer(ctx.invoked_subcommand or "", ctx.obj["START_TIME"])
+        ctx.obj["PROFILER"] = timer
+        ctx.call_on_close(partial(report_profile, timer, profile, profile_json))
+
+
+def save_cprofile(profiler: "Profile", stats_path: Path) -> None:
+    profiler.disable()
+    profiler.dump_stats(stats_path)
+
+
+def report_profile(timer: "PhaseTimer", to_stderr: bool, json_path: Path | None):
+    """Report the timings when the command finishes."""
+    import json
+    from time import time
+
+    timer.stop()
+    if to_stderr:
+        typer.echo(timer.format_report(), err=True)
+    if json_path is not None:
+        record = {"timestamp": time(), "argv": sys.argv[1:], **timer.to_dict()}
+        with open(json_path, "a", encoding="utf-8") as json_file:
+            json_file.write(json.dumps(record) + "\n")
+
+
+def get_profiler(ctx: typer.Context) -> "PhaseTimer | None":
+    return (ctx.obj or {}).get("PROFILER")
+
+
+def profile_phase(
+    ctx: typer.Context, phase: str, byte_count: int = 0
+) -> AbstractContextManager:
+    """Time a phase of the command, if profiling."""
+    timer = get_profiler(ctx)
+    return nullcontext() if timer is None else timer.phase(phase, byte_count)
+
+
+def profiled_hasher_factories(
+    ctx: typer.Context, hasher_factories: list[Callable[[], "_Hash"]]
+) -> list[Callable[[], "_Hash"]]:
+    """Time the read and hash phases of the hashers made, if profiling."""
+    timer = get_profiler(ctx)
+    if timer is None:
+        return hasher_factories
+    from pbs_parse.snippets.profiling.phase_timer import TimedHasher
+
+    def timed_factory(factory: Callable[[], "_Hash"], count_reads: bool):
+        return lambda: TimedHasher(factory(), timer, count_reads=count_reads)
+
+    return [
+        timed_factory(factory, count_reads=index == 0)
+        for index, factory in enumerate(hasher_factories)
+    ]
 
 
 app = typer.Typer(callback=default_options)
+cache_app = typer.Typer(help="Manage the persistent hash and parse caches.")
+app.add_typer(cache_app, name="cache")
+manifest_app = typer.Typer(help="Create and verify md5sum compatible manifests.")
+app.add_typer(manifest_app, name="manifest")
+
+APP_NAME = "pbs-parse"
+
+
+def default_hash_cache_path() -> Path:
+    return Path(typer.get_app_dir(APP_NAME)) / "hash_cache.sqlite3"
+
+
+def default_checkpoint_dir() -> Path:
+    return Path(typer.get_app_dir(APP_NAME)) / "checkpoints"
+
+
+def default_parse_cache_dir() -> Path:
+    return Path(typer.get_app_dir(APP_NAME)) / "parse_cache"
+
+
+def default_watch_state_path() -> Path:
+    return Path(typer.get_app_dir(APP_NAME)) / "watch_state.sqlite3"
+
+
+def open_hash_cache(
+    ctx: typer.Context,
+    use_cache: bool,
+    cache_path: Path | None,
+    max_entries: int | None,
+) -> "HashCache | None":
+    """Open the hash cache if requested, closing it when the command finishes."""
+    if not use_cache:
+        return None
+    from pbs_parse.snippets.hash.hash_cache import DEFAULT_MAX_ENTRIES, HashCache
+
+    hash_cache = HashCache(
+        cache_path or default_hash_cache_path(), max_entries or DEFAULT_MAX_ENTRIES
+    )
+    ctx.call_on_close(hash_cache.close)
+    return hash_cache
+
+
+def validate_algorithm(name: str) -> str:
+    """
+    Check that `name` is an installed hash algorithm with a fixed digest size.
+
+    Returns:
+        The algorithm name, with aliases, e.g. `fast`, resolved.
+    """
+    from pbs_parse.snippets.hash.hash_registry import new_hasher, resolve_algorithm
+
+    name = resolve_algorithm(name)
+    try:
+        hasher = new_hasher(name)
+    except ValueError as error:
+        raise typer.BadParameter(str(error)) from error
+    if hasher.digest_size == 0:
+        raise typer.BadParameter(f"{name!r} does not have a fixed digest size.")
+    return name
+
+
+def validate_algorithms(names: list[str]) -> list[str]:
+    return [validate_algorithm(name) for name in names]
+
+
+READ_MODES = ("read", "readinto", "mmap")
+SIZE_SUFFIXES = {"K": 2**10, "M": 2**20, "G": 2**30}
+DEFAULT_BENCHMARK_BLOCK_SIZES = ["4K", "16K", "64K", "256K", "1M", "4M", "16M", "auto"]
+
+
+def parse_block_size(value: str) -> int | Literal["auto"]:
+    """Parse a block size like `65536`, `64K`, `1M`, or `auto`."""
+    value = value.strip().upper()
+    if value == "AUTO":
+        return "auto"
+    multiplier = SIZE_SUFFIXES.get(value[-1:], 1)
+    digits = value[:-1] if value[-1:] in SIZE_SUFFIXES else value
+    try:
+        size = int(digits) * multiplier
+    except ValueError as error:
+        raise typer.BadParameter(f"Invalid block size {value!r}.") from error
+    if size <= 0:
+        raise typer.BadParameter(f"Block size must be positive, got {value!r}.")
+    return size
+
+
+def parse_block_sizes(values: list[str]) -> list[int | Literal["auto"]]:
+    return [parse_block_size(value) for value in values]
+
+
+def validate_read_mode(value: str) -> str:
+    if value not in READ_MODES:
+        raise typer.BadParameter(f"Read mode must be one of {', '.join(READ_MODES)}.")
+    return value
+
+
+def validate_read_modes(values: list[str]) -> list[str]:
+    return [validate_read_mode(value) for value in values]
 
 
 @app.command()
 def hash_md5(
-    ctx: typer.Context, path_in: Annotated[Path, typer.Argument(help="file to hash.")]
+    ctx: typer.Context,
+    path_in: Annotated[Path, typer.Argument(help="file to hash, or - for stdin.")],
+    decompress: Annotated[
+        bool,
+        typer.Option(
+            help="Hash the decompressed bytes of gzip, bz2, xz, or zip input."
+        ),
+    ] = False,
+    member: Annotated[
+        Optional[str],
+        typer.Option(help="The zip member to hash. Defaults to the first file."),
+    ] = None,
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache", help="Reuse digests of unchanged files from cache."
+        ),
+    ] = False,
+    cache_path: Annotated[
+        Optional[Path],
+        typer.Option(help="The hash cache database. Defaults to the app directory."),
+    ] = None,
+    cache_max_entries: Annotated[
+        Optional[int],
+        typer.Option(
+            min=1, help="Evict the oldest entries past this size. Defaults to 500,000."
+        ),
+    ] = None,
+):
+    """Hash a file, or stdin, with md5.
+
+    The digest is of the input as it is, unless --decompress is given, then
+    compressed input is detected from its first bytes, and decompressed while it
+    is hashed. Stdin, and --decompress, can't be used with --cache.
+    """
+    from hashlib import md5
+
+    streamed = str(path_in) == STDIN or decompress
+    if use_cache and streamed:
+        raise typer.BadParameter("--cache can't be used with stdin, or --decompress.")
+    hash_cache = open_hash_cache(ctx, use_cache, cache_path, cache_max_entries)
+    (hasher_factory,) = profiled_hasher_factories(ctx, [md5])
+    if streamed:
+        from pbs_parse.snippets.hash.stream_input import STREAM_ERRORS, hash_input
+
+        try:
+            hashcode = hash_input(
+                path_in, hasher_factory(), decompress=decompress, member=member
+            )
+        except STREAM_ERRORS as error:
+            typer.echo(f"{path_in}: {error}", err=True)
+            raise typer.Exit(code=1)
+    elif hash_cache is None:
+        from pbs_parse.snippets.hash.file_hash import hash_file
+
+        hashcode = hash_file(path_in, hasher_factory())
+    else:
+        from pbs_parse.snippets.hash.hash_cache import cached_make_hashed_file
+
+        hashcode = cached_make_hashed_file(
+            path_in, hasher_factory(), hash_cache
+        ).file_hash
+    with profile_phase(ctx, "write"):
+        typer.echo(f"{hashcode}  {path_in.name}")
+
+
+@app.command("hash")
+def hash_paths(
+    ctx: typer.Context,
+    paths: Annotated[
+        list[str], typer.Argument(help="Files, directories, or glob patterns to hash.")
+    ],
+    algo: Annotated[
+        list[str],
+        typer.Option(
+            help="Hash algorithm, e.g. sha256, xxh3_128, or fast. Repeat to compute "
+            "several digests in one read. See `hash-algorithms`.",
+            callback=validate_algorithms,
+        ),
+    ] = ["md5"],
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", min=1, help="Number of parallel workers.")
+    ] = 1,
+    recursive: Annotated[
+        bool, typer.Option(help="Descend into sub directories.")
+    ] = True,
+    processes: Annotated[
+        bool, typer.Option(help="Use worker processes instead of threads.")
+    ] = False,
+    block_size: Annotated[
+        str,
+        typer.Option(
+            help="Read block size, e.g. 64K, 1M, or auto.", callback=parse_block_size
+        ),
+    ] = "auto",
+    read_mode: Annotated[
+        str,
+        typer.Option(
+            help=f"How files are read, one of {', '.join(READ_MODES)}.",
+            callback=validate_read_mode,
+        ),
+    ] = "read",
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache", help="Reuse digests of unchanged files from cache."
+        ),
+    ] = False,
+    cache_path: Annotated[
+        Optional[Path],
+        typer.Option(help="The hash cache database. Defaults to the app directory."),
+    ] = None,
+    cache_max_entries: Annotated[
+        Optional[int],
+        typer.Option(
+            min=1, help="Evict the oldest entries past this size. Defaults to 500,000."
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            help=f"Save progress, and resume interrupted runs. Needs {TREE_HASH_NAME}."
+        ),
+    ] = False,
+    checkpoint_dir: Annotated[
+        Optional[Path],
+        typer.Option(help="Where progress is saved. Defaults to the app directory."),
+    ] = None,
+):
+    """Hash many files in parallel, output in md5sum format.
+
+    Results are printed in input order, with directories expanded in sorted order.
+    With more than one --algo, output is in BSD tag format, one line per digest.
+    With --resume, progress on each file is saved, and an interrupted run picks
+    up where it left off. With --processes, --profile only times writing.
+    """
+    if use_cache and processes:
+        raise typer.BadParameter("--cache can't be used with --processes.")
+    if resume and (algo != [TREE_HASH_NAME] or use_cache):
+        raise typer.BadParameter(
+            f"--resume needs --algo {TREE_HASH_NAME}, and can't be used with --cache."
+        )
+    from pbs_parse.snippets.hash.multi_file_hash import (
+        collect_file_paths,
+        hash_files,
+        new_hasher,
+    )
+
+    hash_cache = open_hash_cache(ctx, use_cache, cache_path, cache_max_entries)
+    file_paths = collect_file_paths(paths, recursive=recursive)
+    hasher_factories = [partial(new_hasher, name) for name in dict.fromkeys(algo)]
+    if not processes:
+        # Timed hashers report to this process, so can't be used in workers.
+        hasher_factories = profiled_hasher_factories(ctx, hasher_factories)
+    results = hash_files(
+        file_paths,
+        hasher_factory=hasher_factories,
+        jobs=jobs,
+        block_size=block_size,  # type: ignore[arg-type]
+        use_processes=processes,
+        read_mode=read_mode,  # type: ignore[arg-type]
+        cache=hash_cache,
+        checkpoint_dir=(checkpoint_dir or default_checkpoint_dir()) if resume else None,
+    )
+    try:
+        for result in results:
+            with profile_phase(ctx, "write"):
+                if len(result.digests) == 1:
+                    typer.echo(f"{result.file_hash}  {result.file_path}")
+                    continue
+                for hash_method, file_hash in result.digests.items():
+                    typer.echo(
+                        f"{hash_method.upper()} ({result.file_path}) = {file_hash}"
+                    )
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def hash_algorithms():
+    """List the hash algorithms for --algo, and whether each is installed.
+
+    Install the optional fast algorithms with `pip install pbs-parse[fast]`.
+    """
+    from pbs_parse.snippets.hash.hash_registry import (
+        FAST_ALIAS,
+        REGISTRY,
+        UnavailableAlgorithmError,
+        algorithm_names,
+        new_hasher,
+        resolve_algorithm,
+    )
+
+    for name in algorithm_names():
+        notes = []
+        try:
+            if new_hasher(name).digest_size == 0:
+                notes.append("no fixed digest size")
+        except UnavailableAlgorithmError:
+            notes.append("not installed")
+        except ValueError:
+            notes.append("not supported")
+        if name in REGISTRY and not REGISTRY[name].cryptographic:
+            notes.append("not cryptographic")
+        typer.echo(f"{name:<14} {', '.join(notes)}".rstrip())
+    typer.echo(f"{FAST_ALIAS:<14} alias for {resolve_algorithm(FAST_ALIAS)}")
+
+
+WATCH_BACKENDS = ("auto", "inotify", "poll")
+
+
+def validate_watch_backend(value: str) -> str:
+    if value not in WATCH_BACKENDS:
+        raise typer.BadParameter(f"Must be one of {', '.join(WATCH_BACKENDS)}.")
+    return value
+
+
+@app.command()
+def watch(
+    directories: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Directories to watch.", exists=True, file_okay=False, dir_okay=True
+        ),
+    ],
+    algo: Annotated[
+        str,
+        typer.Option(
+            help="Hash algorithm, see `hash-algorithms`.", callback=validate_algorithm
+        ),
+    ] = "md5",
+    pattern: Annotated[
+        Optional[list[str]],
+        typer.Option(help="Only hash files whose name matches. Repeatable."),
+    ] = None,
+    recursive: Annotated[bool, typer.Option(help="Watch sub directories.")] = True,
+    settle: Annotated[
+        float,
+        typer.Option(min=0, help="Seconds a file must be unchanged before hashing."),
+    ] = 2.0,
+    poll_interval: Annotated[
+        float,
+        typer.Option(min=0.01, help="Seconds between scans, when polling."),
+    ] = 1.0,
+    backend: Annotated[
+        str,
+        typer.Option(
+            help=f"How changes are found, one of {', '.join(WATCH_BACKENDS)}.",
+            callback=validate_watch_backend,
+        ),
+    ] = "auto",
+    state_path: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--state", help="Records the files hashed. Defaults to the app directory."
+        ),
+    ] = None,
+    once: Annotated[
+        bool,
+        typer.Option(help="Hash what changed since the last run, and exit."),
+    ] = False,
 ):
-    hashcode = hash_file(path_in, md5())
-    typer.echo(f"{hashcode}  {path_in.name}")
+    """Hash new or changed files in directories, output in md5sum format.
+
+    A file is hashed once it has stopped changing for --settle seconds. Files
+    hashed by an earlier run, and unchanged since, are skipped, so a restart
+    only checks each file's size and modification time. Hidden files are ignored.
+    """
+    from pbs_parse.snippets.hash.dir_watch import DirectoryWatcher
+    from pbs_parse.snippets.hash.hash_cache import HashCache
+    from pbs_parse.snippets.hash.multi_file_hash import new_hasher
+
+    with HashCache(state_path or default_watch_state_path()) as state:
+        watcher = DirectoryWatcher(
+            directories,
+            state,
+            partial(new_hasher, algo),
+            settle=settle,
+            poll_interval=poll_interval,
+            recursive=recursive,
+            patterns=pattern or (),
+            backend=backend,  # type: ignore[arg-type]
+            on_error=lambda path, error: typer.echo(f"Error: {error}", err=True),
+        )
+        try:
+            for result in watcher.watch(once=once):
+                typer.echo(f"{result.file_hash}  {result.file_path}")
+        except KeyboardInterrupt:
+            pass
+        except OSError as error:
+            typer.echo(f"Error: {error}", err=True)
+            raise typer.Exit(code=1)
+
+
+@app.command()
+def hash_benchmark(
+    ctx: typer.Context,
+    path_in: Annotated[Path, typer.Argument(help="file to hash.")],
+    algo: Annotated[
+        list[str],
+        typer.Option(help="Hash algorithms to try.", callback=validate_algorithms),
+    ] = ["md5"],
+    block_size: Annotated[
+        list[str],
+        typer.Option(
+            help="Block sizes to try, e.g. 64K, 1M, or auto.",
+            callback=parse_block_sizes,
+        ),
+    ] = DEFAULT_BENCHMARK_BLOCK_SIZES,
+    read_mode: Annotated[
+        list[str],
+        typer.Option(help="Read modes to try.", callback=validate_read_modes),
+    ] = ["read"],
+    repeat: Annotated[
+        int, typer.Option(min=1, help="Runs per combination, the best is reported.")
+    ] = 3,
+):
+    """Measure hashing throughput for a file across block sizes and algorithms.
+
+    Runs after the first read from the page cache, use a file larger than RAM to
+    include the storage speed.
+    """
+    from pbs_parse.snippets.hash.hash_benchmark import benchmark_hash_file
+
+    size = path_in.stat().st_size
+    typer.echo(f"{path_in.name}: {size:,} bytes, best of {repeat}")
+    typer.echo(f"{'algorithm':<12} {'block size':>12} {'read mode':<10} {'MB/s':>10}")
+    results = benchmark_hash_file(
+        path_in,
+        algorithms=algo,
+        block_sizes=block_size,  # type: ignore[arg-type]
+        read_modes=read_mode,  # type: ignore[arg-type]
+        repeat=repeat,
+    )
+    for result in results:
+        typer.echo(
+            f"{result.hash_method:<12} {result.block_size:>12,} "
+            f"{result.read_mode:<10} {result.mb_per_second:>10,.1f}"
+        )
+
+
+def parse_cache_size(value: str) -> int:
+    cache_size = parse_block_size(value)
+    if cache_size == "auto":
+        raise typer.BadParameter("Cache size must be a size, e.g. 1G.")
+    return cache_size
+
+
+def parse_chunk_size(value: str) -> int:
+    chunk_size = parse_block_size(value)
+    if chunk_size == "auto" or chunk_size >= 2**32:
+        raise typer.BadParameter("Chunk size must be a size less than 4G.")
+    return chunk_size
+
+
+def parse_sample_size(value: str) -> int:
+    sample_size = parse_block_size(value)
+    if sample_size == "auto":
+        raise typer.BadParameter("Sample size must be a size, e.g. 4K.")
+    return sample_size
+
+
+@app.command()
+def dedupe(
+    ctx: typer.Context,
+    paths: Annotated[
+        list[str], typer.Argument(help="Files, directories, or glob patterns.")
+    ],
+    algo: Annotated[
+        str,
+        typer.Option(
+            help="Hash algorithm, see `hash-algorithms`.", callback=validate_algorithm
+        ),
+    ] = "md5",
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", min=1, help="Number of parallel readers.")
+    ] = 1,
+    recursive: Annotated[
+        bool, typer.Option(help="Descend into sub directories.")
+    ] = True,
+    sample_size: Annotated[
+        str,
+        typer.Option(
+            help="Bytes compared at each end of a file, before hashing it whole.",
+            callback=parse_sample_size,
+        ),
+    ] = "4K",
+    min_size: Annotated[
+        int, typer.Option(min=0, help="Skip files smaller than this many bytes.")
+    ] = 1,
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache", help="Reuse digests of unchanged files from cache."
+        ),
+    ] = False,
+    cache_path: Annotated[
+        Optional[Path],
+        typer.Option(help="The hash cache database. Defaults to the app directory."),
+    ] = None,
+):
+    """Find duplicate files, output in md5sum format, one group per paragraph.
+
+    Files are compared by size, then by a digest of their first and last
+    --sample-size bytes, and only files that still match are hashed whole.
+    Hard links to the same file are not duplicates. A summary is printed to
+    stderr.
+    """
+    from pbs_parse.snippets.hash.dedupe import DedupeStats, find_duplicates
+    from pbs_parse.snippets.hash.multi_file_hash import collect_file_paths, new_hasher
+
+    hash_cache = open_hash_cache(ctx, use_cache, cache_path, None)
+    stats = DedupeStats()
+    try:
+        with profile_phase(ctx, "hash"):
+            groups = find_duplicates(
+                collect_file_paths(paths, recursive=recursive),
+                partial(new_hasher, algo),
+                jobs=jobs,
+                sample_size=sample_size,  # type: ignore[arg-type]
+                min_size=min_size,
+                cache=hash_cache,
+                stats=stats,
+            )
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    with profile_phase(ctx, "write"):
+        for index, group in enumerate(groups):
+            if index:
+                typer.echo()
+            for file_path in group.file_paths:
+                typer.echo(f"{group.file_hash}  {file_path}")
+    typer.echo(
+        f"{len(groups)} groups of duplicates, "
+        f"{sum(group.wasted_bytes for group in groups):,} bytes in extra copies. "
+        f"Read {stats.bytes_read:,} bytes to compare {stats.files:,} files "
+        f"of {stats.total_bytes:,} bytes.",
+        err=True,
+    )
+    if stats.skipped:
+        typer.echo(f"Skipped {stats.skipped:,} files that could not be read.", err=True)
+
+
+@app.command()
+def tree_hash(
+    ctx: typer.Context,
+    path_in: Annotated[Path, typer.Argument(help="file to hash.")],
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", min=1, help="Chunks hashed in parallel.")
+    ] = 1,
+    chunk_size: Annotated[
+        str,
+        typer.Option(help="Chunk size, e.g. 8M.", callback=parse_chunk_size),
+    ] = DEFAULT_CHUNK_SIZE,
+    chunks_out: Annotated[
+        Optional[Path],
+        typer.Option(help="Save the per-chunk digests to this JSON file."),
+    ] = None,
+    verify: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Compare against per-chunk digests saved with --chunks-out, "
+            "and list the chunks that changed."
+        ),
+    ] = None,
+):
+    """Hash one large file in parallel chunks, with a blake2b tree hash.
+
+    The root digest matches `hash --algo blake2b-tree` for the default chunk size.
+    """
+    import json
+    from dataclasses import asdict
+
+    from pbs_parse.snippets.hash.tree_hash import (
+        TreeHashResult,
+        find_corrupt_chunks,
+        hash_file_tree,
+    )
+
+    try:
+        if verify is not None:
+            try:
+                saved = json.loads(verify.read_text())
+                expected = TreeHashResult(
+                    **{**saved, "file_path": Path(saved["file_path"])}
+                )
+            except (KeyError, TypeError) as error:
+                raise ValueError(f"{verify} is not a chunks file: {error!r}") from error
+            corrupt = find_corrupt_chunks(path_in, expected, jobs=jobs)
+        else:
+            with profile_phase(ctx, "hash", byte_count=path_in.stat().st_size):
+                result = hash_file_tree(
+                    path_in, chunk_size=chunk_size, jobs=jobs  # type: ignore[arg-type]
+                )
+            if chunks_out is not None:
+                chunks_out.write_text(
+                    json.dumps({**asdict(result), "file_path": str(result.file_path)})
+                )
+    except (OSError, ValueError) as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    if verify is not None:
+        for index in corrupt:
+            start, end = expected.chunk_range(index)
+            typer.echo(f"{path_in}: chunk {index} (bytes {start}-{end}) FAILED")
+        if corrupt:
+            raise typer.Exit(code=1)
+        typer.echo(f"{path_in}: OK")
+        return
+    typer.echo(f"{result.file_hash}  {path_in.name}")
+
+
+@cache_app.command()
+def invalidate(
+    paths: Annotated[
+        Optional[list[Path]],
+        typer.Argument(help="Files or directories to remove from the hash cache."),
+    ] = None,
+    all_entries: Annotated[
+        bool, typer.Option("--all", help="Remove every entry.")
+    ] = False,
+    cache_path: Annotated[
+        Optional[Path],
+        typer.Option(help="The hash cache database. Defaults to the app directory."),
+    ] = None,
+):
+    """Remove entries from the hash cache, so those files are hashed again."""
+    if not paths and not all_entries:
+        raise typer.BadParameter("Give paths to invalidate, or --all.")
+    from pbs_parse.snippets.hash.hash_cache import HashCache
+
+    with HashCache(cache_path or default_hash_cache_path()) as hash_cache:
+        removed = hash_cache.invalidate(None if all_entries else paths)
+    typer.echo(f"Removed {removed} entries from {hash_cache.db_path}")
+
+
+@cache_app.command()
+def clear(
+    cache_dir: Annotated[
+        Optional[Path],
+        typer.Option(help="The parse cache directory. Defaults to the app directory."),
+    ] = None,
+):
+    """Remove every parsed bid package from the parse cache."""
+    from pbs_parse.bid_package.parse_cache import ParseCache
+
+    parse_cache = ParseCache(cache_dir or default_parse_cache_dir())
+    removed = parse_cache.clear()
+    typer.echo(f"Removed {removed} entries from {parse_cache.cache_dir}")
+
+
+@manifest_app.command("create")
+def manifest_create(
+    ctx: typer.Context,
+    root: Annotated[Path, typer.Argument(help="The directory to hash.")],
+    output: Annotated[
+        Path, typer.Option("--output", "-o", help="The manifest file to write.")
+    ],
+    algo: Annotated[
+        str, typer.Option(help="Hash algorithm.", callback=validate_algorithm)
+    ] = "md5",
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", min=1, help="Number of parallel workers.")
+    ] = 1,
+    block_size: Annotated[
+        str,
+        typer.Option(
+            help="Read block size, e.g. 64K, 1M, or auto.", callback=parse_block_size
+        ),
+    ] = "auto",
+):
+    """Hash every file below ROOT, and write a manifest.
+
+    Names are relative to ROOT, check the manifest from ROOT with `md5sum -c`, or
+    `manifest verify --root ROOT`.
+
+    The manifest is written under a temporary name, and renamed when it is
+    complete, so a failed run leaves any earlier manifest in place.
+    """
+    import os
+
+    from pbs_parse.snippets.hash.manifest import write_manifest
+    from pbs_parse.snippets.hash.multi_file_hash import new_hasher
+
+    (hasher_factory,) = profiled_hasher_factories(ctx, [partial(new_hasher, algo)])
+    temp_path = output.with_name(f".tmp-{output.name}")
+    try:
+        try:
+            with open(temp_path, "w", encoding="utf-8", newline="\n") as manifest:
+                count = write_manifest(
+                    root,
+                    manifest,
+                    hasher_factory=hasher_factory,
+                    jobs=jobs,
+                    block_size=block_size,  # type: ignore[arg-type]
+                    exclude=[output, temp_path],
+                )
+            os.replace(temp_path, output)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Wrote {count} entries to {output}")
+
+
+@manifest_app.command("verify")
+def manifest_verify(
+    ctx: typer.Context,
+    manifest_path: Annotated[Path, typer.Argument(help="The manifest to check.")],
+    root: Annotated[
+        Path, typer.Option(help="Names are relative to this directory.")
+    ] = Path("."),
+    algo: Annotated[
+        str, typer.Option(help="Hash algorithm.", callback=validate_algorithm)
+    ] = "md5",
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", min=1, help="Number of parallel workers.")
+    ] = 1,
+    block_size: Annotated[
+        str,
+        typer.Option(
+            help="Read block size, e.g. 64K, 1M, or auto.", callback=parse_block_size
+        ),
+    ] = "auto",
+    fail_fast: Annotated[
+        bool, typer.Option(help="Stop at the first file that fails.")
+    ] = False,
+    quiet: Annotated[
+        bool, typer.Option("--quiet", "-q", help="Don't print OK for each file.")
+    ] = False,
+):
+    """Check the files listed in a manifest, like `md5sum -c`."""
+    from pbs_parse.snippets.hash.manifest import verify_manifest
+    from pbs_parse.snippets.hash.multi_file_hash import new_hasher
+
+    (hasher_factory,) = profiled_hasher_factories(ctx, [partial(new_hasher, algo)])
+    failed = 0
+    try:
+        with open(manifest_path, encoding="utf-8", newline="\n") as manifest:
+            checks = verify_manifest(
+                manifest,
+                root,
+                hasher_factory=hasher_factory,
+                jobs=jobs,
+                block_size=block_size,  # type: ignore[arg-type]
+            )
+            try:
+                for check in checks:
+                    if check.status == "OK":
+                        if not quiet:
+                            typer.echo(f"{check.file_path}: OK")
+                        continue
+                    failed += 1
+                    reason = (
+                        "FAILED" if check.status == "FAILED" else "FAILED open or read"
+                    )
+                    typer.echo(f"{check.file_path}: {reason}")
+                    if fail_fast:
+                        break
+            except ValueError as error:
+                typer.echo(f"{manifest_path}: {error}", err=True)
+                raise typer.Exit(code=1)
+            finally:
+                checks.close()
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    if failed:
+        typer.echo(f"WARNING: {failed} files did NOT match", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def parse(
+    ctx: typer.Context,
+    path_in: Annotated[
+        Path, typer.Argument(help="The bid package to parse, or - for stdin.")
+    ],
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output", "-o", help="Write to this file, instead of to stdout."
+        ),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Number of worker processes."),
+    ] = 1,
+    member: Annotated[
+        Optional[str],
+        typer.Option(help="The zip member to parse. Defaults to the first file."),
+    ] = None,
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache", help="Reuse the output for unchanged bid packages."
+        ),
+    ] = True,
+    cache_dir: Annotated[
+        Optional[Path],
+        typer.Option(help="The parse cache directory. Defaults to the app directory."),
+    ] = None,
+    cache_max_size: Annotated[
+        str,
+        typer.Option(
+            help="Remove the least recently used entries past this size.",
+            callback=parse_cache_size,
+        ),
+    ] = DEFAULT_PARSE_CACHE_SIZE,
+):
+    """Parse a bid package, and output each pairing as a line of JSON.
+
+    With --jobs, the file is split at pairings, and parsed in parallel. The
+    output is the same as a serial parse.
+
+    The output is cached, keyed on the content of the bid package and the parser
+    version. An unchanged bid package is recognized from the hash cache, without
+    reading it again.
+
+    Stdin, and gzip, bz2, xz, or zip compressed bid packages, are decompressed
+    while they are parsed, serially, and without the cache.
+    """
+    from pbs_parse.bid_package.parser import ParseError
+    from pbs_parse.snippets.hash.stream_input import (
+        STREAM_ERRORS,
+        detect_file_compression,
+    )
+
+    timer = get_profiler(ctx)
+    try:
+        streamed = str(path_in) == STDIN or detect_file_compression(path_in) is not None
+        if streamed:
+            from pbs_parse.bid_package.parser import parse_bid_package_input
+            from pbs_parse.bid_package.serialize import pairing_to_json
+
+            if jobs > 1:
+                raise typer.BadParameter(
+                    "--jobs needs an uncompressed bid package file."
+                )
+            json_lines = map(pairing_to_json, parse_bid_package_input(path_in, member))
+        elif use_cache:
+            from pbs_parse.bid_package.parse_cache import (
+                ParseCache,
+                cached_parse_json_lines,
+            )
+
+            parse_cache = ParseCache(
+                cache_dir or default_parse_cache_dir(),
+                max_bytes=cache_max_size,  # type: ignore[arg-type]
+            )
+            hash_cache = open_hash_cache(ctx, True, None, None)
+            json_lines = cached_parse_json_lines(
+                path_in, parse_cache, hash_cache=hash_cache, jobs=jobs
+            )
+        else:
+            from pbs_parse.bid_package.parallel import map_pairings_parallel
+            from pbs_parse.bid_package.serialize import pairing_to_json
+
+            json_lines = map_pairings_parallel(path_in, pairing_to_json, jobs=jobs)
+        if timer is not None:
+            json_lines = timer.iterate(json_lines, "parse", size=None)
+            if not streamed:
+                timer.add("parse", 0, path_in.stat().st_size, calls=0)
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    try:
+        output_context = (
+            open(output, "w", encoding="utf-8") if output else nullcontext(sys.stdout)
+        )
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    with output_context as file_out:
+        try:
+            for json_line in json_lines:
+                with profile_phase(ctx, "write"):
+                    file_out.write(json_line + "\n")
+        except (ParseError, *STREAM_ERRORS) as error:
+            typer.echo(f"{path_in}: {error}", err=True)
+            raise typer.Exit(code=1)
+
+
+EXPORT_FORMATS = ("parquet", "arrow")
+
+
+def validate_export_format(value: str) -> str:
+    if value not in EXPORT_FORMATS:
+        raise typer.BadParameter(
+            f"Export format must be one of {', '.join(EXPORT_FORMATS)}."
+        )
+    return value
+
+
+@app.command()
+def export(
+    ctx: typer.Context,
+    path_in: Annotated[Path, typer.Argument(help="The bid package to export.")],
+    output: Annotated[
+        Path,
+        typer.Option("--output", "-o", help="The directory to write the tables to."),
+    ],
+    file_format: Annotated[
+        str,
+        typer.Option(
+            "--format",
+            help="parquet, or arrow for Arrow IPC files.",
+            callback=validate_export_format,
+        ),
+    ] = "parquet",
+    batch_size: Annotated[
+        int, typer.Option(min=1, help="Pairings written in each batch.")
+    ] = 10000,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Number of worker processes."),
+    ] = 1,
+    use_cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache", help="Reuse the pairings for unchanged bid packages."
+        ),
+    ] = True,
+    cache_dir: Annotated[
+        Optional[Path],
+        typer.Option(help="The parse cache directory. Defaults to the app directory."),
+    ] = None,
+):
+    """Parse a bid package, and write the pairings, dates, duty periods, and legs
+    as columnar tables, joined by ids.
+
+    Each table is a Parquet, or Arrow IPC, file in the output directory. Requires
+    pyarrow, install with `pip install pbs-parse[arrow]`.
+    """
+    from pbs_parse.bid_package.export import export_pairings
+    from pbs_parse.bid_package.parser import ParseError
+
+    try:
+        if use_cache:
+            from pbs_parse.bid_package.parse_cache import (
+                ParseCache,
+                cached_parse_bid_package,
+            )
+
+            hash_cache = open_hash_cache(ctx, True, None, None)
+            pairings = cached_parse_bid_package(
+                path_in,
+                ParseCache(cache_dir or default_parse_cache_dir()),
+                hash_cache=hash_cache,
+                jobs=jobs,
+            )
+        else:
+            from pbs_parse.bid_package.parallel import parse_bid_package_parallel
+
+            pairings = parse_bid_package_parallel(path_in, jobs=jobs)
+        with profile_phase(ctx, "export", path_in.stat().st_size):
+            rows = export_pairings(
+                pairings,
+                output,
+                file_format,  # type: ignore[arg-type]
+                batch_size=batch_size,
+            )
+    except ParseError as error:
+        typer.echo(f"{path_in}: {error}", err=True)
+        raise typer.Exit(code=1)
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    except ImportError as error:
+        # pyarrow is an optional dependency.
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    for table, count in rows.items():
+        typer.echo(f"{table}: {count:,} rows")
+
+
+@app.command()
+def index(
+    path_in: Annotated[Path, typer.Argument(help="The bid package to index.")],
+    index_path: Annotated[
+        Optional[Path],
+        typer.Option(help="The index file. Defaults to a file next to the package."),
+    ] = None,
+):
+    """Build the sidecar index used by `lookup`, replacing any existing index."""
+    from pbs_parse.bid_package.index import build_index, default_index_path
+    from pbs_parse.bid_package.parser import ParseError
+
+    try:
+        count = build_index(path_in, index_path)
+    except ParseError as error:
+        typer.echo(f"{path_in}: {error}", err=True)
+        raise typer.Exit(code=1)
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(
+        f"Indexed {count:,} pairings in {index_path or default_index_path(path_in)}"
+    )
+
+
+@app.command()
+def lookup(
+    path_in: Annotated[Path, typer.Argument(help="The bid package.")],
+    numbers: Annotated[
+        Optional[list[str]], typer.Argument(help="Pairing numbers to show.")
+    ] = None,
+    base: Annotated[
+        Optional[str], typer.Option(help="Only pairings from this base.")
+    ] = None,
+    equipment: Annotated[
+        Optional[str], typer.Option(help="Only pairings with this equipment.")
+    ] = None,
+    date: Annotated[
+        Optional[str],
+        typer.Option(help="Only pairings operating on this date, e.g. 01NOV."),
+    ] = None,
+    index_path: Annotated[
+        Optional[Path],
+        typer.Option(help="The index file. Defaults to a file next to the package."),
+    ] = None,
+    verify: Annotated[
+        bool,
+        typer.Option(help="Check the package digest, even if it looks unchanged."),
+    ] = False,
+):
+    """Show pairings as lines of JSON, reading only those pairings from the package.
+
+    Uses the sidecar index, which is built first if it is missing, or does not
+    match the package.
+    """
+    from pbs_parse.bid_package.index import open_index, read_pairing
+    from pbs_parse.bid_package.parser import ParseError
+    from pbs_parse.bid_package.serialize import pairing_to_json
+
+    if not numbers and base is None and equipment is None and date is None:
+        raise typer.BadParameter(
+            "Give pairing numbers, --base, --equipment, or --date."
+        )
+    try:
+        with open_index(path_in, index_path, verify=verify) as package_index:
+            entries = [
+                entry
+                for number in numbers or [None]
+                for entry in package_index.find(number, base, equipment, date)
+            ]
+        for entry in entries:
+            typer.echo(pairing_to_json(read_pairing(path_in, entry)))
+    except ParseError as error:
+        typer.echo(f"{path_in}: {error}", err=True)
+        raise typer.Exit(code=1)
+    except OSError as error:
+        typer.echo(f"Error: {error}", err=True)
+        raise typer.Exit(code=1)
+    if not entries:
+        typer.echo("No matching pairings.", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def serve(
+    socket_path: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--socket", help="Listen on this Unix socket, instead of stdin and stdout."
+        ),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs", "-j", min=1, help="Files hashed or parsed at the same time."
+        ),
+    ] = 4,
+):
+    """Answer hash and parse requests sent as JSON lines, from one warm process.
+
+    Send one JSON object per line, e.g. {"id": 1, "op": "hash", "path": "a.txt"}.
+    Each response is one line, with the same id, and its latency. Requests run
+    concurrently, so responses can be out of order.
+
+    Reads stdin until it ends, or with --socket, serves clients until a
+    {"op": "shutdown"} request.
+    """
+    import asyncio
+
+    from pbs_parse.server.jsonl_server import serve_stream, serve_unix_socket
+
+    if socket_path is None:
+        asyncio.run(serve_stream(sys.stdin, sys.stdout, jobs=jobs))
+        return
+
+    def on_ready() -> None:
+        typer.echo(f"Listening on {socket_path}", err=True)
+
+    try:
+        asyncio.run(serve_unix_socket(socket_path, jobs=jobs, on_ready=on_ready))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""A long running server, that answers requests without starting a new process."""
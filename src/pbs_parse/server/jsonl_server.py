@@ -0,0 +1,277 @@
+"""
+Answer requests sent as JSON lines, from one long running process.
+
+Each request is a JSON object on its own line, with an `op`, and an optional
+`id` that is copied to the response::
+
+    {"id": 1, "op": "hash", "path": "packages/2026-11.txt", "algo": "sha256"}
+
+Each response is a JSON object on its own line::
+
+    {"id": 1, "ok": true, "result": {...}, "latency_ms": 0.41}
+    {"id": 2, "ok": false, "error": "FileNotFoundError: ...", "latency_ms": 0.05}
+
+Requests run concurrently, so responses can arrive out of order. Match them to
+requests with `id`. `latency_ms` is the time from reading the request, to
+writing the response.
+
+Operations:
+    ping: Returns an empty result.
+    hash: Hashes `path`, with `algo` (default `md5`), and `block_size` (default
+        `auto`).
+    parse: Parses the bid package at `path`, and returns the number of pairings,
+        duty periods, and legs. With `records` true, also returns the pairings.
+    stats: The number of requests and errors so far, and their mean latency.
+    shutdown: Stops the socket server, after answering. Reading from a stream
+        stops at the end of the input.
+
+Add an operation with :py:func:`operation`.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Awaitable, Callable, TextIO
+
+from pbs_parse.bid_package.parser import parse_bid_package_file
+from pbs_parse.bid_package.serialize import pairing_to_dict
+from pbs_parse.snippets.hash.async_hash import make_hashed_file_async
+from pbs_parse.snippets.hash.multi_file_hash import new_hasher
+
+DEFAULT_JOBS = 4
+
+
+@dataclass
+class ServerState:
+    """State shared by every request, and every connection."""
+
+    limiter: asyncio.Semaphore
+    stopped: asyncio.Event = field(default_factory=asyncio.Event)
+    requests: int = 0
+    errors: int = 0
+    total_latency_ns: int = 0
+
+
+Operation = Callable[[dict[str, Any], ServerState], Awaitable[dict[str, Any]]]
+OPERATIONS: dict[str, Operation] = {}
+
+
+def operation(name: str) -> Callable[[Operation], Operation]:
+    """Register a coroutine function as the handler for requests with `op` name."""
+
+    def register(handler: Operation) -> Operation:
+        OPERATIONS[name] = handler
+        return handler
+
+    return register
+
+
+@operation("ping")
+async def ping(request: dict[str, Any], state: ServerState) -> dict[str, Any]:
+    return {}
+
+
+@operation("stats")
+async def stats(request: dict[str, Any], state: ServerState) -> dict[str, Any]:
+    mean_ns = state.total_latency_ns / state.requests if state.requests else 0
+    return {
+        "requests": state.requests,
+        "errors": state.errors,
+        "mean_latency_ms": mean_ns / 1e6,
+    }
+
+
+@operation("shutdown")
+async def shutdown(request: dict[str, Any], state: ServerState) -> dict[str, Any]:
+    state.stopped.set()
+    return {}
+
+
+@operation("hash")
+async def hash_path(request: dict[str, Any], state: ServerState) -> dict[str, Any]:
+    result = await make_hashed_file_async(
+        Path(request["path"]),
+        new_hasher(request.get("algo", "md5")),
+        block_size=request.get("block_size", "auto"),
+        limiter=state.limiter,
+    )
+    return {
+        "file_path": str(result.file_path),
+        "file_hash": result.file_hash,
+        "hash_method": result.hash_method,
+    }
+
+
+def _parse_summary(file_path: Path, records: bool) -> dict[str, Any]:
+    counts = {"pairings": 0, "duty_periods": 0, "legs": 0}
+    pairings = []
+    for pairing in parse_bid_package_file(file_path):
+        counts["pairings"] += 1
+        counts["duty_periods"] += len(pairing.duty_periods)
+        counts["legs"] += sum(len(duty.legs) for duty in pairing.duty_periods)
+        if records:
+            pairings.append(pairing_to_dict(pairing))
+    result: dict[str, Any] = {"file_path": str(file_path), **counts}
+    if records:
+        result["records"] = pairings
+    return result
+
+
+@operation("parse")
+async def parse_path(request: dict[str, Any], state: ServerState) -> dict[str, Any]:
+    async with state.limiter:
+        return await asyncio.to_thread(
+            _parse_summary, Path(request["path"]), bool(request.get("records"))
+        )
+
+
+async def handle_line(line: str, state: ServerState) -> dict[str, Any]:
+    """
+    Answer one request.
+
+    Errors are reported in the response, they don't stop the server.
+
+    Args:
+        line: The request, as a line of JSON.
+        state: The server state.
+
+    Returns:
+        The response.
+    """
+    start = perf_counter_ns()
+    request_id = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a JSON object.")
+        request_id = request.get("id")
+        handler = OPERATIONS.get(request.get("op"))
+        if handler is None:
+            raise ValueError(f"Unknown op {request.get('op')!r}.")
+        response = {
+            "id": request_id,
+            "ok": True,
+            "result": await handler(request, state),
+        }
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        # Any error is the answer to this request, the server keeps running.
+        state.errors += 1
+        response = {
+            "id": request_id,
+            "ok": False,
+            "error": f"{type(error).__name__}: {error}",
+        }
+    elapsed_ns = perf_counter_ns() - start
+    state.requests += 1
+    state.total_latency_ns += elapsed_ns
+    response["latency_ms"] = elapsed_ns / 1e6
+    return response
+
+
+async def serve_lines(
+    read_line: Callable[[], Awaitable[str]],
+    write_line: Callable[[str], Awaitable[None]],
+    state: ServerState,
+) -> None:
+    """
+    Answer requests until the input ends.
+
+    Each request is answered in its own task, so a slow request doesn't hold up
+    the ones after it. Returns after every request has been answered.
+
+    Args:
+        read_line: Reads the next line, or "" at the end of the input.
+        write_line: Writes a line, without the newline.
+        state: The server state.
+    """
+
+    async def respond(line: str) -> None:
+        response = await handle_line(line, state)
+        await write_line(json.dumps(response))
+
+    pending: set[asyncio.Task] = set()
+    while line := await read_line():
+        if not line.strip():
+            continue
+        task = asyncio.create_task(respond(line))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+
+async def serve_stream(
+    input_stream: TextIO, output_stream: TextIO, jobs: int = DEFAULT_JOBS
+) -> ServerState:
+    """
+    Answer requests read from a text stream, e.g. stdin, until it ends.
+
+    Args:
+        input_stream: Requests are read from this stream.
+        output_stream: Responses are written, and flushed, to this stream.
+        jobs: The most files hashed or parsed at the same time. Defaults to 4.
+
+    Returns:
+        The server state, with the request counts.
+    """
+    state = ServerState(asyncio.Semaphore(jobs))
+
+    async def read_line() -> str:
+        return await asyncio.to_thread(input_stream.readline)
+
+    async def write_line(text: str) -> None:
+        output_stream.write(text + "\n")
+        output_stream.flush()
+
+    await serve_lines(read_line, write_line, state)
+    return state
+
+
+async def serve_unix_socket(
+    socket_path: Path,
+    jobs: int = DEFAULT_JOBS,
+    on_ready: Callable[[], None] | None = None,
+) -> ServerState:
+    """
+    Answer requests from clients of a Unix socket, until a `shutdown` request.
+
+    Each client can send many requests, and requests from every client share
+    the same `jobs` limit. The socket file is removed when the server stops.
+
+    Args:
+        socket_path: The socket file to create.
+        jobs: The most files hashed or parsed at the same time. Defaults to 4.
+        on_ready: Called once the socket accepts connections. Defaults to None.
+
+    Returns:
+        The server state, with the request counts.
+    """
+    state = ServerState(asyncio.Semaphore(jobs))
+
+    async def serve_client(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        async def read_line() -> str:
+            return (await reader.readline()).decode()
+
+        async def write_line(text: str) -> None:
+            writer.write(text.encode() + b"\n")
+            await writer.drain()
+
+        try:
+            await serve_lines(read_line, write_line, state)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(serve_client, path=socket_path)
+    try:
+        if on_ready is not None:
+            on_ready()
+        await state.stopped.wait()
+    finally:
+        # Clients still connected are cancelled when the event loop closes.
+        server.close()
+        socket_path.unlink(missing_ok=True)
+    return state
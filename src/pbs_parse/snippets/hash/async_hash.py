@@ -0,0 +1,161 @@
+####################################################
+#                                                  #
+#       src/snippets/hash/async_hash.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T10:20:03-07:00            #
+# Last Modified: 2026-10-18T17:20:03.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Hash files and byte streams from asyncio code without blocking the event loop.
+
+File reads and large hasher updates run in the default executor's threads.
+:py:mod:`hashlib` releases the GIL while hashing, so the event loop keeps running
+while a file is hashed.
+
+Pass the same :py:class:`asyncio.Semaphore` as `limiter` to every call to cap the
+number of hashing jobs running at once, and keep executor threads free for
+other work.
+"""
+
+import asyncio
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterable, Callable, Iterable
+
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    HashedFileProtocol,
+    ReadMode,
+    hash_file,
+    hashed_file_result_factory,
+)
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+OFFLOAD_SIZE = 2**20
+
+
+async def hash_file_async(
+    file_path: Path,
+    hasher: "_Hash",
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+    limiter: asyncio.Semaphore | None = None,
+) -> str:
+    """
+    Calculate the hash digest for a file as a hexidecimal string.
+
+    The file is read and hashed in a worker thread.
+
+    Args:
+        file_path: The path for a file to be opened in binary mode.
+        hasher: The hasher used to generate the hexdigest.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file. Defaults to `read`.
+        limiter: Held while the file is hashed. Defaults to None.
+
+    Returns:
+        A hexidecimal string representing the file hash.
+    """
+    async with limiter or nullcontext():
+        return await asyncio.to_thread(
+            hash_file,
+            file_path=file_path,
+            hasher=hasher,
+            block_size=block_size,
+            read_mode=read_mode,
+        )
+
+
+async def make_hashed_file_async(
+    file_path: Path,
+    hasher: "_Hash",
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    result_factory: Callable[
+        [Path, str, str], HashedFileProtocol
+    ] = hashed_file_result_factory,
+    read_mode: ReadMode = "read",
+    limiter: asyncio.Semaphore | None = None,
+) -> HashedFileProtocol:
+    hash_str = await hash_file_async(
+        file_path=file_path,
+        hasher=hasher,
+        block_size=block_size,
+        read_mode=read_mode,
+        limiter=limiter,
+    )
+    return result_factory(file_path, hash_str, hasher.name)
+
+
+async def hash_files_async(
+    file_paths: Iterable[Path],
+    hasher_factory: Callable[[], "_Hash"],
+    concurrency: int = 4,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> list[HashedFileProtocol]:
+    """
+    Hash files concurrently, with at most `concurrency` files hashed at once.
+
+    Args:
+        file_paths: The files to hash.
+        hasher_factory: Called once per file to make a new hasher.
+        concurrency: The most files hashed at the same time. Defaults to 4.
+        block_size: The block size used to read the files, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the files. Defaults to `read`.
+
+    Returns:
+        A :py:class:`HashedFile` for each file, in input order.
+    """
+    limiter = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *(
+            make_hashed_file_async(
+                file_path=file_path,
+                hasher=hasher_factory(),
+                block_size=block_size,
+                read_mode=read_mode,
+                limiter=limiter,
+            )
+            for file_path in file_paths
+        )
+    )
+
+
+async def async_bytes_iterator_hash(
+    bytes_iterator: AsyncIterable[bytes],
+    hasher: "_Hash",
+    limiter: asyncio.Semaphore | None = None,
+    offload_size: int = OFFLOAD_SIZE,
+) -> str:
+    """
+    Get the hash digest of an async bytes iterator as a hexidecimal string.
+
+    Use this to hash data as it streams in, e.g. from a download. Small blocks
+    are hashed on the event loop, where they take microseconds. Blocks of
+    `offload_size` or more are hashed in a worker thread.
+
+    Args:
+        bytes_iterator: The async byte iterator
+        hasher: The hash function from :py:mod:`hashlib`
+        limiter: Held while a block is hashed in a worker thread. Defaults to None.
+        offload_size: The smallest block hashed in a worker thread.
+            Defaults to 2**20 (1M).
+
+    Returns:
+         The hexidecimal str from `hexdigest()`
+    """
+    async for block in bytes_iterator:
+        if len(block) < offload_size:
+            hasher.update(block)
+            continue
+        async with limiter or nullcontext():
+            await asyncio.to_thread(hasher.update, block)
+    return hasher.hexdigest()
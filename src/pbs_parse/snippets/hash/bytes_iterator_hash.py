@@ -5,11 +5,11 @@
 ####################################################
 # Created by: Chad Lowe                            #
 # Created on: 2023-02-28T08:31:31-07:00            #
-# Last Modified: 2023-02-28T15:36:17.990172+00:00  #
+# Last Modified: 2026-10-18T17:02:44.530871+00:00  #
 # Source: https://github.com/DonalChilde/snippets  #
 ####################################################
 
-from typing import TYPE_CHECKING, Iterator
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 if TYPE_CHECKING:
     from hashlib import _Hash
@@ -36,3 +36,28 @@ def bytes_iterator_hash(
     for block in bytes_iterator:
         hasher.update(block)
     return hasher.hexdigest()
+
+
+def bytes_iterator_multi_hash(
+    bytes_iterator: Iterator[bytes],
+    hashers: Iterable["_Hash"],
+) -> dict[str, str]:
+    """
+    Get several hash digests of a bytes iterator in a single pass.
+
+    Each block is fed to every hasher before the next block is read, so adding a
+    hasher costs CPU time, but no extra I/O.
+
+    Args:
+        bytes_iterator: The byte iterator
+        hashers: The hash functions from :py:mod:`hashlib`, with unique names.
+
+    Returns:
+        A dict of hasher name to the hexidecimal str from `hexdigest()`, in the
+        same order as `hashers`.
+    """
+    hashers = list(hashers)
+    for block in bytes_iterator:
+        for hasher in hashers:
+            hasher.update(block)
+    return {hasher.name: hasher.hexdigest() for hasher in hashers}
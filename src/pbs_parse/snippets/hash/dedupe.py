@@ -0,0 +1,232 @@
+####################################################
+#                                                  #
+#     src/snippets/hash/dedupe.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T13:05:12-07:00            #
+# Last Modified: 2026-10-18T20:05:12.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Find duplicate files, reading as few bytes as possible.
+
+Files are compared in three rounds, and each round only keeps the files that
+still collide with another file:
+
+1. Size, from `stat`, without reading the files.
+2. A digest of the first, and last, `sample_size` bytes.
+3. A digest of the whole file, with
+   :py:func:`~pbs_parse.snippets.hash.multi_file_hash.hash_files`.
+
+A file no larger than twice `sample_size` is read whole in the second round, so
+its sample digest is its full digest, and it is not read again. Hard links are
+not copies, so only the first path to each file is compared. A file that can't
+be read, e.g. one removed during the run, is skipped, and the others are still
+compared.
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, TypeVar
+
+from pbs_parse.snippets.hash.file_hash import DEFAULT_BLOCK_SIZE, BlockSize
+from pbs_parse.snippets.hash.hash_cache import HashCache
+from pbs_parse.snippets.hash.multi_file_hash import hash_files, ordered_map
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+K = TypeVar("K")
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_SAMPLE_SIZE = 2**10 * 4
+
+
+@dataclass
+class DuplicateGroup:
+    """Files with the same contents."""
+
+    size: int
+    file_hash: str
+    hash_method: str
+    file_paths: list[Path] = field(default_factory=list)
+
+    @property
+    def wasted_bytes(self) -> int:
+        """The bytes used by every copy after the first."""
+        return self.size * (len(self.file_paths) - 1)
+
+
+@dataclass
+class DedupeStats:
+    """What each round of :py:func:`find_duplicates` did."""
+
+    files: int = 0
+    total_bytes: int = 0
+    sampled_files: int = 0
+    hashed_files: int = 0
+    bytes_read: int = 0
+    skipped: int = 0
+
+
+def sample_hash(file_path: Path, hasher: "_Hash", size: int, sample_size: int) -> str:
+    """
+    Hash the first, and last, `sample_size` bytes of a file.
+
+    Args:
+        file_path: The file.
+        hasher: The hasher used to generate the hexdigest.
+        size: The size of the file.
+        sample_size: The bytes to read from each end.
+
+    Returns:
+        The hexdigest. For a file no larger than `2 * sample_size`, this is the
+        digest of the whole file.
+    """
+    with open(file_path, "rb") as file_handle:
+        if size <= 2 * sample_size:
+            hasher.update(file_handle.read())
+        else:
+            hasher.update(file_handle.read(sample_size))
+            file_handle.seek(-sample_size, os.SEEK_END)
+            hasher.update(file_handle.read(sample_size))
+    return hasher.hexdigest()
+
+
+def _skip_errors(func: Callable[[T], R]) -> Callable[[T], R | None]:
+    def wrapper(item: T) -> R | None:
+        try:
+            return func(item)
+        except OSError:
+            return None
+
+    return wrapper
+
+
+def _map_files(func: Callable[[T], R], items: Iterable[T], jobs: int) -> Iterator[R]:
+    if jobs <= 1:
+        yield from map(func, items)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from ordered_map(executor, func, items, window=jobs * 4)
+
+
+def _collisions(groups: dict[K, list[Path]]) -> Iterator[tuple[K, list[Path]]]:
+    for key, file_paths in groups.items():
+        if len(file_paths) > 1:
+            yield key, file_paths
+
+
+def find_duplicates(
+    file_paths: Iterable[Path],
+    hasher_factory: Callable[[], "_Hash"],
+    jobs: int = 1,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    min_size: int = 1,
+    cache: HashCache | None = None,
+    stats: DedupeStats | None = None,
+) -> list[DuplicateGroup]:
+    """
+    Find the files with the same contents.
+
+    Args:
+        file_paths: The files to compare.
+        hasher_factory: Makes a hasher for each file.
+        jobs: The number of threads used to read files. Defaults to 1.
+        sample_size: The bytes read from each end of a file in the second round.
+            Defaults to 4K.
+        block_size: The block size used to read whole files, or `auto`.
+            Defaults to 2**10*64 (64K).
+        min_size: Skip files smaller than this. Empty files all match, so are
+            skipped by default. Defaults to 1.
+        cache: Reuse digests of unchanged files from this cache, in the last
+            round. Defaults to None.
+        stats: Updated with the work done in each round, and the files skipped
+            because they could not be read, if given.
+
+    Returns:
+        The groups of duplicates, largest files first. Paths are in input order.
+    """
+    stats = stats if stats is not None else DedupeStats()
+    by_size: dict[int, list[Path]] = defaultdict(list)
+    inodes: set[tuple[int, int]] = set()
+    for file_path in file_paths:
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            stats.skipped += 1
+            continue
+        inode = (file_stat.st_dev, file_stat.st_ino)
+        if inode in inodes or file_stat.st_size < min_size:
+            continue
+        inodes.add(inode)
+        stats.files += 1
+        stats.total_bytes += file_stat.st_size
+        by_size[file_stat.st_size].append(file_path)
+    hash_method = hasher_factory().name
+
+    candidates = [
+        (size, file_path)
+        for size, same_size in _collisions(by_size)
+        for file_path in same_size
+    ]
+
+    @_skip_errors
+    def sample(item: tuple[int, Path]) -> str:
+        size, file_path = item
+        return sample_hash(file_path, hasher_factory(), size, sample_size)
+
+    by_sample: dict[tuple[int, str], list[Path]] = defaultdict(list)
+    samples = _map_files(sample, candidates, jobs)
+    for (size, file_path), digest in zip(candidates, samples):
+        if digest is None:
+            stats.skipped += 1
+            continue
+        stats.sampled_files += 1
+        stats.bytes_read += min(size, 2 * sample_size)
+        by_sample[(size, digest)].append(file_path)
+
+    duplicates: dict[tuple[int, str], list[Path]] = {}
+    to_hash: list[tuple[int, Path]] = []
+    for (size, digest), same_sample in _collisions(by_sample):
+        if size <= 2 * sample_size:
+            duplicates[(size, digest)] = same_sample
+        else:
+            to_hash.extend((size, file_path) for file_path in same_sample)
+
+    @_skip_errors
+    def full_hash(item: tuple[int, Path]) -> str:
+        # One file per call, so an error skips only that file.
+        (result,) = hash_files(
+            [item[1]], hasher_factory=hasher_factory, block_size=block_size, cache=cache
+        )
+        return result.file_hash
+
+    by_hash: dict[tuple[int, str], list[Path]] = defaultdict(list)
+    digests = _map_files(full_hash, to_hash, jobs)
+    for (size, file_path), digest in zip(to_hash, digests):
+        if digest is None:
+            stats.skipped += 1
+            continue
+        stats.hashed_files += 1
+        stats.bytes_read += size
+        by_hash[(size, digest)].append(file_path)
+    duplicates.update(_collisions(by_hash))
+
+    groups = [
+        DuplicateGroup(
+            size=size,
+            file_hash=digest,
+            hash_method=hash_method,
+            file_paths=same,
+        )
+        for (size, digest), same in duplicates.items()
+    ]
+    groups.sort(key=lambda group: (-group.size, group.file_hash))
+    return groups
@@ -0,0 +1,483 @@
+####################################################
+#                                                  #
+#     src/snippets/hash/dir_watch.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T13:05:12-07:00            #
+# Last Modified: 2026-10-18T20:05:12.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Watch directories, and hash new or changed files once they are fully written.
+
+Changes are found with inotify on Linux, through :py:mod:`ctypes`, and by
+scanning the directories elsewhere. Scans compare each file's size,
+modification time, and inode to the last scan, so only changed files are looked
+up in the state.
+
+A file is hashed once its size, and modification time, have not changed for
+`settle` seconds, so a file that is still being copied is not hashed early.
+
+The state is a :py:class:`~pbs_parse.snippets.hash.hash_cache.HashCache`. A file
+with an up to date entry was already hashed, so a restarted watcher only calls
+`stat` on unchanged files. Use a separate state database for each watch, an
+entry written by another command also counts as hashed.
+
+Hidden files, e.g. `.part` downloads, and hidden directories, are ignored. A
+file that can't be read is reported, and skipped until it changes, so one bad
+file does not stop the watch.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Literal, NamedTuple
+
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    HashedFileProtocol,
+)
+from pbs_parse.snippets.hash.hash_cache import HashCache, cached_make_hashed_file
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+WatchBackend = Literal["auto", "inotify", "poll"]
+
+DEFAULT_SETTLE = 2.0
+DEFAULT_POLL_INTERVAL = 1.0
+
+# From <sys/inotify.h>.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+EVENT_BUFFER_SIZE = 2**16
+
+
+class FileState(NamedTuple):
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, file_stat: os.stat_result) -> "FileState":
+        return cls(file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+
+
+@dataclass
+class _Pending:
+    state: FileState
+    since: float
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+def inotify_available() -> bool:
+    """Whether inotify can be used on this platform."""
+    return _load_libc() is not None
+
+
+class PollingBackend:
+    """Finds changes by scanning every directory, after each interval."""
+
+    def wait(self, timeout: float) -> set[Path] | None:
+        """
+        Wait for changes.
+
+        Returns:
+            The changed paths, or None if every directory must be scanned.
+        """
+        sleep(timeout)
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyBackend:
+    """
+    Finds changes with inotify.
+
+    Every directory below the roots is watched, if `recursive`. New directories
+    are watched when they are created.
+
+    Raises:
+        OSError: If inotify is not available, or a watch can't be added.
+    """
+
+    def __init__(self, roots: Iterable[Path], recursive: bool = True):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available on this platform.")
+        self._libc = libc
+        self.recursive = recursive
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._directories: dict[int, Path] = {}
+        try:
+            for root in roots:
+                self.add_directory(root)
+        except BaseException:
+            self.close()
+            raise
+
+    def add_directory(self, directory: Path) -> None:
+        """
+        Watch a directory, and its sub directories, if `recursive`.
+
+        Hidden sub directories are not watched, as they are not scanned.
+        """
+        descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), WATCH_MASK
+        )
+        if descriptor < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), str(directory))
+        self._directories[descriptor] = directory
+        if not self.recursive:
+            return
+        with os.scandir(directory) as scanner:
+            sub_directories = [
+                Path(entry.path)
+                for entry in scanner
+                if entry.is_dir(follow_symlinks=False)
+                and not entry.name.startswith(".")
+            ]
+        for sub_directory in sub_directories:
+            self.add_directory(sub_directory)
+
+    def wait(self, timeout: float) -> set[Path] | None:
+        """
+        Wait for changes.
+
+        Returns:
+            The changed paths, or None if every directory must be scanned, e.g.
+            events were lost.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, EVENT_BUFFER_SIZE)
+            except BlockingIOError:
+                return changed
+            position = 0
+            while position < len(data):
+                descriptor, mask, _cookie, length = EVENT_HEADER.unpack_from(
+                    data, position
+                )
+                position += EVENT_HEADER.size
+                name = data[position : position + length].rstrip(b"\0")
+                position += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self._directories.pop(descriptor, None)
+                    continue
+                directory = self._directories.get(descriptor)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if path.name.startswith("."):
+                        continue
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        try:
+                            self.add_directory(path)
+                        except FileNotFoundError:
+                            continue
+                        except OSError:
+                            # Scanned anyway, which reports the error.
+                            pass
+                    else:
+                        continue
+                changed.add(path)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class DirectoryWatcher:
+    """
+    Hash the new, or changed, files in directories.
+
+    Args:
+        directories: The directories to watch.
+        state: Records the files already hashed.
+        hasher_factory: Makes a hasher for each file.
+        settle: Seconds a file must be unchanged before it is hashed.
+            Defaults to 2.
+        poll_interval: Seconds between scans, or the longest wait for an
+            inotify event. Defaults to 1.
+        recursive: Watch sub directories. Defaults to True.
+        patterns: Only hash files whose name matches one of these glob patterns.
+            Defaults to every file.
+        backend: How changes are found, `inotify`, `poll`, or `auto` to use
+            inotify where available. Defaults to `auto`.
+        block_size: The block size used to read files, or `auto`.
+            Defaults to 2**10*64 (64K).
+        clock: The time source, in seconds. Defaults to
+            :py:func:`time.monotonic`.
+        on_error: Called with the path, and the error, when a file, or
+            directory, can't be read. It is skipped, and the watch goes on.
+            Defaults to ignoring the error.
+    """
+
+    def __init__(
+        self,
+        directories: Iterable[Path],
+        state: HashCache,
+        hasher_factory: Callable[[], "_Hash"],
+        settle: float = DEFAULT_SETTLE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        recursive: bool = True,
+        patterns: Iterable[str] = (),
+        backend: WatchBackend = "auto",
+        block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+        clock: Callable[[], float] = monotonic,
+        on_error: Callable[[Path, OSError], None] | None = None,
+    ):
+        self.directories = list(directories)
+        self.state = state
+        self.hasher_factory = hasher_factory
+        self.hash_method = hasher_factory().name
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.recursive = recursive
+        self.patterns = list(patterns)
+        self.backend = backend
+        self.block_size = block_size
+        self.clock = clock
+        self.on_error = on_error
+        # The state database is often in a watched directory.
+        self._state_prefix = os.path.abspath(state.db_path)
+        self._known: dict[Path, FileState] = {}
+        self._pending: dict[Path, _Pending] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"directories={self.directories!r}, state={self.state!r}, "
+            f"hash_method={self.hash_method!r}, settle={self.settle!r})"
+        )
+
+    @property
+    def pending(self) -> list[Path]:
+        """The files waiting to settle, before they are hashed."""
+        return list(self._pending)
+
+    def _report(self, path: Path, error: OSError) -> None:
+        if self.on_error is not None:
+            self.on_error(path, error)
+
+    def _ignored(self, file_path: Path) -> bool:
+        name = file_path.name
+        if name.startswith("."):
+            return True
+        if self.patterns and not any(fnmatch(name, p) for p in self.patterns):
+            return True
+        return os.path.abspath(file_path).startswith(self._state_prefix)
+
+    def _walk(self, directory: Path) -> Iterator[tuple[Path, os.stat_result]]:
+        try:
+            with os.scandir(directory) as scanner:
+                entries = list(scanner)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        except OSError as error:
+            self._report(directory, error)
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if self.recursive and not entry.name.startswith("."):
+                        yield from self._walk(Path(entry.path))
+                elif entry.is_file():
+                    yield Path(entry.path), entry.stat()
+            except FileNotFoundError:
+                continue
+            except OSError as error:
+                self._report(Path(entry.path), error)
+
+    def scan(self, directories: Iterable[Path] | None = None) -> None:
+        """
+        Look for new, or changed, files.
+
+        Args:
+            directories: The directories to scan. Defaults to every watched
+                directory.
+        """
+        now = self.clock()
+        seen = set()
+        for directory in self.directories if directories is None else directories:
+            for file_path, file_stat in self._walk(directory):
+                seen.add(file_path)
+                self._check(file_path, file_stat, now)
+        if directories is None:
+            # Forget deleted files.
+            for file_path in self._known.keys() - seen:
+                del self._known[file_path]
+            for file_path in self._pending.keys() - seen:
+                del self._pending[file_path]
+
+    def check(self, file_path: Path) -> None:
+        """Look for a change to one file, or the files in a new directory."""
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            self._known.pop(file_path, None)
+            self._pending.pop(file_path, None)
+            return
+        except OSError as error:
+            self._report(file_path, error)
+            return
+        if os.path.isdir(file_path):
+            self.scan([file_path])
+            return
+        self._check(file_path, file_stat, self.clock())
+
+    def _check(self, file_path: Path, file_stat: os.stat_result, now: float) -> None:
+        if self._ignored(file_path):
+            return
+        file_state = FileState.from_stat(file_stat)
+        if self._known.get(file_path) == file_state:
+            return
+        pending = self._pending.get(file_path)
+        if pending is not None:
+            if pending.state != file_state:
+                self._pending[file_path] = _Pending(file_state, now)
+            return
+        if self.state.get(file_path, self.hash_method, file_stat) is not None:
+            self._known[file_path] = file_state
+            return
+        self._pending[file_path] = _Pending(file_state, now)
+
+    def ready(self) -> Iterator[HashedFileProtocol]:
+        """
+        Hash the pending files that have settled.
+
+        A file that can't be read is reported, and not hashed again until it
+        changes.
+
+        Yields:
+            Each file hashed.
+        """
+        now = self.clock()
+        for file_path, pending in list(self._pending.items()):
+            if now - pending.since < self.settle:
+                continue
+            try:
+                file_state = FileState.from_stat(os.stat(file_path))
+                if file_state != pending.state:
+                    self._pending[file_path] = _Pending(file_state, now)
+                    continue
+                result = cached_make_hashed_file(
+                    file_path,
+                    self.hasher_factory(),
+                    self.state,
+                    block_size=self.block_size,
+                )
+            except FileNotFoundError:
+                del self._pending[file_path]
+                continue
+            except OSError as error:
+                del self._pending[file_path]
+                self._known[file_path] = pending.state
+                self._report(file_path, error)
+                continue
+            del self._pending[file_path]
+            self._known[file_path] = file_state
+            self.state.commit()
+            yield result
+
+    def _next_timeout(self) -> float:
+        if not self._pending:
+            return self.poll_interval
+        oldest = min(pending.since for pending in self._pending.values())
+        remaining = max(oldest + self.settle - self.clock(), 0.0)
+        return min(remaining, self.poll_interval)
+
+    def _make_backend(self) -> PollingBackend | InotifyBackend:
+        if self.backend == "poll" or (
+            self.backend == "auto" and not inotify_available()
+        ):
+            return PollingBackend()
+        return InotifyBackend(self.directories, recursive=self.recursive)
+
+    def watch(self, once: bool = False) -> Iterator[HashedFileProtocol]:
+        """
+        Hash new, or changed, files as they settle.
+
+        Args:
+            once: Hash the files that are new, or changed, since the last run,
+                and stop, instead of watching. Defaults to False.
+
+        Yields:
+            Each file hashed.
+        """
+        # Watch before the first scan, so no change is missed between them.
+        backend = PollingBackend() if once else self._make_backend()
+        try:
+            self.scan()
+            while True:
+                yield from self.ready()
+                if once and not self._pending:
+                    return
+                changed = backend.wait(self._next_timeout())
+                if once:
+                    continue
+                if changed is None:
+                    self.scan()
+                    continue
+                for file_path in sorted(changed):
+                    self.check(file_path)
+        finally:
+            backend.close()
@@ -5,20 +5,160 @@
 ####################################################
 # Created by: Chad Lowe                            #
 # Created on: 2023-02-28T08:31:08-07:00            #
-# Last Modified: 2023-03-01T15:20:06.269228+00:00  #
+# Last Modified: 2026-10-18T18:11:09.402263+00:00  #
 # Source: https://github.com/DonalChilde/snippets  #
 ####################################################
 
-from dataclasses import dataclass
+import io
+import json
+import mmap
+import os
+import stat
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, BinaryIO, Callable, Protocol
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    Literal,
+    Protocol,
+)
+
+from pbs_parse.snippets.hash.bytes_iterator_hash import bytes_iterator_multi_hash
 
 if TYPE_CHECKING:
     from hashlib import _Hash
 
+ReadMode = Literal["read", "readinto", "mmap"]
+BlockSize = int | Literal["auto"]
+
+CHECKPOINT_INTERVAL = 5.0
+
+DEFAULT_BLOCK_SIZE = 2**10 * 64
+AUTO_BLOCK_SIZE_MAX = 2**20
+
+
+def auto_block_size(
+    file_size: int, preferred_size: int = io.DEFAULT_BUFFER_SIZE
+) -> int:
+    """
+    Pick a read block size for a file.
+
+    Small files are read in a single block. Larger files are read in blocks of up
+    to 1M, or the filesystem's preferred I/O size if that is larger, as some
+    network filesystems report. The result is always a multiple of the preferred
+    I/O size.
+
+    Args:
+        file_size: The size of the file in bytes.
+        preferred_size: The filesystem's preferred I/O size, `st_blksize`.
+            Defaults to :py:data:`io.DEFAULT_BUFFER_SIZE`.
+
+    Returns:
+        The block size in bytes.
+    """
+    preferred_size = max(preferred_size, 512)
+    ceiling = max(AUTO_BLOCK_SIZE_MAX, preferred_size)
+    block_size = 1 << max(file_size - 1, 0).bit_length()
+    block_size = min(max(block_size, preferred_size), ceiling)
+    return -(-block_size // preferred_size) * preferred_size
+
+
+def resolve_block_size(file_handle: BinaryIO, block_size: BlockSize) -> int:
+    """
+    Resolve an `auto` block size for a file handle, using :py:func:`auto_block_size`.
+
+    Handles that are not regular files, like pipes, get the default block size.
+    """
+    if block_size != "auto":
+        return block_size
+    try:
+        file_stat = os.fstat(file_handle.fileno())
+    except (OSError, AttributeError, io.UnsupportedOperation):
+        return DEFAULT_BLOCK_SIZE
+    if not stat.S_ISREG(file_stat.st_mode):
+        return DEFAULT_BLOCK_SIZE
+    return auto_block_size(file_stat.st_size, getattr(file_stat, "st_blksize", 0))
+
+
+def _map_file(file_handle: BinaryIO) -> mmap.mmap | None:
+    """Memory map a file handle for reading, or return None if it can't be mapped."""
+    # Only map raw files. Wrappers like GzipFile report the fileno() of the
+    # underlying compressed file, which is not the data we want to read.
+    if not isinstance(file_handle, (io.BufferedReader, io.FileIO)):
+        return None
+    try:
+        mapped = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        # Pipes, sockets, and empty files can't be mapped.
+        return None
+    if hasattr(mapped, "madvise"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+def iter_file_blocks(
+    file_handle: BinaryIO,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> Iterator[bytes | memoryview]:
+    """
+    Iterate over a file handle in blocks, starting from the current position.
+
+    Read modes:
+        - `read`: Each block is a new `bytes` object from `read()`.
+        - `readinto`: Blocks are read into a single reused buffer, and yielded as
+          a `memoryview` of that buffer.
+        - `mmap`: The file is memory mapped, and blocks are yielded as a
+          `memoryview` of the map, with no copying. Handles that can't be mapped,
+          like pipes, fall back to `readinto`.
+
+    A `memoryview` block is only valid until the next block is requested, and
+    must not be kept.
+
+    Args:
+        file_handle: The file handle for a file opened in binary mode.
+        block_size: The block size used to read the file, or `auto` to pick one
+            with :py:func:`auto_block_size`. Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file. Defaults to `read`.
+
+    Yields:
+        Blocks of the file, in order.
+    """
+    block_size = resolve_block_size(file_handle, block_size)
+    if read_mode == "mmap":
+        mapped = _map_file(file_handle)
+        if mapped is not None:
+            position = file_handle.tell()
+            with mapped, memoryview(mapped) as view:
+                for start in range(position, len(mapped), block_size):
+                    with view[start : start + block_size] as block:
+                        yield block
+            file_handle.seek(0, io.SEEK_END)
+            return
+        read_mode = "readinto"
+    if read_mode == "readinto":
+        buffer = bytearray(block_size)
+        with memoryview(buffer) as view:
+            while size := file_handle.readinto(buffer):  # type: ignore[attr-defined]
+                with view[:size] as block:
+                    yield block
+        return
+    block = file_handle.read(block_size)
+    while block:
+        yield block
+        block = file_handle.read(block_size)
+
 
 def hash_binary_file(
-    file_handle: BinaryIO, hasher: "_Hash", block_size: int = 2**10 * 64
+    file_handle: BinaryIO,
+    hasher: "_Hash",
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
 ) -> str:
     """
     Calculate the hash digest for a file as a hexidecimal string.
@@ -29,20 +169,27 @@ def hash_binary_file(
     Args:
         file_handle: The file handle for a file opened in binary mode.
         hasher: The hasher used to generate the hexdigest.
-        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file, see :py:func:`iter_file_blocks`.
+            `readinto` and `mmap` avoid allocating a new object per block.
+            Defaults to `read`.
 
     Returns:
         A hexidecimal string representing the file hash.
     """
     with file_handle:
-        block = file_handle.read(block_size)
-        while block:
+        for block in iter_file_blocks(file_handle, block_size, read_mode):
             hasher.update(block)
-            block = file_handle.read(block_size)
     return hasher.hexdigest()
 
 
-def hash_file(file_path: Path, hasher: "_Hash", block_size: int = 2**10 * 64) -> str:
+def hash_file(
+    file_path: Path,
+    hasher: "_Hash",
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> str:
     """
     Calculate the hash digest for a file as a hexidecimal string.
 
@@ -52,29 +199,221 @@ def hash_file(file_path: Path, hasher: "_Hash", block_size: int = 2**10 * 64) ->
     Args:
         file_path: The path for a file to be opened in binary mode.
         hasher: The hasher used to generate the hexdigest.
-        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file, see :py:func:`iter_file_blocks`.
+            Defaults to `read`.
 
     Returns:
         A hexidecimal string representing the file hash.
     """
     with open(file_path, mode="rb") as file_handle:
         hex_digest = hash_binary_file(
-            file_handle=file_handle, hasher=hasher, block_size=block_size
+            file_handle=file_handle,
+            hasher=hasher,
+            block_size=block_size,
+            read_mode=read_mode,
         )
     return hex_digest
 
 
+def hash_binary_file_multi(
+    file_handle: BinaryIO,
+    hashers: Iterable["_Hash"],
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> dict[str, str]:
+    """
+    Calculate several hash digests for a file, reading it only once.
+
+    Args:
+        file_handle: The file handle for a file opened in binary mode.
+        hashers: The hashers used to generate the hexdigests, with unique names.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file, see :py:func:`iter_file_blocks`.
+            Defaults to `read`.
+
+    Returns:
+        A dict of hasher name to hexidecimal digest, in the same order as `hashers`.
+    """
+    with file_handle:
+        return bytes_iterator_multi_hash(
+            iter_file_blocks(file_handle, block_size, read_mode), hashers
+        )
+
+
+def hash_file_multi(
+    file_path: Path,
+    hashers: Iterable["_Hash"],
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> dict[str, str]:
+    """
+    Calculate several hash digests for a file, reading it only once.
+
+    Args:
+        file_path: The path for a file to be opened in binary mode.
+        hashers: The hashers used to generate the hexdigests, with unique names.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file, see :py:func:`iter_file_blocks`.
+            Defaults to `read`.
+
+    Returns:
+        A dict of hasher name to hexidecimal digest, in the same order as `hashers`.
+    """
+    with open(file_path, mode="rb") as file_handle:
+        digests = hash_binary_file_multi(
+            file_handle=file_handle,
+            hashers=hashers,
+            block_size=block_size,
+            read_mode=read_mode,
+        )
+    return digests
+
+
+class ResumableHasher(Protocol):
+    """
+    A hasher whose progress can be saved, and restored in another process.
+
+    `checkpoint()` returns JSON serializable state, with an `offset` key holding
+    the number of bytes the state covers. `restore()` raises `ValueError` for
+    state it can't use.
+    """
+
+    name: str
+
+    def update(self, data: bytes, /) -> None: ...
+
+    def hexdigest(self) -> str: ...
+
+    def checkpoint(self) -> dict[str, Any]: ...
+
+    def restore(self, state: dict[str, Any]) -> None: ...
+
+
+def _load_checkpoint(
+    checkpoint_path: Path, file_stat: os.stat_result
+) -> dict[str, Any] | None:
+    """
+    Load saved hasher state, if it was saved for this version of the file.
+
+    A checkpoint that is not valid, e.g. truncated, or edited, is ignored.
+    """
+    try:
+        saved = json.loads(checkpoint_path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(saved, dict):
+        return None
+    if (saved.get("size"), saved.get("mtime_ns")) != (
+        file_stat.st_size,
+        file_stat.st_mtime_ns,
+    ):
+        return None
+    state = saved.get("hasher")
+    if not isinstance(state, dict):
+        return None
+    offset = state.get("offset")
+    if type(offset) is not int or not 0 <= offset <= file_stat.st_size:
+        return None
+    return state
+
+
+def _save_checkpoint(
+    checkpoint_path: Path, file_stat: os.stat_result, hasher: ResumableHasher
+) -> None:
+    saved = {
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "hasher": hasher.checkpoint(),
+    }
+    temp_path = checkpoint_path.with_name(f"{checkpoint_path.name}.tmp")
+    temp_path.write_text(json.dumps(saved))
+    os.replace(temp_path, checkpoint_path)
+
+
+def hash_file_resumable(
+    file_path: Path,
+    hasher: ResumableHasher,
+    checkpoint_path: Path,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+    checkpoint_interval: float = CHECKPOINT_INTERVAL,
+) -> str:
+    """
+    Calculate the hash digest for a file, saving progress as it goes.
+
+    If `checkpoint_path` holds progress saved for this file, with the same size
+    and modification time, hashing continues from there. Otherwise, or if the
+    checkpoint is not valid, it starts from the beginning. The checkpoint is removed once the digest is calculated.
+
+    Args:
+        file_path: The path for a file to be opened in binary mode.
+        hasher: A new resumable hasher, e.g.
+            :py:class:`~pbs_parse.snippets.hash.tree_hash.TreeHasher`.
+        checkpoint_path: Where progress is saved.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file, see :py:func:`iter_file_blocks`.
+            Defaults to `read`.
+        checkpoint_interval: Seconds between saves. Defaults to 5.0.
+
+    Raises:
+        TypeError: If the hasher can't save its state.
+
+    Returns:
+        A hexidecimal string representing the file hash.
+    """
+    if not callable(getattr(hasher, "checkpoint", None)):
+        raise TypeError(f"{hasher.name!r} can't save its state to resume from.")
+    file_stat = os.stat(file_path)
+    state = _load_checkpoint(checkpoint_path, file_stat)
+    if state is not None:
+        try:
+            hasher.restore(state)
+        except ValueError:
+            state = None
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, mode="rb") as file_handle:
+        if state is not None:
+            file_handle.seek(state["offset"])
+        last_save = monotonic()
+        for block in iter_file_blocks(file_handle, block_size, read_mode):
+            hasher.update(block)
+            if monotonic() - last_save >= checkpoint_interval:
+                _save_checkpoint(checkpoint_path, file_stat, hasher)
+                last_save = monotonic()
+    hex_digest = hasher.hexdigest()
+    checkpoint_path.unlink(missing_ok=True)
+    return hex_digest
+
+
 class HashedFileProtocol(Protocol):
     file_path: Path
     file_hash: str
     hash_method: str
+    digests: dict[str, str]
 
 
 @dataclass
 class HashedFile:
+    """
+    A file digest.
+
+    `file_hash` and `hash_method` are the primary digest. `digests` maps every
+    hash method used to its digest, and always includes the primary digest.
+    """
+
     file_path: Path
     file_hash: str
     hash_method: str
+    digests: dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.hash_method not in self.digests:
+            self.digests = {self.hash_method: self.file_hash, **self.digests}
 
 
 def hashed_file_result_factory(
@@ -83,13 +422,63 @@ def hashed_file_result_factory(
     return HashedFile(file_path=file_path, file_hash=file_hash, hash_method=hash_method)
 
 
+def multi_hashed_file_result_factory(
+    file_path: Path, digests: dict[str, str]
+) -> HashedFileProtocol:
+    """Make a :py:class:`HashedFile`, with the first digest as the primary one."""
+    hash_method, file_hash = next(iter(digests.items()))
+    return HashedFile(
+        file_path=file_path,
+        file_hash=file_hash,
+        hash_method=hash_method,
+        digests=dict(digests),
+    )
+
+
 def make_hashed_file(
     file_path: Path,
     hasher: "_Hash",
-    block_size: int = 2**10 * 64,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
     result_factory: Callable[
         [Path, str, str], HashedFileProtocol
     ] = hashed_file_result_factory,
+    read_mode: ReadMode = "read",
+    checkpoint_path: Path | None = None,
 ):
-    hash_str = hash_file(file_path=file_path, hasher=hasher, block_size=block_size)
+    if checkpoint_path is not None:
+        # Checkpoints need a hasher that can save its state, see ResumableHasher.
+        hash_str = hash_file_resumable(
+            file_path=file_path,
+            hasher=hasher,  # type: ignore[arg-type]
+            checkpoint_path=checkpoint_path,
+            block_size=block_size,
+            read_mode=read_mode,
+        )
+    else:
+        hash_str = hash_file(
+            file_path=file_path,
+            hasher=hasher,
+            block_size=block_size,
+            read_mode=read_mode,
+        )
     return result_factory(file_path, hash_str, hasher.name)
+
+
+def make_multi_hashed_file(
+    file_path: Path,
+    hashers: Iterable["_Hash"],
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    result_factory: Callable[
+        [Path, dict[str, str]], HashedFileProtocol
+    ] = multi_hashed_file_result_factory,
+    read_mode: ReadMode = "read",
+) -> HashedFileProtocol:
+    """
+    Hash a file with several hashers in a single pass.
+
+    With the default `result_factory`, the first hasher is the primary digest.
+    """
+    digests = hash_file_multi(
+        file_path=file_path, hashers=hashers, block_size=block_size, read_mode=read_mode
+    )
+    return result_factory(file_path, digests)
@@ -0,0 +1,97 @@
+####################################################
+#                                                  #
+#      src/snippets/hash/hash_benchmark.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T09:05:51-07:00            #
+# Last Modified: 2026-10-18T16:05:51.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Measure file hashing throughput across block sizes, algorithms, and read modes.
+
+Every run after the first reads the file from the page cache, so results
+reflect hashing and copying speed, not cold storage speed. Use a file larger
+than RAM, or drop the caches between runs, to measure the storage as well.
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Iterable, Iterator
+
+from pbs_parse.snippets.hash.file_hash import (
+    BlockSize,
+    ReadMode,
+    hash_binary_file,
+    resolve_block_size,
+)
+from pbs_parse.snippets.hash.multi_file_hash import new_hasher
+
+
+@dataclass
+class HashBenchmarkResult:
+    hash_method: str
+    block_size: int
+    read_mode: str
+    bytes_hashed: int
+    best_ns: int
+    repeat: int
+
+    @property
+    def mb_per_second(self) -> float:
+        """Throughput of the fastest run, in MB/s."""
+        if self.best_ns == 0:
+            return float("inf")
+        return self.bytes_hashed / 1e6 / (self.best_ns / 1e9)
+
+
+def benchmark_hash_file(
+    file_path: Path,
+    algorithms: Iterable[str],
+    block_sizes: Iterable[BlockSize],
+    read_modes: Iterable[ReadMode] = ("read",),
+    repeat: int = 3,
+) -> Iterator[HashBenchmarkResult]:
+    """
+    Hash a file with every combination of algorithm, block size, and read mode.
+
+    Each combination is run `repeat` times, and the fastest run is reported.
+
+    Args:
+        file_path: The file to hash.
+        algorithms: Algorithm names, see
+            :py:func:`~pbs_parse.snippets.hash.multi_file_hash.new_hasher`.
+        block_sizes: The block sizes to try. `auto` is resolved for the file.
+        read_modes: The read modes to try. Defaults to `read`.
+        repeat: The number of runs for each combination, at least 1. Defaults to 3.
+
+    Yields:
+        A result for each combination.
+    """
+    bytes_hashed = file_path.stat().st_size
+    for algorithm, block_size, read_mode in product(
+        algorithms, block_sizes, read_modes
+    ):
+        timings: list[int] = []
+        for _ in range(repeat):
+            with open(file_path, "rb") as file_handle:
+                resolved = resolve_block_size(file_handle, block_size)
+                start = perf_counter_ns()
+                hash_binary_file(
+                    file_handle,
+                    new_hasher(algorithm),
+                    block_size=resolved,
+                    read_mode=read_mode,
+                )
+                timings.append(perf_counter_ns() - start)
+        yield HashBenchmarkResult(
+            hash_method=algorithm,
+            block_size=resolved,
+            read_mode=read_mode,
+            bytes_hashed=bytes_hashed,
+            best_ns=min(timings),
+            repeat=repeat,
+        )
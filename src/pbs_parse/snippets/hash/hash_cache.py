@@ -0,0 +1,327 @@
+####################################################
+#                                                  #
+#       src/snippets/hash/hash_cache.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T09:41:27-07:00            #
+# Last Modified: 2026-10-18T16:41:27.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+A persistent cache of file digests.
+
+Digests are stored in a SQLite database, keyed on the absolute file path and the
+hash method. A stored digest is only returned if the file's size, modification
+time, and inode still match the values recorded when it was hashed, so checking
+an unchanged file costs a `stat` call instead of reading the file.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from time import time_ns
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence
+
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    HashedFileProtocol,
+    ReadMode,
+    hash_file_multi,
+    hashed_file_result_factory,
+    multi_hashed_file_result_factory,
+)
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+DEFAULT_MAX_ENTRIES = 500_000
+COMMIT_INTERVAL = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hash (
+    path TEXT NOT NULL,
+    hash_method TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    file_hash TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (path, hash_method)
+);
+CREATE INDEX IF NOT EXISTS file_hash_last_used ON file_hash (last_used);
+"""
+
+
+def _cache_key(file_path: Path) -> str:
+    return os.path.abspath(file_path)
+
+
+class HashCache:
+    """
+    A SQLite backed cache of file digests, with least recently used eviction.
+
+    Writes are committed in batches, and on :py:meth:`close`. The cache can be
+    shared between threads.
+
+    Args:
+        db_path: The database file. Parent directories are created as needed.
+        max_entries: The most entries to keep. The least recently used entries
+            are evicted when the cache is committed. Defaults to 500,000.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"db_path={self.db_path!r}, max_entries={self.max_entries!r})"
+        )
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM file_hash"
+            ).fetchone()
+        return count
+
+    def get(
+        self,
+        file_path: Path,
+        hash_method: str,
+        file_stat: os.stat_result | None = None,
+    ) -> str | None:
+        """
+        Get the stored digest for a file, if the file is unchanged.
+
+        Args:
+            file_path: The file.
+            hash_method: The name of the hash method.
+            file_stat: The current stat of the file, if already known.
+
+        Returns:
+            The stored digest, or None if there is no entry, or the file changed.
+        """
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+        key = _cache_key(file_path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT file_hash FROM file_hash WHERE path = ? AND hash_method = ?"
+                " AND size = ? AND mtime_ns = ? AND inode = ?",
+                (
+                    key,
+                    hash_method,
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                    file_stat.st_ino,
+                ),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE file_hash SET last_used = ? WHERE path = ? AND hash_method = ?",
+                (time_ns(), key, hash_method),
+            )
+            self._changed()
+        return row[0]
+
+    def put(
+        self,
+        file_path: Path,
+        hash_method: str,
+        file_hash: str,
+        file_stat: os.stat_result,
+    ) -> None:
+        """
+        Store the digest for a file.
+
+        Args:
+            file_path: The file.
+            hash_method: The name of the hash method.
+            file_hash: The digest.
+            file_stat: The stat of the file taken before it was hashed.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO file_hash VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    _cache_key(file_path),
+                    hash_method,
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                    file_stat.st_ino,
+                    file_hash,
+                    time_ns(),
+                ),
+            )
+            self._changed()
+
+    def invalidate(self, file_paths: Iterable[Path] | None = None) -> int:
+        """
+        Remove entries from the cache.
+
+        Args:
+            file_paths: Files or directories to remove. Directories remove every
+                entry below them. None removes every entry. Defaults to None.
+
+        Returns:
+            The number of entries removed.
+        """
+        removed = 0
+        with self._lock:
+            if file_paths is None:
+                removed = self._connection.execute("DELETE FROM file_hash").rowcount
+            else:
+                for file_path in file_paths:
+                    key = _cache_key(file_path)
+                    prefix = key.rstrip(os.sep) + os.sep
+                    # Every path that starts with prefix sorts between prefix,
+                    # and prefix with its last character incremented.
+                    prefix_end = prefix[:-1] + chr(ord(os.sep) + 1)
+                    removed += self._connection.execute(
+                        "DELETE FROM file_hash WHERE path = ?"
+                        " OR (path >= ? AND path < ?)",
+                        (key, prefix, prefix_end),
+                    ).rowcount
+            self._commit()
+        return removed
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries, down to `max_entries`.
+
+        Returns:
+            The number of entries removed.
+        """
+        with self._lock:
+            return self._evict()
+
+    def commit(self) -> None:
+        """Evict old entries if needed, and commit pending changes."""
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        """Commit pending changes, and close the database."""
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+    def _changed(self) -> None:
+        self._pending += 1
+        if self._pending >= COMMIT_INTERVAL:
+            self._commit()
+
+    def _commit(self) -> None:
+        self._evict()
+        self._connection.commit()
+        self._pending = 0
+
+    def _evict(self) -> int:
+        return self._connection.execute(
+            "DELETE FROM file_hash WHERE rowid IN ("
+            "SELECT rowid FROM file_hash ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+
+
+def _cached_digests(
+    file_path: Path,
+    hashers: Sequence["_Hash"],
+    cache: HashCache,
+    block_size: BlockSize,
+    read_mode: ReadMode,
+) -> dict[str, str]:
+    before = os.stat(file_path)
+    digests = {
+        hasher.name: cache.get(file_path, hasher.name, before) for hasher in hashers
+    }
+    if all(digest is not None for digest in digests.values()):
+        return digests  # type: ignore[return-value]
+    # Any miss re-reads the file, so compute every digest in that one pass.
+    digests = hash_file_multi(
+        file_path=file_path,
+        hashers=hashers,
+        block_size=block_size,
+        read_mode=read_mode,
+    )
+    after = os.stat(file_path)
+    if (before.st_size, before.st_mtime_ns, before.st_ino) == (
+        after.st_size,
+        after.st_mtime_ns,
+        after.st_ino,
+    ):
+        for hash_method, file_hash in digests.items():
+            cache.put(file_path, hash_method, file_hash, before)
+    return digests
+
+
+def cached_make_hashed_file(
+    file_path: Path,
+    hasher: "_Hash",
+    cache: HashCache,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    result_factory: Callable[
+        [Path, str, str], HashedFileProtocol
+    ] = hashed_file_result_factory,
+    read_mode: ReadMode = "read",
+) -> HashedFileProtocol:
+    """
+    Like :py:func:`~pbs_parse.snippets.hash.file_hash.make_hashed_file`, but use
+    the cached digest if the file is unchanged.
+
+    A new digest is only stored if the file did not change while it was hashed.
+
+    Args:
+        file_path: The file to hash.
+        hasher: The hasher used on a cache miss.
+        cache: The cache.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        result_factory: Makes the result. Defaults to making a
+            :py:class:`~pbs_parse.snippets.hash.file_hash.HashedFile`.
+        read_mode: How blocks are read from the file. Defaults to `read`.
+
+    Returns:
+        The hashed file.
+    """
+    digests = _cached_digests(file_path, [hasher], cache, block_size, read_mode)
+    return result_factory(file_path, digests[hasher.name], hasher.name)
+
+
+def cached_make_multi_hashed_file(
+    file_path: Path,
+    hashers: Sequence["_Hash"],
+    cache: HashCache,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    result_factory: Callable[
+        [Path, dict[str, str]], HashedFileProtocol
+    ] = multi_hashed_file_result_factory,
+    read_mode: ReadMode = "read",
+) -> HashedFileProtocol:
+    """
+    Like :py:func:`~pbs_parse.snippets.hash.file_hash.make_multi_hashed_file`, but
+    use the cached digests if the file is unchanged.
+
+    If any digest is missing, the file is read once to compute all of them.
+    """
+    digests = _cached_digests(file_path, hashers, cache, block_size, read_mode)
+    return result_factory(file_path, digests)
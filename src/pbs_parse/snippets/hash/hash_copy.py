@@ -0,0 +1,162 @@
+####################################################
+#                                                  #
+#        src/snippets/hash/hash_copy.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T10:48:36-07:00            #
+# Last Modified: 2026-10-18T17:48:36.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Hash data while copying it, so the data is only read once.
+"""
+
+import socket
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator, Protocol
+
+from pbs_parse.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    HashedFileProtocol,
+    ReadMode,
+    hashed_file_result_factory,
+    iter_file_blocks,
+)
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+
+class SupportsWrite(Protocol):
+    def write(self, data: bytes, /) -> int | None: ...
+
+
+def _write_all(destination: SupportsWrite | socket.socket) -> Callable[[bytes], None]:
+    """Make a function that writes a whole block to the destination."""
+    if isinstance(destination, socket.socket):
+        return destination.sendall
+
+    def write_all(block: bytes) -> None:
+        # Unbuffered (raw) files may write only part of a block.
+        with memoryview(block) as view:
+            written = destination.write(view)
+            while written is not None and written < len(view):
+                written += destination.write(view[written:]) or 0
+
+    return write_all
+
+
+def tee_blocks(
+    bytes_iterator: Iterator[bytes], destination: SupportsWrite | socket.socket
+) -> Iterator[bytes]:
+    """
+    Write each block to the destination, then yield it.
+
+    Args:
+        bytes_iterator: The byte iterator
+        destination: Any object with a `write` method, or a socket.
+
+    Yields:
+        Each block, after it has been written.
+    """
+    write = _write_all(destination)
+    for block in bytes_iterator:
+        write(block)
+        yield block
+
+
+def tee_hash(
+    bytes_iterator: Iterator[bytes],
+    hasher: "_Hash",
+    destination: SupportsWrite | socket.socket,
+) -> str:
+    """
+    Copy a bytes iterator to a destination, and hash it in the same pass.
+
+    Args:
+        bytes_iterator: The byte iterator
+        hasher: The hash function from :py:mod:`hashlib`
+        destination: Any object with a `write` method, or a socket.
+
+    Returns:
+         The hexidecimal str from `hexdigest()`
+    """
+    return bytes_iterator_hash(tee_blocks(bytes_iterator, destination), hasher)
+
+
+def copy_hash_binary_file(
+    file_handle: BinaryIO,
+    hasher: "_Hash",
+    destination: SupportsWrite | socket.socket,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> str:
+    """
+    Copy a file handle to a destination, and hash it in the same pass.
+
+    The file handle is read from its current position, and is not closed.
+
+    Args:
+        file_handle: The file handle for a file opened in binary mode.
+        hasher: The hasher used to generate the hexdigest.
+        destination: Any object with a `write` method, or a socket.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the file. Defaults to `read`.
+
+    Returns:
+        A hexidecimal string representing the hash of the copied data.
+    """
+    return tee_hash(
+        iter_file_blocks(file_handle, block_size, read_mode), hasher, destination
+    )
+
+
+def copy_and_hash_file(
+    source_path: Path,
+    destination_path: Path,
+    hasher: "_Hash",
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    result_factory: Callable[
+        [Path, str, str], HashedFileProtocol
+    ] = hashed_file_result_factory,
+    read_mode: ReadMode = "read",
+    overwrite: bool = False,
+) -> HashedFileProtocol:
+    """
+    Copy a file, and hash it in the same pass.
+
+    If the copy fails part way, the partial destination is removed, so the copy
+    can be tried again.
+
+    Args:
+        source_path: The file to copy.
+        destination_path: The new file.
+        hasher: The hasher used to generate the hexdigest.
+        block_size: The block size used to read the file, or `auto`.
+            Defaults to 2**10*64 (64K).
+        result_factory: Makes the result. Defaults to making a
+            :py:class:`~pbs_parse.snippets.hash.file_hash.HashedFile`.
+        read_mode: How blocks are read from the file. Defaults to `read`.
+        overwrite: Replace the destination if it exists. Defaults to False.
+
+    Raises:
+        FileExistsError: If the destination exists, and overwrite is False.
+
+    Returns:
+        The hashed file for the destination.
+    """
+    mode = "wb" if overwrite else "xb"
+    with open(source_path, "rb") as file_in, open(destination_path, mode) as file_out:
+        try:
+            hash_str = copy_hash_binary_file(
+                file_in, hasher, file_out, block_size=block_size, read_mode=read_mode
+            )
+        except BaseException:
+            file_out.close()
+            destination_path.unlink(missing_ok=True)
+            raise
+    return result_factory(destination_path, hash_str, hasher.name)
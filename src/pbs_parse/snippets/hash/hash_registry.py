@@ -0,0 +1,209 @@
+####################################################
+#                                                  #
+#     src/snippets/hash/hash_registry.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T13:05:12-07:00            #
+# Last Modified: 2026-10-18T20:05:12.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Look up hash algorithms by name.
+
+Every :py:mod:`hashlib` algorithm is available, along with `blake2b-tree`, and
+fast backends from optional packages:
+
+- `xxh3_64`, `xxh3_128`, `xxh64`, and `xxh32`, from :py:mod:`xxhash`.
+- `blake3`, from :py:mod:`blake3`.
+
+Install both with `pip install pbs-parse[fast]`. The xxHash algorithms are not
+cryptographic, use them to detect changes, not tampering.
+
+Backends are imported when first used, so an algorithm that is not installed
+only fails when it is asked for. The alias `fast` resolves to the fastest
+algorithm that is installed, falling back to `blake2b`, which is always
+available. Hashers are named for their registry name, so
+:py:attr:`~pbs_parse.snippets.hash.file_hash.HashedFile.hash_method` records the
+algorithm that was used.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Callable
+
+from pbs_parse.snippets.hash.tree_hash import TREE_HASH_NAME, TreeHasher
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+HasherFactory = Callable[[], "_Hash"]
+
+FAST_ALIAS = "fast"
+FAST_PREFERENCE = ("xxh3_128", "blake3")
+FAST_FALLBACK = "blake2b"
+
+
+class UnknownAlgorithmError(ValueError):
+    """No algorithm has this name."""
+
+
+class UnavailableAlgorithmError(ValueError):
+    """The algorithm's optional package is not installed."""
+
+
+@dataclass(frozen=True)
+class HashAlgorithm:
+    """
+    A registered hash algorithm.
+
+    Args:
+        name: The registry name, also used as the hasher's `name`.
+        module: The module that provides the hasher.
+        constructor: The name of the hasher's constructor in `module`.
+        cryptographic: Whether the algorithm resists deliberate collisions.
+        install_hint: How to install `module`, if it is optional.
+    """
+
+    name: str
+    module: str
+    constructor: str
+    cryptographic: bool = True
+    install_hint: str = ""
+
+    def factory(self) -> HasherFactory:
+        """
+        Get the hasher constructor.
+
+        Raises:
+            UnavailableAlgorithmError: If the module is not installed.
+        """
+        try:
+            module = import_module(self.module)
+        except ImportError as error:
+            raise UnavailableAlgorithmError(
+                f"Hash algorithm {self.name!r} requires {self.module}, "
+                f"install with `{self.install_hint or 'pip install ' + self.module}`."
+            ) from error
+        return getattr(module, self.constructor)
+
+    def is_available(self) -> bool:
+        try:
+            self.factory()
+        except UnavailableAlgorithmError:
+            return False
+        return True
+
+
+class NamedHasher:
+    """
+    Wraps a hasher from another package, so its `name` is the registry name.
+
+    Methods are copied from the hasher when it is wrapped, so calls cost the
+    same as calling the hasher.
+    """
+
+    __slots__ = ("name", "hasher", "update", "digest", "hexdigest")
+
+    def __init__(self, name: str, hasher: Any):
+        self.name = name
+        self.hasher = hasher
+        self.update = hasher.update
+        self.digest = hasher.digest
+        self.hexdigest = hasher.hexdigest
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name!r}, hasher={self.hasher!r})"
+
+    @property
+    def digest_size(self) -> int:
+        return self.hasher.digest_size
+
+    @property
+    def block_size(self) -> int:
+        return self.hasher.block_size
+
+    def copy(self) -> "NamedHasher":
+        return NamedHasher(self.name, self.hasher.copy())
+
+
+_FAST_HINT = "pip install pbs-parse[fast]"
+
+REGISTRY: dict[str, HashAlgorithm] = {
+    algorithm.name: algorithm
+    for algorithm in (
+        HashAlgorithm("xxh3_64", "xxhash", "xxh3_64", False, _FAST_HINT),
+        HashAlgorithm("xxh3_128", "xxhash", "xxh3_128", False, _FAST_HINT),
+        HashAlgorithm("xxh64", "xxhash", "xxh64", False, _FAST_HINT),
+        HashAlgorithm("xxh32", "xxhash", "xxh32", False, _FAST_HINT),
+        HashAlgorithm("blake3", "blake3", "blake3", True, _FAST_HINT),
+    )
+}
+
+
+def register(algorithm: HashAlgorithm, replace: bool = False) -> None:
+    """
+    Add an algorithm to the registry.
+
+    Raises:
+        ValueError: If the name is taken, and `replace` is False.
+    """
+    if not replace and (
+        algorithm.name in REGISTRY
+        or algorithm.name in (TREE_HASH_NAME, FAST_ALIAS)
+        or algorithm.name in hashlib.algorithms_available
+    ):
+        raise ValueError(f"Hash algorithm {algorithm.name!r} is already registered.")
+    REGISTRY[algorithm.name] = algorithm
+
+
+def resolve_algorithm(name: str) -> str:
+    """
+    Resolve an alias, e.g. `fast`, to the name of an available algorithm.
+
+    Other names are returned unchanged.
+    """
+    if name != FAST_ALIAS:
+        return name
+    for candidate in FAST_PREFERENCE:
+        if REGISTRY[candidate].is_available():
+            return candidate
+    return FAST_FALLBACK
+
+
+def new_hasher(name: str) -> "_Hash":
+    """
+    Make a new hasher by name, or alias.
+
+    Unlike :py:func:`hashlib.new`, this can be pickled, e.g. as
+    `functools.partial(new_hasher, "md5")`, for use with a process pool.
+
+    Raises:
+        UnknownAlgorithmError: If no algorithm has this name.
+        UnavailableAlgorithmError: If the algorithm's package is not installed.
+    """
+    name = resolve_algorithm(name)
+    if name == TREE_HASH_NAME:
+        return TreeHasher()  # type: ignore[return-value]
+    registered = REGISTRY.get(name)
+    if registered is not None:
+        return NamedHasher(name, registered.factory()())  # type: ignore[return-value]
+    try:
+        return hashlib.new(name)
+    except ValueError as error:
+        raise UnknownAlgorithmError(f"Unknown hash algorithm {name!r}.") from error
+
+
+def algorithm_names() -> list[str]:
+    """Every algorithm name, installed or not, sorted."""
+    return sorted({*hashlib.algorithms_available, TREE_HASH_NAME, *REGISTRY})
+
+
+def is_available(name: str) -> bool:
+    """Whether :py:func:`new_hasher` can make a hasher for `name`."""
+    try:
+        new_hasher(name)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,229 @@
+####################################################
+#                                                  #
+#         src/snippets/hash/manifest.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T12:02:18-07:00            #
+# Last Modified: 2026-10-18T19:02:18.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Create and verify checksum manifests, in the format used by `md5sum`.
+
+Each line is `<hexdigest>  <path>`. Paths with a backslash or newline are
+escaped, and the line starts with a backslash, the same as GNU coreutils, so
+manifests can be checked with `md5sum -c`, `sha256sum -c`, etc.
+
+Files are hashed in parallel, and lines are streamed to and from the manifest,
+so memory use does not grow with the number of files.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    TextIO,
+)
+
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    ReadMode,
+    hash_file,
+)
+from pbs_parse.snippets.hash.multi_file_hash import hash_files, ordered_map, walk_files
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+CheckStatus = Literal["OK", "FAILED", "UNREADABLE"]
+
+
+@dataclass
+class ManifestCheck:
+    file_path: Path
+    expected_hash: str
+    actual_hash: str | None
+    status: CheckStatus
+
+
+def format_manifest_line(file_hash: str, name: str) -> str:
+    """Format a manifest line, escaping the name the same way as `md5sum`."""
+    if "\\" in name or "\n" in name or "\r" in name:
+        name = name.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+        return f"\\{file_hash}  {name}\n"
+    return f"{file_hash}  {name}\n"
+
+
+def _unescape(name: str) -> str:
+    result = []
+    chars = iter(name)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            result.append({"n": "\n", "r": "\r", "\\": "\\"}.get(escaped, escaped))
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def parse_manifest_line(line: str) -> tuple[str, str]:
+    """
+    Parse a manifest line.
+
+    Accepts text mode lines, `<hash>  <name>`, and binary mode lines,
+    `<hash> *<name>`.
+
+    Raises:
+        ValueError: If the line is not a manifest line.
+
+    Returns:
+        The hexdigest, and the unescaped name.
+    """
+    line = line.rstrip("\n")
+    escaped = line.startswith("\\")
+    if escaped:
+        line = line[1:]
+    file_hash, separator, name = line.partition(" ")
+    if not separator or not file_hash or name[:1] not in (" ", "*") or not name[1:]:
+        raise ValueError(f"Not a manifest line: {line!r}")
+    name = name[1:]
+    return file_hash.lower(), _unescape(name) if escaped else name
+
+
+def read_manifest(manifest: TextIO) -> Iterator[tuple[str, str]]:
+    """
+    Read the lines of a manifest, one at a time.
+
+    Blank lines, and lines starting with `#`, are skipped.
+
+    Raises:
+        ValueError: If a line is not a manifest line, with the line number.
+
+    Yields:
+        The hexdigest, and the name, for each line.
+    """
+    for line_number, line in enumerate(manifest, start=1):
+        if not line.strip() or line.startswith("#"):
+            continue
+        try:
+            yield parse_manifest_line(line)
+        except ValueError as error:
+            raise ValueError(f"Line {line_number}: {error}") from error
+
+
+def write_manifest(
+    root: Path,
+    manifest: TextIO,
+    hasher_factory: Callable[[], "_Hash"],
+    jobs: int = 1,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+    exclude: Iterable[Path] = (),
+) -> int:
+    """
+    Hash every file below `root`, and write a manifest line for each.
+
+    Files are visited in sorted order, and names are relative to `root`, using
+    `/` as the separator.
+
+    Args:
+        root: The directory to walk.
+        manifest: The text file to write lines to.
+        hasher_factory: Called once per file to make a new hasher.
+        jobs: The number of files hashed at the same time. Defaults to 1.
+        block_size: The block size used to read the files, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the files. Defaults to `read`.
+        exclude: Files to leave out, e.g. the manifest itself.
+
+    Returns:
+        The number of files written to the manifest.
+    """
+    excluded = {path.resolve() for path in exclude}
+    file_paths = (
+        path
+        for path in walk_files(root)
+        if not excluded or path.resolve() not in excluded
+    )
+    count = 0
+    results = hash_files(
+        file_paths,
+        hasher_factory=hasher_factory,
+        jobs=jobs,
+        block_size=block_size,
+        read_mode=read_mode,
+    )
+    for result in results:
+        name = result.file_path.relative_to(root).as_posix()
+        manifest.write(format_manifest_line(result.file_hash, name))
+        count += 1
+    return count
+
+
+def _check_entry(
+    entry: tuple[str, str],
+    root: Path,
+    hasher_factory: Callable[[], "_Hash"],
+    block_size: BlockSize,
+    read_mode: ReadMode,
+) -> ManifestCheck:
+    expected_hash, name = entry
+    file_path = root / name
+    try:
+        actual_hash = hash_file(
+            file_path, hasher_factory(), block_size=block_size, read_mode=read_mode
+        )
+    except OSError:
+        return ManifestCheck(file_path, expected_hash, None, "UNREADABLE")
+    status: CheckStatus = "OK" if actual_hash == expected_hash else "FAILED"
+    return ManifestCheck(file_path, expected_hash, actual_hash, status)
+
+
+def verify_manifest(
+    manifest: TextIO,
+    root: Path,
+    hasher_factory: Callable[[], "_Hash"],
+    jobs: int = 1,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    read_mode: ReadMode = "read",
+) -> Generator[ManifestCheck, None, None]:
+    """
+    Check the files listed in a manifest, in parallel.
+
+    Results are yielded in manifest order. Stop iterating to stop checking, e.g.
+    on the first failure. Work that has not started is cancelled.
+
+    Args:
+        manifest: The text file to read lines from.
+        root: Names in the manifest are relative to this directory.
+        hasher_factory: Called once per file to make a new hasher.
+        jobs: The number of files hashed at the same time. Defaults to 1.
+        block_size: The block size used to read the files, or `auto`.
+            Defaults to 2**10*64 (64K).
+        read_mode: How blocks are read from the files. Defaults to `read`.
+
+    Yields:
+        The result of checking each file.
+    """
+    worker = partial(
+        _check_entry,
+        root=root,
+        hasher_factory=hasher_factory,
+        block_size=block_size,
+        read_mode=read_mode,
+    )
+    entries = read_manifest(manifest)
+    if jobs <= 1:
+        yield from map(worker, entries)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from ordered_map(executor, worker, entries, window=jobs * 4)
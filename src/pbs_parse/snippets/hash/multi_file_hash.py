@@ -0,0 +1,251 @@
+####################################################
+#                                                  #
+#     src/snippets/hash/multi_file_hash.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T08:12:40-07:00            #
+# Last Modified: 2026-10-18T20:05:12.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Hash many files concurrently.
+
+Results are always yielded in the same order as the input paths, regardless of
+the order in which the workers finish.
+"""
+
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from glob import glob
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence, TypeVar
+
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    HashedFileProtocol,
+    ReadMode,
+    make_hashed_file,
+    make_multi_hashed_file,
+)
+from pbs_parse.snippets.hash.hash_cache import (
+    HashCache,
+    cached_make_multi_hashed_file,
+)
+from pbs_parse.snippets.hash.hash_registry import new_hasher
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+GLOB_CHARACTERS = "*?["
+
+
+def walk_files(directory: Path, recursive: bool = True) -> Iterator[Path]:
+    """
+    Yield the files in a directory, in sorted order.
+
+    Directory entries are sorted at each level, so the result is stable between
+    runs. Only one directory listing is held in memory at a time.
+
+    Args:
+        directory: The directory to walk.
+        recursive: Descend into sub directories. Defaults to True.
+
+    Yields:
+        The path of each file found.
+    """
+    with os.scandir(directory) as scanner:
+        entries = sorted(scanner, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir():
+            if recursive:
+                yield from walk_files(Path(entry.path), recursive=recursive)
+        elif entry.is_file():
+            yield Path(entry.path)
+
+
+def collect_file_paths(
+    paths: Iterable[str | Path], recursive: bool = True
+) -> Iterator[Path]:
+    """
+    Expand a mix of file paths, directories, and glob patterns into file paths.
+
+    Paths are yielded in input order. Directories and glob matches are expanded
+    in sorted order.
+
+    Args:
+        paths: File paths, directories, or glob patterns.
+        recursive: Descend into sub directories. Defaults to True.
+
+    Raises:
+        FileNotFoundError: If a path does not exist, and is not a glob pattern
+            that matches at least one path.
+
+    Yields:
+        The path of each file.
+    """
+    for item in paths:
+        path = Path(item)
+        if path.is_dir():
+            yield from walk_files(path, recursive=recursive)
+        elif path.exists():
+            yield path
+        elif any(char in str(item) for char in GLOB_CHARACTERS):
+            matches = sorted(glob(str(item), recursive=recursive))
+            if not matches:
+                raise FileNotFoundError(f"No files match {str(item)!r}")
+            for match in matches:
+                match_path = Path(match)
+                if match_path.is_dir():
+                    yield from walk_files(match_path, recursive=recursive)
+                else:
+                    yield match_path
+        else:
+            raise FileNotFoundError(f"No such file or directory: {str(item)!r}")
+
+
+def ordered_map(
+    executor: Executor, func: Callable[[T], R], items: Iterable[T], window: int
+) -> Iterator[R]:
+    """
+    Like :py:meth:`Executor.map`, but with a bounded number of pending tasks.
+
+    `Executor.map` submits every item up front, which holds the whole input, and
+    all of the results, in memory. This keeps at most `window` tasks in flight,
+    and yields results in input order.
+
+    Args:
+        executor: The executor used to run the tasks.
+        func: The function to call on each item.
+        items: The items to process.
+        window: The maximum number of submitted tasks awaiting collection.
+
+    Yields:
+        The result for each item, in input order.
+    """
+    pending: deque[Future[R]] = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def checkpoint_path_for(file_path: Path, checkpoint_dir: Path) -> Path:
+    """The checkpoint file used to resume hashing `file_path`."""
+    key = hashlib.sha1(os.fsencode(os.path.abspath(file_path))).hexdigest()
+    return checkpoint_dir / f"{key}.json"
+
+
+HasherFactory = Callable[[], "_Hash"]
+
+
+def _make_hashed_file(
+    file_path: Path,
+    hasher_factories: Sequence[HasherFactory],
+    block_size: BlockSize,
+    read_mode: ReadMode,
+    cache: HashCache | None = None,
+    checkpoint_dir: Path | None = None,
+) -> HashedFileProtocol:
+    # Module level, so that it can be pickled for a ProcessPoolExecutor.
+    hashers = [hasher_factory() for hasher_factory in hasher_factories]
+    if checkpoint_dir is not None:
+        return make_hashed_file(
+            file_path=file_path,
+            hasher=hashers[0],
+            block_size=block_size,
+            read_mode=read_mode,
+            checkpoint_path=checkpoint_path_for(file_path, checkpoint_dir),
+        )
+    if cache is not None:
+        return cached_make_multi_hashed_file(
+            file_path=file_path,
+            hashers=hashers,
+            cache=cache,
+            block_size=block_size,
+            read_mode=read_mode,
+        )
+    return make_multi_hashed_file(
+        file_path=file_path,
+        hashers=hashers,
+        block_size=block_size,
+        read_mode=read_mode,
+    )
+
+
+def hash_files(
+    file_paths: Iterable[Path],
+    hasher_factory: HasherFactory | Sequence[HasherFactory],
+    jobs: int = 1,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+    use_processes: bool = False,
+    read_mode: ReadMode = "read",
+    cache: HashCache | None = None,
+    checkpoint_dir: Path | None = None,
+) -> Iterator[HashedFileProtocol]:
+    """
+    Hash files concurrently, yielding the results in input order.
+
+    :py:mod:`hashlib` releases the GIL while hashing large buffers, so threads
+    scale well for most algorithms. Use processes for hashers that do not
+    release the GIL. When using processes, `hasher_factory` must be picklable,
+    e.g. `functools.partial(new_hasher, "md5")`.
+
+    Args:
+        file_paths: The files to hash.
+        hasher_factory: Called once per file to make a new hasher. Can also be a
+            sequence of factories, to compute several digests in a single read
+            of each file. The first is the primary digest.
+        jobs: The number of workers. 1 hashes serially in the calling thread.
+        block_size: The block size used to read the files, or `auto`.
+            Defaults to 2**10*64 (64K).
+        use_processes: Use a process pool instead of a thread pool.
+        read_mode: How blocks are read from the files, see
+            :py:func:`~pbs_parse.snippets.hash.file_hash.iter_file_blocks`.
+        cache: Reuse digests of unchanged files from this cache, and store new
+            ones. Can't be used with processes. Defaults to None.
+        checkpoint_dir: Save progress here, and resume from progress saved by an
+            earlier, interrupted call. Needs a single resumable hasher, see
+            :py:func:`~pbs_parse.snippets.hash.file_hash.hash_file_resumable`.
+            Can't be used with a cache. Defaults to None.
+
+    Raises:
+        ValueError: If a cache is used with processes, or with a checkpoint_dir,
+            or a checkpoint_dir is used with more than one hasher.
+
+    Yields:
+        A :py:class:`HashedFile` for each file, in input order.
+    """
+    if cache is not None and use_processes and jobs > 1:
+        raise ValueError("A hash cache can't be shared with worker processes.")
+    if callable(hasher_factory):
+        hasher_factory = [hasher_factory]
+    if checkpoint_dir is not None and (cache is not None or len(hasher_factory) > 1):
+        raise ValueError("Resuming needs a single hasher, and no cache.")
+    worker = partial(
+        _make_hashed_file,
+        hasher_factories=hasher_factory,
+        block_size=block_size,
+        read_mode=read_mode,
+        cache=cache,
+        checkpoint_dir=checkpoint_dir,
+    )
+    if jobs <= 1:
+        yield from map(worker, file_paths)
+        return
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=jobs) as executor:
+        yield from ordered_map(executor, worker, file_paths, window=jobs * 4)
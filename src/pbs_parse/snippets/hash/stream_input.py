@@ -0,0 +1,395 @@
+####################################################
+#                                                  #
+#     src/snippets/hash/stream_input.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T13:05:12-07:00            #
+# Last Modified: 2026-10-18T20:05:12.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Read, and hash, stdin, and compressed files, as streams.
+
+`-` is stdin. Compressed input is detected from its first bytes, and
+decompressed while it is read, without a temporary file:
+
+- gzip, with :py:mod:`gzip`.
+- bzip2, with :py:mod:`bz2`.
+- xz, with :py:mod:`lzma`.
+- zip, one member. Seekable files use :py:mod:`zipfile`. Pipes are read one
+  local header at a time, which supports stored, and deflated, members, but not
+  encryption.
+
+A digest can be taken over the input as it is, or over the decompressed bytes.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import struct
+import sys
+import zipfile
+import zlib
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, Literal
+
+from pbs_parse.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_parse.snippets.hash.file_hash import (
+    DEFAULT_BLOCK_SIZE,
+    BlockSize,
+    iter_file_blocks,
+)
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+STDIN = "-"
+Compression = Literal["auto", "none", "gzip", "bz2", "xz", "zip"]
+COMPRESSIONS = ("auto", "none", "gzip", "bz2", "xz", "zip")
+MAGIC_NUMBERS = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zip": b"PK\x03\x04",
+}
+MAGIC_SIZE = max(len(magic) for magic in MAGIC_NUMBERS.values())
+
+ZIP_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+ZIP_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+ZIP_FLAG_ENCRYPTED = 0x1
+ZIP_FLAG_DESCRIPTOR = 0x8
+ZIP_FLAG_UTF8 = 0x800
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP64_SIZE = 0xFFFFFFFF
+ZIP64_EXTRA_ID = 0x0001
+
+
+class UnsupportedArchiveError(ValueError):
+    """The archive can't be read as a stream, or has no such member."""
+
+
+# Raised by a stream that can't be read, or decompressed.
+STREAM_ERRORS = (OSError, ValueError, EOFError, zipfile.BadZipFile)
+
+
+def detect_compression(head: bytes) -> str | None:
+    """
+    Detect the compression of data from its first bytes.
+
+    Args:
+        head: At least the first :py:data:`MAGIC_SIZE` bytes, if the data is
+            that long.
+
+    Returns:
+        One of `gzip`, `bz2`, `xz`, or `zip`, or None if not compressed.
+    """
+    for compression, magic in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def is_stdin(path: str | Path) -> bool:
+    return str(path) == STDIN
+
+
+def detect_file_compression(file_path: Path) -> str | None:
+    """Detect the compression of a file, see :py:func:`detect_compression`."""
+    with open(file_path, "rb") as file_handle:
+        return detect_compression(file_handle.read(MAGIC_SIZE))
+
+
+@contextmanager
+def open_input(path: str | Path) -> Iterator[BinaryIO]:
+    """
+    Open a file, or stdin for `-`, for reading bytes.
+
+    Stdin is not closed on exit.
+    """
+    if is_stdin(path):
+        yield sys.stdin.buffer
+        return
+    with open(path, "rb") as file_handle:
+        yield file_handle
+
+
+class _IteratorReader(io.RawIOBase):
+    """A read only stream of the bytes from an iterator."""
+
+    def __init__(self, blocks: Iterable[bytes]):
+        self._blocks = iter(blocks)
+        self._block = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        while not self._block:
+            self._block = next(self._blocks, b"")
+            if not self._block:
+                return 0
+        size = min(len(buffer), len(self._block))
+        buffer[:size] = self._block[:size]
+        self._block = self._block[size:]
+        return size
+
+
+def _stream(blocks: Iterable[bytes]) -> BinaryIO:
+    return io.BufferedReader(_IteratorReader(blocks))  # type: ignore[return-value]
+
+
+def _read_head(file_handle: BinaryIO) -> tuple[bytes, BinaryIO]:
+    """
+    Read the first bytes of a stream, without consuming them.
+
+    Returns:
+        The first bytes, and a stream that still starts with them.
+    """
+    if file_handle.seekable():
+        position = file_handle.tell()
+        head = file_handle.read(MAGIC_SIZE)
+        file_handle.seek(position)
+        return head, file_handle
+    head = b""
+    while len(head) < MAGIC_SIZE:
+        block = file_handle.read(MAGIC_SIZE - len(head))
+        if not block:
+            break
+        head += block
+    rest = iter(partial(file_handle.read, DEFAULT_BLOCK_SIZE), b"")
+    return head, _stream(chain([head], rest))
+
+
+class _PushbackReader:
+    """Reads exact sizes from a stream, and can put bytes back."""
+
+    def __init__(self, file_handle: BinaryIO):
+        self.file_handle = file_handle
+        self.pending = b""
+
+    def read(self, size: int) -> bytes:
+        data = self.pending[:size]
+        self.pending = self.pending[size:]
+        while len(data) < size:
+            block = self.file_handle.read(size - len(data))
+            if not block:
+                break
+            data += block
+        return data
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read(size)
+        if len(data) != size:
+            raise zipfile.BadZipFile("Unexpected end of zip data.")
+        return data
+
+    def unread(self, data: bytes) -> None:
+        self.pending = data + self.pending
+
+
+def _inflate(reader: _PushbackReader) -> Iterator[bytes]:
+    """Decompress one deflate stream, putting back the bytes after it."""
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    while not decompressor.eof:
+        block = reader.read(DEFAULT_BLOCK_SIZE)
+        if not block:
+            raise zipfile.BadZipFile("Unexpected end of zip data.")
+        yield decompressor.decompress(block)
+    reader.unread(decompressor.unused_data)
+
+
+def _read_descriptor(reader: _PushbackReader, zip64: bool) -> int:
+    """Read the data descriptor after a member, and return its CRC."""
+    data = reader.read_exact(4)
+    if data == ZIP_DESCRIPTOR_SIGNATURE:
+        data = reader.read_exact(4)
+    (crc,) = struct.unpack("<I", data)
+    # The compressed, and uncompressed, sizes.
+    reader.read_exact(16 if zip64 else 8)
+    return crc
+
+
+def _zip64_compressed_size(extra: bytes) -> int | None:
+    """The compressed size from a ZIP64 extra field, or None if there isn't one."""
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, size = struct.unpack_from("<HH", extra, position)
+        position += 4
+        if header_id == ZIP64_EXTRA_ID:
+            # A local header has both sizes, uncompressed first.
+            _size, compressed_size = struct.unpack_from("<QQ", extra, position)
+            return compressed_size
+        position += size
+    return None
+
+
+def _iter_zip_member_stream(
+    file_handle: BinaryIO, member: str | None
+) -> Iterator[bytes]:
+    """
+    Decompress one member of a zip archive, read as a stream.
+
+    Raises:
+        UnsupportedArchiveError: If the member is missing, or can't be streamed.
+        zipfile.BadZipFile: If the archive is corrupt.
+    """
+    reader = _PushbackReader(file_handle)
+    while True:
+        header = reader.read(ZIP_LOCAL_HEADER.size)
+        if not header.startswith(ZIP_LOCAL_SIGNATURE):
+            # The central directory follows the last member.
+            what = f"member {member!r}" if member else "files"
+            raise UnsupportedArchiveError(f"The zip archive has no {what}.")
+        if len(header) < ZIP_LOCAL_HEADER.size:
+            raise zipfile.BadZipFile("Unexpected end of zip data.")
+        (
+            _signature,
+            _version,
+            flags,
+            method,
+            _time,
+            _date,
+            crc,
+            compressed_size,
+            _size,
+            name_length,
+            extra_length,
+        ) = ZIP_LOCAL_HEADER.unpack(header)
+        name_bytes = reader.read_exact(name_length)
+        name = name_bytes.decode("utf-8" if flags & ZIP_FLAG_UTF8 else "cp437")
+        zip64_size = _zip64_compressed_size(reader.read_exact(extra_length))
+        zip64 = zip64_size is not None
+        if compressed_size == ZIP64_SIZE and zip64_size is not None:
+            compressed_size = zip64_size
+        if flags & ZIP_FLAG_ENCRYPTED:
+            raise UnsupportedArchiveError(
+                f"Zip member {name!r} is encrypted, so can't be read from a "
+                "stream. Read it from a file."
+            )
+        has_descriptor = bool(flags & ZIP_FLAG_DESCRIPTOR)
+        if method == ZIP_DEFLATED:
+            blocks = _inflate(reader)
+        elif method == ZIP_STORED and not has_descriptor:
+            blocks = iter([reader.read_exact(compressed_size)])
+        else:
+            raise UnsupportedArchiveError(
+                f"Zip member {name!r} uses compression method {method}, which "
+                "can't be read from a stream. Read it from a file."
+            )
+        wanted = name == member if member else not name.endswith("/")
+        if not wanted:
+            for _ in blocks:
+                pass
+            if has_descriptor:
+                _read_descriptor(reader, zip64)
+            continue
+        actual_crc = 0
+        for block in blocks:
+            actual_crc = zlib.crc32(block, actual_crc)
+            yield block
+        if has_descriptor:
+            crc = _read_descriptor(reader, zip64)
+        if actual_crc != crc:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for zip member {name!r}.")
+        return
+
+
+def _open_zip_member(file_handle: BinaryIO, member: str | None) -> BinaryIO:
+    archive = zipfile.ZipFile(file_handle)
+    if member is None:
+        names = [info.filename for info in archive.infolist() if not info.is_dir()]
+        if not names:
+            raise UnsupportedArchiveError("The zip archive has no files.")
+        member = names[0]
+    try:
+        return archive.open(member)
+    except KeyError as error:
+        raise UnsupportedArchiveError(
+            f"The zip archive has no member {member!r}."
+        ) from error
+
+
+@contextmanager
+def open_decompressed(
+    file_handle: BinaryIO,
+    compression: Compression = "auto",
+    member: str | None = None,
+) -> Iterator[BinaryIO]:
+    """
+    Decompress a stream as it is read.
+
+    Args:
+        file_handle: The input, opened in binary mode. It is not closed.
+        compression: The compression, `none`, or `auto` to detect it.
+            Defaults to `auto`.
+        member: The zip member to read. Defaults to the first file.
+
+    Raises:
+        UnsupportedArchiveError: If a zip member is missing, or can't be
+            streamed.
+
+    Yields:
+        The decompressed stream.
+    """
+    head, file_handle = _read_head(file_handle)
+    if compression == "auto":
+        compression = detect_compression(head) or "none"  # type: ignore[assignment]
+    if compression == "none":
+        yield file_handle
+        return
+    if compression == "gzip":
+        stream: BinaryIO = gzip.GzipFile(fileobj=file_handle, mode="rb")  # type: ignore[assignment]
+    elif compression == "bz2":
+        stream = bz2.BZ2File(file_handle)  # type: ignore[assignment]
+    elif compression == "xz":
+        stream = lzma.LZMAFile(file_handle)  # type: ignore[assignment]
+    elif compression == "zip" and file_handle.seekable():
+        stream = _open_zip_member(file_handle, member)
+    elif compression == "zip":
+        stream = _stream(_iter_zip_member_stream(file_handle, member))
+    else:
+        raise ValueError(f"Unknown compression {compression!r}.")
+    with stream:
+        yield stream
+
+
+def hash_input(
+    path: str | Path,
+    hasher: "_Hash",
+    decompress: bool = False,
+    compression: Compression = "auto",
+    member: str | None = None,
+    block_size: BlockSize = DEFAULT_BLOCK_SIZE,
+) -> str:
+    """
+    Hash a file, or stdin for `-`, optionally after decompressing it.
+
+    Args:
+        path: The file, or `-`.
+        hasher: The hasher used to generate the hexdigest.
+        decompress: Hash the decompressed bytes, instead of the input as it is.
+            Uncompressed input is hashed as it is. Defaults to False.
+        compression: The compression, see :py:func:`open_decompressed`.
+        member: The zip member to hash. Defaults to the first file.
+        block_size: The block size used to read the input, or `auto`.
+            Defaults to 2**10*64 (64K).
+
+    Returns:
+        A hexidecimal string representing the hash.
+    """
+    with open_input(path) as file_handle:
+        with (
+            open_decompressed(file_handle, compression, member)
+            if decompress
+            else nullcontext(file_handle)
+        ) as stream:
+            return bytes_iterator_hash(
+                iter_file_blocks(stream, block_size), hasher  # type: ignore[arg-type]
+            )
@@ -0,0 +1,316 @@
+####################################################
+#                                                  #
+#        src/snippets/hash/tree_hash.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T11:09:55-07:00            #
+# Last Modified: 2026-10-18T18:09:55.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+A BLAKE2b tree hash, whose state can be saved and restored.
+
+The data is split into fixed size chunks. Each chunk is hashed as a leaf node
+with BLAKE2b's tree parameters, and the root digest is the hash of the leaf
+digests in order. Data of any length, including none, has at least one leaf.
+
+Only finished leaf digests need to be kept to continue hashing, so the state is
+a short list of digests that can be saved as JSON. Hashing resumes from the end
+of the last finished leaf. Leaves don't depend on each other, so they can also
+be hashed in parallel, see :py:func:`hash_file_tree`.
+
+The digest depends on the chunk size, which is part of the hash parameters.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterable
+
+TREE_HASH_NAME = "blake2b-tree"
+DEFAULT_CHUNK_SIZE = 2**20 * 8
+DIGEST_SIZE = 32
+LEAF_READ_SIZE = 2**20
+
+
+def leaf_hasher(index: int, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Make the hasher for the leaf at `index`."""
+    return hashlib.blake2b(
+        digest_size=DIGEST_SIZE,
+        fanout=0,
+        depth=2,
+        leaf_size=chunk_size,
+        node_offset=index,
+        node_depth=0,
+        inner_size=DIGEST_SIZE,
+    )
+
+
+def root_hasher(chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Make the hasher for the root node, which hashes the leaf digests."""
+    return hashlib.blake2b(
+        digest_size=DIGEST_SIZE,
+        fanout=0,
+        depth=2,
+        leaf_size=chunk_size,
+        node_offset=0,
+        node_depth=1,
+        inner_size=DIGEST_SIZE,
+        last_node=True,
+    )
+
+
+def root_digest(leaf_digests: list[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Combine the leaf digests, in order, into the root digest."""
+    root = root_hasher(chunk_size)
+    for leaf_digest in leaf_digests:
+        root.update(leaf_digest)
+    return root.digest()
+
+
+class TreeHasher:
+    """
+    A BLAKE2b tree hasher, with the same interface as a :py:mod:`hashlib` hasher.
+
+    Also implements
+    :py:class:`~pbs_parse.snippets.hash.file_hash.ResumableHasher`, for use with
+    :py:func:`~pbs_parse.snippets.hash.file_hash.hash_file_resumable`.
+
+    Args:
+        data: Initial data to hash. Defaults to b"".
+        chunk_size: The size of each leaf. Defaults to 2**20*8 (8M).
+    """
+
+    name = TREE_HASH_NAME
+    digest_size = DIGEST_SIZE
+    block_size = 128
+
+    def __init__(self, data: bytes = b"", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if not 0 < chunk_size < 2**32:
+            raise ValueError(
+                f"chunk_size must be between 1 and 2**32-1, got {chunk_size}"
+            )
+        self.chunk_size = chunk_size
+        self.leaf_digests: list[bytes] = []
+        self._leaf = leaf_hasher(0, chunk_size)
+        self._leaf_length = 0
+        if data:
+            self.update(data)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(chunk_size={self.chunk_size!r}, "
+            f"bytes_hashed={self.bytes_hashed!r})"
+        )
+
+    @property
+    def bytes_hashed(self) -> int:
+        return len(self.leaf_digests) * self.chunk_size + self._leaf_length
+
+    def update(self, data: bytes, /) -> None:
+        with memoryview(data) as view, view.cast("B") as remaining:
+            while remaining:
+                size = min(self.chunk_size - self._leaf_length, len(remaining))
+                self._leaf.update(remaining[:size])
+                self._leaf_length += size
+                remaining = remaining[size:]
+                if self._leaf_length == self.chunk_size:
+                    self.leaf_digests.append(self._leaf.digest())
+                    self._leaf = leaf_hasher(len(self.leaf_digests), self.chunk_size)
+                    self._leaf_length = 0
+
+    def all_leaf_digests(self) -> list[bytes]:
+        """The digests of the finished leaves, and of the current leaf if needed."""
+        if self._leaf_length or not self.leaf_digests:
+            return [*self.leaf_digests, self._leaf.digest()]
+        return list(self.leaf_digests)
+
+    def digest(self) -> bytes:
+        return root_digest(self.all_leaf_digests(), self.chunk_size)
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def copy(self) -> "TreeHasher":
+        other = TreeHasher(chunk_size=self.chunk_size)
+        other.leaf_digests = list(self.leaf_digests)
+        other._leaf = self._leaf.copy()
+        other._leaf_length = self._leaf_length
+        return other
+
+    def checkpoint(self) -> dict[str, Any]:
+        """
+        Get the state of the finished leaves, as JSON serializable data.
+
+        Data in the current, unfinished leaf is not included, and must be hashed
+        again after a restore, starting from `offset`.
+        """
+        return {
+            "hash_method": self.name,
+            "chunk_size": self.chunk_size,
+            "offset": len(self.leaf_digests) * self.chunk_size,
+            "leaf_digests": [leaf_digest.hex() for leaf_digest in self.leaf_digests],
+        }
+
+    def restore(self, state: dict[str, Any]) -> None:
+        """
+        Replace this hasher's state with state from :py:meth:`checkpoint`.
+
+        Raises:
+            ValueError: If the state is from a different hash method or chunk size,
+                or is not valid.
+        """
+        if (state.get("hash_method"), state.get("chunk_size")) != (
+            self.name,
+            self.chunk_size,
+        ):
+            raise ValueError(
+                f"Can't restore {state.get('hash_method')!r} state with chunk size "
+                f"{state.get('chunk_size')!r} into {self!r}."
+            )
+        try:
+            leaf_digests = [bytes.fromhex(leaf) for leaf in state["leaf_digests"]]
+        except (KeyError, TypeError) as error:
+            raise ValueError(f"Can't restore leaf digests: {error!r}") from error
+        if state.get("offset") != len(leaf_digests) * self.chunk_size:
+            raise ValueError(
+                f"Offset {state.get('offset')!r} does not match the leaves."
+            )
+        self.leaf_digests = leaf_digests
+        self._leaf = leaf_hasher(len(leaf_digests), self.chunk_size)
+        self._leaf_length = 0
+
+
+@dataclass
+class TreeHashResult:
+    """The root digest of a file, and the digest of each chunk, as hex strings."""
+
+    file_path: Path
+    file_hash: str
+    chunk_size: int
+    file_size: int
+    leaf_digests: list[str] = field(default_factory=list)
+    hash_method: str = TREE_HASH_NAME
+
+    def chunk_range(self, index: int) -> tuple[int, int]:
+        """The start and end byte offsets of a chunk."""
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.file_size)
+
+
+def leaf_count(file_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """The number of leaves for data of `file_size` bytes."""
+    return max(1, -(-file_size // chunk_size))
+
+
+def hash_leaf(
+    file_path: Path,
+    index: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    read_size: int = LEAF_READ_SIZE,
+) -> bytes:
+    """
+    Hash one chunk of a file.
+
+    Args:
+        file_path: The file.
+        index: The chunk to hash.
+        chunk_size: The size of each chunk. Defaults to 2**20*8 (8M).
+        read_size: The size of each read. Defaults to 2**20 (1M).
+
+    Returns:
+        The leaf digest.
+    """
+    hasher = leaf_hasher(index, chunk_size)
+    buffer = bytearray(min(read_size, chunk_size))
+    remaining = chunk_size
+    with open(file_path, "rb") as file_handle, memoryview(buffer) as view:
+        file_handle.seek(index * chunk_size)
+        while remaining:
+            size = file_handle.readinto(view[: min(remaining, len(view))])
+            if not size:
+                break
+            hasher.update(view[:size])
+            remaining -= size
+    return hasher.digest()
+
+
+def _hash_leaves(
+    file_path: Path, indexes: Iterable[int], chunk_size: int, jobs: int
+) -> list[bytes]:
+    worker = partial(hash_leaf, file_path, chunk_size=chunk_size)
+    if jobs <= 1:
+        return list(map(worker, indexes))
+    # blake2b releases the GIL while hashing, so threads run in parallel.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(worker, indexes))
+
+
+def hash_file_tree(
+    file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, jobs: int = 1
+) -> TreeHashResult:
+    """
+    Hash a file's chunks in parallel, and combine them into the root digest.
+
+    The root digest is the same as the digest from :py:class:`TreeHasher` with
+    the same chunk size.
+
+    Args:
+        file_path: The file to hash.
+        chunk_size: The size of each chunk. Defaults to 2**20*8 (8M).
+        jobs: The number of chunks hashed at the same time. Defaults to 1.
+
+    Returns:
+        The root digest, and the digest of every chunk.
+    """
+    file_size = os.stat(file_path).st_size
+    leaf_digests = _hash_leaves(
+        file_path, range(leaf_count(file_size, chunk_size)), chunk_size, jobs
+    )
+    return TreeHashResult(
+        file_path=file_path,
+        file_hash=root_digest(leaf_digests, chunk_size).hex(),
+        chunk_size=chunk_size,
+        file_size=file_size,
+        leaf_digests=[leaf_digest.hex() for leaf_digest in leaf_digests],
+    )
+
+
+def find_corrupt_chunks(
+    file_path: Path,
+    expected: TreeHashResult,
+    indexes: Iterable[int] | None = None,
+    jobs: int = 1,
+) -> list[int]:
+    """
+    Find the chunks of a file that no longer match an earlier tree hash.
+
+    Args:
+        file_path: The file to check.
+        expected: The result of an earlier :py:func:`hash_file_tree`.
+        indexes: Only check these chunks. Defaults to every chunk.
+        jobs: The number of chunks hashed at the same time. Defaults to 1.
+
+    Returns:
+        The indexes of the chunks that don't match, in order. If the file size
+        changed, chunks past the end of the shorter version are included.
+    """
+    file_size = os.stat(file_path).st_size
+    count = max(leaf_count(file_size, expected.chunk_size), len(expected.leaf_digests))
+    if indexes is None:
+        indexes = range(count)
+    indexes = sorted(set(indexes))
+    actual = _hash_leaves(file_path, indexes, expected.chunk_size, jobs)
+    corrupt = []
+    for index, leaf_digest in zip(indexes, actual):
+        if index >= len(expected.leaf_digests) or index >= leaf_count(
+            file_size, expected.chunk_size
+        ):
+            corrupt.append(index)
+        elif leaf_digest.hex() != expected.leaf_digests[index]:
+            corrupt.append(index)
+    return corrupt
@@ -5,15 +5,21 @@
 ####################################################
 # Created by: Chad Lowe                            #
 # Created on: 2022-10-31T08:12:18-07:00            #
-# Last Modified: 2022-12-04T01:11:10.071840+00:00  #
+# Last Modified: 2026-10-18T19:20:41.000000+00:00  #
 # Source: https://github.com/DonalChilde/snippets  #
 ####################################################
 """
 Convenience functions for logging.
 
+The queue loggers only put records on a queue in the calling thread. A
+:py:class:`QueueListener` thread formats and writes them, so slow handlers, and
+file rollover, stay out of hot loops.
 """
+import atexit
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -22,6 +28,8 @@ logger.addHandler(logging.NullHandler())
 DEFAULT_FORMAT = (
     "%(asctime)s %(levelname)s:%(funcName)s: %(message)s [in %(pathname)s:%(lineno)d]"
 )
+DEFAULT_MAX_BYTES = 102400
+DEFAULT_BACKUP_COUNT = 10
 
 
 def rotating_file_handler(
@@ -29,6 +37,8 @@ def rotating_file_handler(
     file_name: str,
     log_level: int,
     formater: logging.Formatter | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
 ) -> RotatingFileHandler:
     """
     Convenience function to init a rotating file handler.
@@ -41,6 +51,8 @@ def rotating_file_handler(
         file_name: The name of the log file, without suffix.
         log_level: The log level
         format_string: The format string for the log message. Defaults to None.
+        max_bytes: Roll over to a new file at this size. Defaults to 102400.
+        backup_count: The number of old log files to keep. Defaults to 10.
 
     Returns:
         RotatingFileHandler: The confgured RotatingFileHandler.
@@ -51,7 +63,9 @@ def rotating_file_handler(
         log_file = log_dir / Path(file_name)
     else:
         log_file = log_dir / Path(f"{file_name}.log")
-    handler = RotatingFileHandler(log_file, maxBytes=102400, backupCount=10)
+    handler = RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count
+    )
     if formater is None:
         formater = logging.Formatter(fmt=DEFAULT_FORMAT)
     handler.setFormatter(fmt=formater)
@@ -65,6 +79,8 @@ def rotating_file_logger(
     log_level: int,
     logfile_name: str | None = None,
     formater: logging.Formatter | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
 ):
     """
     Configures a logger with a rotating file handler.
@@ -75,6 +91,8 @@ def rotating_file_logger(
         log_dir: The log directory.
         log_name: The name of the logger.
         log_level: The log level.
+        max_bytes: Roll over to a new file at this size. Defaults to 102400.
+        backup_count: The number of old log files to keep. Defaults to 10.
 
     Returns:
         The logger.
@@ -83,7 +101,12 @@ def rotating_file_logger(
     if logfile_name is None:
         logfile_name = logger_name
     handler = rotating_file_handler(
-        log_dir=log_dir, file_name=logfile_name, log_level=log_level, formater=formater
+        log_dir=log_dir,
+        file_name=logfile_name,
+        log_level=log_level,
+        formater=formater,
+        max_bytes=max_bytes,
+        backup_count=backup_count,
     )
     logger_.addHandler(handler)
     logger_.setLevel(log_level)
@@ -91,6 +114,118 @@ def rotating_file_logger(
     return logger_
 
 
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    A :py:class:`QueueHandler` that leaves formatting to the listener thread.
+
+    Only the message arguments are merged in the calling thread, so later changes
+    to mutable arguments don't change the logged message.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class StoppableQueueListener(QueueListener):
+    """
+    A :py:class:`QueueListener` that is stopped, and flushed, at exit.
+
+    :py:meth:`start` and :py:meth:`stop` can be called more than once. Stopping
+    processes every queued record, then flushes the handlers.
+    """
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        super().start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        atexit.unregister(self.stop)
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+def queue_handler(
+    *handlers: logging.Handler,
+    log_level: int = logging.NOTSET,
+    start: bool = True,
+) -> tuple[QueueHandler, StoppableQueueListener]:
+    """
+    Make a queue handler, and a listener that passes its records to `handlers`.
+
+    Each handler's own level is respected.
+
+    Args:
+        handlers: The handlers that format and write records.
+        log_level: The log level of the queue handler. Defaults to NOTSET.
+        start: Start the listener thread. Defaults to True.
+
+    Returns:
+        The queue handler to add to a logger, and its listener.
+    """
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = DeferredFormatQueueHandler(log_queue)
+    handler.setLevel(log_level)
+    listener = StoppableQueueListener(log_queue, *handlers, respect_handler_level=True)
+    if start:
+        listener.start()
+    return handler, listener
+
+
+def queue_rotating_file_logger(
+    logger_name: str,
+    log_dir: Path,
+    log_level: int,
+    logfile_name: str | None = None,
+    formater: logging.Formatter | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+) -> tuple[logging.Logger, StoppableQueueListener]:
+    """
+    Configures a logger with a rotating file handler, behind a queue.
+
+    Like :py:func:`rotating_file_logger`, but log calls only put the record on a
+    queue. Records are formatted and written, and files rolled over, in the
+    listener's thread. The listener is started, and is stopped at exit. Call
+    `listener.stop()` to flush the log earlier.
+
+    Args:
+        logger_name: The name of the logger.
+        log_dir: The log directory.
+        log_level: The log level.
+        logfile_name: The name of the log file. Defaults to the logger name.
+        formater: The formatter. Defaults to None, for the default format.
+        max_bytes: Roll over to a new file at this size. Defaults to 102400.
+        backup_count: The number of old log files to keep. Defaults to 10.
+
+    Returns:
+        The logger, and the running listener.
+    """
+    logger_ = logging.getLogger(logger_name)
+    if logfile_name is None:
+        logfile_name = logger_name
+    file_handler = rotating_file_handler(
+        log_dir=log_dir,
+        file_name=logfile_name,
+        log_level=log_level,
+        formater=formater,
+        max_bytes=max_bytes,
+        backup_count=backup_count,
+    )
+    handler, listener = queue_handler(file_handler, log_level=log_level)
+    logger_.addHandler(handler)
+    logger_.setLevel(log_level)
+    logger_.info("Queue rotating file logger initialized with %r", file_handler)
+    return logger_, listener
+
+
 def add_handlers_to_target_logger_by_name(
     source_logger: logging.Logger, target_logger_name: str
 ):
@@ -0,0 +1,233 @@
+####################################################
+#                                                  #
+#     src/snippets/profiling/phase_timer.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T12:31:06-07:00            #
+# Last Modified: 2026-10-18T20:05:12.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Time the phases of a run, e.g. read, hash, parse, and write, and count the bytes
+each one handles.
+
+Phase times are summed over every thread, so with parallel workers a phase can
+take longer than the wall time of the run.
+"""
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, TypeVar
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+T = TypeVar("T")
+
+
+def _mb_per_second(byte_count: int, elapsed_ns: int) -> float | None:
+    if not byte_count or not elapsed_ns:
+        return None
+    return byte_count / 1e6 / (elapsed_ns / 1e9)
+
+
+@dataclass
+class PhaseStats:
+    elapsed_ns: int = 0
+    byte_count: int = 0
+    calls: int = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.elapsed_ns / 1e9
+
+    @property
+    def mb_per_second(self) -> float | None:
+        """Throughput while in this phase, or None if no bytes were counted."""
+        return _mb_per_second(self.byte_count, self.elapsed_ns)
+
+
+class PhaseTimer:
+    """
+    Collects the time spent, and bytes handled, in each phase of a run.
+
+    Safe to share between threads.
+
+    Args:
+        name: The name of the run, e.g. the command. Defaults to "".
+        start_ns: The start of the run, from :py:func:`time.perf_counter_ns`.
+            Defaults to now.
+    """
+
+    def __init__(self, name: str = "", start_ns: int | None = None):
+        self.name = name
+        self.start_ns = perf_counter_ns() if start_ns is None else start_ns
+        self.end_ns: int | None = None
+        self.phases: dict[str, PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name!r})"
+
+    @property
+    def elapsed_ns(self) -> int:
+        """The wall time of the run, up to :py:meth:`stop`, or now."""
+        end_ns = perf_counter_ns() if self.end_ns is None else self.end_ns
+        return end_ns - self.start_ns
+
+    def stop(self) -> None:
+        """Record the end of the run."""
+        if self.end_ns is None:
+            self.end_ns = perf_counter_ns()
+
+    def add(
+        self, phase: str, elapsed_ns: int, byte_count: int = 0, calls: int = 1
+    ) -> None:
+        """Add time, and bytes, to a phase."""
+        with self._lock:
+            stats = self.phases.setdefault(phase, PhaseStats())
+            stats.elapsed_ns += elapsed_ns
+            stats.byte_count += byte_count
+            stats.calls += calls
+
+    @contextmanager
+    def phase(self, phase: str, byte_count: int = 0) -> Iterator[None]:
+        """Time the body of a `with` statement as `phase`."""
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(phase, perf_counter_ns() - start, byte_count)
+
+    def iterate(
+        self,
+        items: Iterable[T],
+        phase: str = "read",
+        size: Callable[[T], int] | None = len,
+    ) -> Iterator[T]:
+        """
+        Time each step of an iterator as `phase`.
+
+        Time spent by the caller between steps is not included.
+
+        Args:
+            items: The iterator, e.g. of blocks read from a file.
+            phase: The phase. Defaults to "read".
+            size: Gets the bytes in an item, or None to not count bytes.
+                Defaults to `len`.
+        """
+        iterator = iter(items)
+        while True:
+            start = perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(phase, perf_counter_ns() - start)
+                return
+            byte_count = 0 if size is None else size(item)
+            self.add(phase, perf_counter_ns() - start, byte_count)
+            yield item
+
+    def byte_count(self) -> int:
+        """The bytes read, or if nothing was read, the most bytes in any phase."""
+        with self._lock:
+            if "read" in self.phases:
+                return self.phases["read"].byte_count
+            return max((stats.byte_count for stats in self.phases.values()), default=0)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The timings, as JSON serializable data."""
+        elapsed_ns = self.elapsed_ns
+        byte_count = self.byte_count()
+        with self._lock:
+            phases = {
+                phase: {
+                    "seconds": stats.seconds,
+                    "bytes": stats.byte_count,
+                    "calls": stats.calls,
+                    "mb_per_second": stats.mb_per_second,
+                }
+                for phase, stats in self.phases.items()
+            }
+        return {
+            "name": self.name,
+            "wall_seconds": elapsed_ns / 1e9,
+            "bytes": byte_count,
+            "mb_per_second": _mb_per_second(byte_count, elapsed_ns),
+            "phases": phases,
+        }
+
+    def format_report(self) -> str:
+        """The timings, as a table."""
+        record = self.to_dict()
+
+        def row(label: str, seconds: float, byte_count: int, rate: float | None):
+            rate_str = "-" if rate is None else f"{rate:,.1f}"
+            return f"{label:<12} {seconds:>10.4f} {byte_count:>16,} {rate_str:>10}"
+
+        lines = [
+            f"Profile: {self.name}",
+            f"{'phase':<12} {'seconds':>10} {'bytes':>16} {'MB/s':>10}",
+        ]
+        for phase, stats in record["phases"].items():
+            lines.append(
+                row(phase, stats["seconds"], stats["bytes"], stats["mb_per_second"])
+            )
+        lines.append(
+            row(
+                "wall",
+                record["wall_seconds"],
+                record["bytes"],
+                record["mb_per_second"],
+            )
+        )
+        return "\n".join(lines)
+
+
+class TimedHasher:
+    """
+    Wraps a hasher, timing updates as the `hash` phase.
+
+    Hash functions read the next block between updates, so the time from when the
+    hasher was made, or last updated, to the next update is counted as the `read`
+    phase. When several hashers share one read, count reads with only one of them.
+    Other attributes, e.g. `checkpoint`, are passed through to the hasher.
+
+    Args:
+        hasher: The hasher to wrap.
+        timer: Collects the timings.
+        count_reads: Count the time between updates as reading. Defaults to True.
+    """
+
+    def __init__(self, hasher: "_Hash", timer: PhaseTimer, count_reads: bool = True):
+        self.hasher = hasher
+        self.timer = timer
+        self.count_reads = count_reads
+        self._last_ns = perf_counter_ns()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(hasher={self.hasher!r})"
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.hasher, name)
+
+    def update(self, data: bytes, /) -> None:
+        start = perf_counter_ns()
+        size = len(data)
+        if self.count_reads:
+            self.timer.add("read", start - self._last_ns, size)
+        self.hasher.update(data)
+        self._last_ns = perf_counter_ns()
+        self.timer.add("hash", self._last_ns - start, size)
+
+    def digest(self) -> bytes:
+        return self.hasher.digest()
+
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+    def copy(self) -> "TimedHasher":
+        return TimedHasher(self.hasher.copy(), self.timer, self.count_reads)
@@ -33,3 +33,11 @@ def test_output_dir_(tmp_path_factory) -> Path:
     """make a temp directory for output data."""
     test_app_data_dir = tmp_path_factory.mktemp("pdf2txt")
     return test_app_data_dir
+
+
+@pytest.fixture(autouse=True)
+def app_dir_(tmp_path: Path, monkeypatch) -> Path:
+    """Keep the app directory, and the caches in it, out of the user's config."""
+    app_dir = tmp_path / "config"
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(app_dir))
+    return app_dir
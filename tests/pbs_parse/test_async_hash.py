@@ -0,0 +1,81 @@
+"""Test cases for the asyncio hashing snippet."""
+
+import asyncio
+import os
+from hashlib import md5, sha256
+from pathlib import Path
+from time import perf_counter
+
+from pbs_parse.snippets.hash.async_hash import (
+    async_bytes_iterator_hash,
+    hash_file_async,
+    hash_files_async,
+)
+
+MAX_TICK_LAG = 0.2
+MIN_TICKS = 2
+
+
+async def _ticker(stop: asyncio.Event, interval: float = 0.005) -> tuple[float, int]:
+    """Tick until stopped, returning the longest gap between ticks, and the
+    number of ticks before the stop."""
+    worst = 0.0
+    ticks = 0
+    last = perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+        if not stop.is_set():
+            ticks += 1
+    return worst, ticks
+
+
+def test_loop_stays_responsive(tmp_path: Path) -> None:
+    file_path = tmp_path / "large.bin"
+    with open(file_path, "wb") as file_out:
+        for _ in range(64):
+            file_out.write(os.urandom(2**20))
+
+    async def run() -> tuple[str, tuple[float, int]]:
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(_ticker(stop))
+        # Let the ticker start, so a hash that blocks the loop stalls it.
+        await asyncio.sleep(0)
+        digest = await hash_file_async(file_path, sha256(), block_size=2**20)
+        stop.set()
+        return digest, await ticker
+
+    digest, (worst_lag, ticks) = asyncio.run(run())
+    assert digest == sha256(file_path.read_bytes()).hexdigest()
+    assert worst_lag < MAX_TICK_LAG
+    # A blocking hash finishes before the ticker wakes, with no ticks.
+    assert ticks >= MIN_TICKS
+
+
+def test_hash_files_async(tmp_path: Path) -> None:
+    paths = []
+    for index in range(10):
+        path = tmp_path / f"file_{index}.bin"
+        path.write_bytes(os.urandom(index * 1000))
+        paths.append(path)
+    results = asyncio.run(hash_files_async(paths, md5, concurrency=3))
+    assert [result.file_path for result in results] == paths
+    for path, result in zip(paths, results):
+        assert result.file_hash == md5(path.read_bytes()).hexdigest()
+
+
+def test_async_bytes_iterator_hash() -> None:
+    blocks = [os.urandom(size) for size in (10, 2**20, 5000, 3 * 2**20, 0, 7)]
+
+    async def stream():
+        for block in blocks:
+            await asyncio.sleep(0)
+            yield block
+
+    async def run() -> str:
+        limiter = asyncio.Semaphore(1)
+        return await async_bytes_iterator_hash(stream(), md5(), limiter=limiter)
+
+    assert asyncio.run(run()) == md5(b"".join(blocks)).hexdigest()
@@ -0,0 +1,70 @@
+"""Test cases for the compact bid package models."""
+
+import io
+from importlib import resources
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+
+from pbs_parse.bid_package.columnar import ColumnarPairings, StringTable
+from pbs_parse.bid_package.parser import parse_bid_package, parse_bid_package_file
+
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture(name="pairings")
+def pairings_():
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    with resources.as_file(file_resource) as input_path:
+        return list(parse_bid_package_file(input_path))
+
+
+def test_records_are_compact(pairings):
+    leg = pairings[0].duty_periods[0].legs[0]
+    assert not hasattr(leg, "__dict__")
+    assert not hasattr(pairings[0].duty_periods[0], "__dict__")
+    other = pairings[0].duty_periods[1].legs[0]
+    # Parsed from different lines, but interned.
+    assert leg.equipment is other.equipment
+    assert (
+        leg.departure_station is pairings[1].duty_periods[0].legs[0].departure_station
+    )
+
+
+def test_string_table():
+    table = StringTable()
+    assert [table.code(value) for value in ["BOS", "ORD", "BOS"]] == [0, 1, 0]
+    assert table[1] == "ORD"
+    assert len(table) == 2
+
+
+def test_columnar_round_trip(pairings):
+    columns = ColumnarPairings(pairings)
+    assert len(columns) == 5
+    assert len(columns.duty_periods) == 9
+    assert len(columns.legs) == 13
+    assert list(columns) == pairings
+    assert columns[-1] == pairings[-1]
+    with pytest.raises(IndexError):
+        columns[5]
+    assert columns.legs.columns()["deadhead"].tolist()[:2] == [0, 1]
+    assert columns.nbytes() < 1000
+
+
+def test_columnar_extend(pairings):
+    columns = ColumnarPairings()
+    columns.extend(pairings[:2])
+    columns.append(pairings[2])
+    assert list(columns) == pairings[:3]
+    assert columns.dates.columns()["pairing"].tolist() == [0] * 4 + [1] * 2 + [2] * 3
+
+
+def test_columnar_limits():
+    # The largest values the parser accepts fit the column types.
+    text = (
+        "SEQ 1 OPS 65535 BASE BOS EQP 320\nRPT 0600\n"
+        "LEG 255 1 BOS 0700 JFK 0800 320 1092:15\nRLS 0830\n"
+        "TTL 35791394:07 1:00 1:00\n"
+    )
+    pairings = list(parse_bid_package(io.StringIO(text)))
+    assert list(ColumnarPairings(pairings)) == pairings
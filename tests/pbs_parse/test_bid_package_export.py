@@ -0,0 +1,147 @@
+"""Test cases for exporting bid packages to columnar files."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+from typer.testing import CliRunner
+
+from pbs_parse.bid_package.export import (
+    TABLES,
+    export_pairings,
+    read_tables,
+    table_path,
+)
+from pbs_parse.bid_package.models import DutyPeriod, Leg, Pairing
+from pbs_parse.bid_package.parser import ParseError, parse_bid_package_file
+from pbs_parse.cli.main_typer import app
+
+pytest.importorskip("pyarrow")
+
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="bid_package_path")
+def bid_package_path_() -> Path:
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    ) as file_path:
+        return file_path
+
+
+def rebuild(tables) -> list[Pairing]:
+    """Join the exported tables back into pairings."""
+    legs: dict[int, list[Leg]] = {}
+    for row in tables["legs"].to_pylist():
+        duty_period_id = row.pop("duty_period_id")
+        del row["leg_id"], row["pairing_id"]
+        legs.setdefault(duty_period_id, []).append(Leg(**row))
+    duty_periods: dict[int, list[DutyPeriod]] = {}
+    for row in tables["duty_periods"].to_pylist():
+        duty_period_id = row.pop("duty_period_id")
+        pairing_id = row.pop("pairing_id")
+        duty_periods.setdefault(pairing_id, []).append(
+            DutyPeriod(legs=legs.get(duty_period_id, []), **row)
+        )
+    dates: dict[int, list[str]] = {}
+    for row in tables["dates"].to_pylist():
+        dates.setdefault(row["pairing_id"], []).append(row["date"])
+    pairings = []
+    for row in tables["pairings"].to_pylist():
+        pairing_id = row.pop("pairing_id")
+        pairings.append(
+            Pairing(
+                dates=dates.get(pairing_id, []),
+                duty_periods=duty_periods.get(pairing_id, []),
+                **row,
+            )
+        )
+    return pairings
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_export_round_trip(bid_package_path: Path, tmp_path: Path, file_format):
+    pairings = list(parse_bid_package_file(bid_package_path))
+    # Small batches check that ids continue across batches.
+    rows = export_pairings(pairings, tmp_path, file_format, batch_size=2)
+    assert rows == {"pairings": 5, "dates": 15, "duty_periods": 9, "legs": 13}
+    tables = read_tables(tmp_path, file_format)
+    assert rebuild(tables) == pairings
+    legs = tables["legs"]
+    assert legs["leg_id"].to_pylist() == list(range(13))
+    assert legs.schema.field("deadhead").type == "bool"
+
+
+def test_legs_join_pairings(bid_package_path: Path, tmp_path: Path):
+    pairings = list(parse_bid_package_file(bid_package_path))
+    export_pairings(pairings, tmp_path, batch_size=3)
+    tables = read_tables(tmp_path)
+    joined = tables["legs"].join(tables["pairings"], "pairing_id", right_suffix="_p")
+    numbers = sorted(zip(joined["leg_id"].to_pylist(), joined["number"].to_pylist()))
+    expected = [
+        pairing.number
+        for pairing in pairings
+        for duty in pairing.duty_periods
+        for _ in duty.legs
+    ]
+    assert [number for _, number in numbers] == expected
+
+
+def test_export_empty(tmp_path: Path):
+    assert export_pairings([], tmp_path) == dict.fromkeys(TABLES, 0)
+    for name in TABLES:
+        assert table_path(tmp_path, name, "parquet").is_file()
+    assert read_tables(tmp_path)["legs"].num_rows == 0
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_export_error_removes_tables(
+    bid_package_path: Path, tmp_path: Path, file_format
+):
+    pairings = list(parse_bid_package_file(bid_package_path))
+    export_pairings(pairings[:1], tmp_path, file_format)
+
+    def failing():
+        yield from pairings[:3]
+        raise ParseError("Bad line", 42, "XYZ")
+
+    with pytest.raises(ParseError):
+        export_pairings(failing(), tmp_path, file_format, batch_size=2)
+    # The earlier export is kept, and no partial tables are left behind.
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{name}.{file_format}" for name in TABLES
+    )
+    assert read_tables(tmp_path, file_format)["pairings"].num_rows == 1
+
+
+def test_export_unknown_format(tmp_path: Path):
+    with pytest.raises(ValueError):
+        export_pairings([], tmp_path, "csv")  # type: ignore[arg-type]
+
+
+def test_cli_export(runner: CliRunner, bid_package_path: Path, tmp_path: Path):
+    output = tmp_path / "tables"
+    result = runner.invoke(
+        app, ["export", str(bid_package_path), "-o", str(output), "--format", "arrow"]
+    )
+    assert result.exit_code == 0
+    assert "legs: 13 rows" in result.stdout
+    assert sorted(path.name for path in output.iterdir()) == sorted(
+        f"{name}.arrow" for name in TABLES
+    )
+    result = runner.invoke(
+        app, ["export", str(bid_package_path), "-o", str(output), "--format", "csv"]
+    )
+    assert result.exit_code == 2
+    result = runner.invoke(
+        app, ["export", str(tmp_path / "missing.txt"), "-o", str(output)]
+    )
+    assert result.exit_code == 1
+    assert result.stderr.startswith("Error: ")
@@ -0,0 +1,175 @@
+"""Test cases for the bid package index."""
+
+import json
+import os
+from hashlib import sha256
+from importlib import resources
+from pathlib import Path
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+from typer.testing import CliRunner
+
+from pbs_parse.bid_package import index as index_module
+from pbs_parse.bid_package.index import (
+    BidPackageIndex,
+    StaleIndexError,
+    build_index,
+    default_index_path,
+    lookup_pairings,
+    open_index,
+    read_pairing,
+)
+from pbs_parse.bid_package.parser import parse_bid_package_file
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash.file_hash import hash_file
+
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="bid_package")
+def bid_package_(tmp_path: Path) -> Path:
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    bid_package = tmp_path / "bid_package.txt"
+    bid_package.write_bytes(file_resource.read_bytes())
+    return bid_package
+
+
+def test_build_index(bid_package: Path):
+    assert build_index(bid_package) == 5
+    index_path = default_index_path(bid_package)
+    assert index_path.name == "bid_package.txt.index.sqlite3"
+    with BidPackageIndex(index_path) as package_index:
+        assert len(package_index) == 5
+        assert package_index.source["file_hash"] == hash_file(bid_package, sha256())
+        (entry,) = package_index.find("5012")
+    assert (entry.line_number, entry.base, entry.equipment) == (5, "BOS", "320")
+    assert entry.dates == ["01NOV", "08NOV", "15NOV", "22NOV"]
+    with open(bid_package, "rb") as file_handle:
+        file_handle.seek(entry.offset)
+        record = file_handle.read(entry.length)
+    assert record.startswith(b"SEQ 5012")
+    assert record.endswith(b"TTL 9:05 10:00 30:35\n")
+
+
+def test_lookup_every_pairing(bid_package: Path):
+    pairings = list(parse_bid_package_file(bid_package))
+    for pairing in pairings:
+        assert lookup_pairings(bid_package, pairing.number) == [pairing]
+
+
+def test_find(bid_package: Path):
+    with open_index(bid_package) as package_index:
+        numbers = [entry.number for entry in package_index.find(equipment="321")]
+        assert numbers == ["5013", "5016"]
+        numbers = [entry.number for entry in package_index.find(date="08NOV")]
+        assert numbers == ["5012"]
+        assert package_index.find("9999") == []
+        # LIKE wildcards in a date match only themselves.
+        assert package_index.find(date="%") == []
+        assert package_index.find(date="08NO_") == []
+
+
+def test_lookup_reads_only_the_record(bid_package: Path, monkeypatch):
+    build_index(bid_package)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The whole package was parsed.")
+
+    monkeypatch.setattr(index_module, "build_index", fail)
+    monkeypatch.setattr(index_module, "hash_file", fail)
+    (pairing,) = lookup_pairings(bid_package, "5014")
+    assert pairing.line_number == 25
+
+
+def test_touched_package_is_verified_by_hash(bid_package: Path):
+    build_index(bid_package)
+    os.utime(bid_package, ns=(0, 0))
+    with open_index(bid_package, rebuild=False) as package_index:
+        assert package_index.check(bid_package, verify=True)
+
+
+def test_touched_package_is_hashed_once(bid_package: Path, monkeypatch):
+    build_index(bid_package)
+    os.utime(bid_package, ns=(0, 10**9))
+    calls = []
+
+    def counting_hash_file(*args, **kwargs):
+        calls.append(args)
+        return hash_file(*args, **kwargs)
+
+    monkeypatch.setattr(index_module, "hash_file", counting_hash_file)
+    for _ in range(3):
+        (pairing,) = lookup_pairings(bid_package, "5014")
+        assert pairing.line_number == 25
+    assert len(calls) == 1
+    with BidPackageIndex(default_index_path(bid_package)) as package_index:
+        assert package_index.source["mtime_ns"] == 10**9
+
+
+def test_stale_index(bid_package: Path):
+    build_index(bid_package)
+    text = bid_package.read_text()
+    bid_package.write_text(text.replace("SEQ 5012", "SEQ 6012"))
+    with pytest.raises(StaleIndexError):
+        open_index(bid_package, rebuild=False)
+    (pairing,) = lookup_pairings(bid_package, "6012")
+    assert pairing.line_number == 5
+
+
+def test_parser_version_change(bid_package: Path, monkeypatch):
+    build_index(bid_package)
+    monkeypatch.setattr(index_module, "PARSER_VERSION", "next")
+    with pytest.raises(StaleIndexError):
+        open_index(bid_package, rebuild=False)
+
+
+def test_read_pairing_after_edit(bid_package: Path):
+    build_index(bid_package)
+    with open_index(bid_package) as package_index:
+        (entry,) = package_index.find("5013")
+    bid_package.write_text("\n" * 20 + bid_package.read_text())
+    with pytest.raises(ValueError):
+        read_pairing(bid_package, entry)
+
+
+def test_cli_index_lookup(runner: CliRunner, bid_package: Path, tmp_path: Path):
+    index_path = tmp_path / "package.idx"
+    result = runner.invoke(
+        app, ["index", str(bid_package), "--index-path", str(index_path)]
+    )
+    assert result.exit_code == 0
+    assert result.stdout == f"Indexed 5 pairings in {index_path}\n"
+    result = runner.invoke(
+        app,
+        ["lookup", str(bid_package), "5014", "5012", "--index-path", str(index_path)],
+    )
+    assert result.exit_code == 0
+    numbers = [json.loads(line)["number"] for line in result.stdout.splitlines()]
+    assert numbers == ["5014", "5012"]
+
+    result = runner.invoke(app, ["lookup", str(bid_package), "--equipment", "321"])
+    assert result.exit_code == 0
+    assert len(result.stdout.splitlines()) == 2
+    assert default_index_path(bid_package).is_file()
+
+    result = runner.invoke(app, ["lookup", str(bid_package), "9999"])
+    assert result.exit_code == 1
+    assert "No matching pairings." in result.stderr
+    result = runner.invoke(app, ["lookup", str(bid_package)])
+    assert result.exit_code == 2
+
+
+def test_cli_missing_package(runner: CliRunner, tmp_path: Path):
+    missing = str(tmp_path / "missing.txt")
+    for args in (["index", missing], ["lookup", missing, "5012"]):
+        result = runner.invoke(app, args)
+        assert result.exit_code == 1
+        assert result.stderr.startswith("Error: ")
+        assert "missing.txt" in result.stderr
@@ -0,0 +1,97 @@
+"""Test cases for parsing bid packages in parallel."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+from typer.testing import CliRunner
+
+from pbs_parse.bid_package import parallel
+from pbs_parse.bid_package.parallel import (
+    map_pairings_parallel,
+    parse_bid_package_parallel,
+    parse_chunk,
+    plan_chunks,
+)
+from pbs_parse.bid_package.parser import ParseError, parse_bid_package_file
+from pbs_parse.bid_package.serialize import pairing_to_json
+from pbs_parse.cli.main_typer import app
+
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="small_chunks")
+def small_chunks_(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 256)
+
+
+@pytest.fixture(name="large_package")
+def large_package_(tmp_path: Path) -> Path:
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    text = file_resource.read_text(encoding="utf-8")
+    large_package = tmp_path / "large_package.txt"
+    large_package.write_text(text * 20, encoding="utf-8")
+    return large_package
+
+
+def test_plan_chunks(large_package: Path):
+    chunks = plan_chunks(large_package, 8)
+    assert 1 < len(chunks) <= 8
+    assert chunks[0].start == 0
+    assert chunks[-1].end == large_package.stat().st_size
+    lines = large_package.read_bytes().splitlines(keepends=True)
+    for chunk, next_chunk in zip(chunks, chunks[1:]):
+        assert chunk.end == next_chunk.start
+        assert lines[next_chunk.start_line - 1].startswith(b"SEQ ")
+        assert sum(map(len, lines[: next_chunk.start_line - 1])) == next_chunk.start
+
+
+def test_parse_chunks(large_package: Path):
+    serial = list(parse_bid_package_file(large_package))
+    chunks = plan_chunks(large_package, 7)
+    assert [
+        pairing for chunk in chunks for pairing in parse_chunk(large_package, chunk)
+    ] == serial
+
+
+@pytest.mark.usefixtures("small_chunks")
+def test_parallel_matches_serial(large_package: Path):
+    serial = list(parse_bid_package_file(large_package))
+    assert len(serial) == 100
+    assert list(parse_bid_package_parallel(large_package, jobs=3)) == serial
+    assert list(map_pairings_parallel(large_package, pairing_to_json, jobs=2)) == [
+        pairing_to_json(pairing) for pairing in serial
+    ]
+
+
+@pytest.mark.usefixtures("small_chunks")
+@pytest.mark.parametrize("broken", ["TTL 6:00 6:00 8:10\n", "RLS 2110\n"])
+def test_parallel_errors_match_serial(large_package: Path, broken: str):
+    text = large_package.read_text()
+    # Break a pairing in the middle of the file.
+    index = text.index(broken, len(text) // 2)
+    large_package.write_text(text[:index] + text[index + len(broken) :])
+    with pytest.raises(ParseError) as serial_error:
+        list(parse_bid_package_file(large_package))
+    with pytest.raises(ParseError) as parallel_error:
+        list(parse_bid_package_parallel(large_package, jobs=2))
+    assert str(parallel_error.value) == str(serial_error.value)
+    assert parallel_error.value.line_number == serial_error.value.line_number
+
+
+@pytest.mark.usefixtures("small_chunks")
+def test_cli_parse_jobs(runner: CliRunner, large_package: Path):
+    serial = runner.invoke(app, ["parse", "--no-cache", str(large_package)])
+    assert serial.exit_code == 0
+    result = runner.invoke(
+        app, ["parse", "--no-cache", "--jobs", "4", str(large_package)]
+    )
+    assert result.exit_code == 0
+    assert result.stdout == serial.stdout
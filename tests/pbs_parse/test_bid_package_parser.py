@@ -0,0 +1,163 @@
+"""Test cases for the bid package parser."""
+
+import io
+import json
+from importlib import resources
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+from typer.testing import CliRunner
+
+from pbs_parse.bid_package.parser import (
+    ParseError,
+    parse_bid_package,
+    parse_bid_package_file,
+    parse_duration,
+    parse_time,
+)
+from pbs_parse.cli.main_typer import app
+
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="bid_package_path")
+def bid_package_path_():
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    with resources.as_file(file_resource) as input_path:
+        yield input_path
+
+
+def test_parse_time_and_duration():
+    assert parse_time("0000") == 0
+    assert parse_time("0645") == 405
+    assert parse_duration("0:05") == 5
+    assert parse_duration("47:00") == 2820
+    for value in ("645", "2500", "0660"):
+        with pytest.raises(ValueError):
+            parse_time(value)
+    for value in ("2:5", "245", "2:60"):
+        with pytest.raises(ValueError):
+            parse_duration(value)
+
+
+def test_parse_fixture(bid_package_path):
+    pairings = list(parse_bid_package_file(bid_package_path))
+    assert [pairing.number for pairing in pairings] == [
+        "5012",
+        "5013",
+        "5014",
+        "5015",
+        "5016",
+    ]
+    first = pairings[0]
+    assert (first.operations, first.base, first.equipment) == (4, "BOS", "320")
+    assert first.dates == ["01NOV", "08NOV", "15NOV", "22NOV"]
+    assert first.line_number == 5
+    assert (first.block, first.credit, first.tafb) == (545, 600, 1835)
+    assert len(first.duty_periods) == 2
+    duty = first.duty_periods[0]
+    assert (duty.report, duty.release) == (345, 705)
+    assert (duty.layover_station, duty.layover_rest) == ("DEN", 1095)
+    assert [leg.flight for leg in duty.legs] == ["1234", "567"]
+    assert [leg.deadhead for leg in duty.legs] == [False, True]
+    assert duty.legs[1].equipment == "738"
+    assert first.duty_periods[1].layover_station is None
+    assert len(pairings[2].duty_periods) == 3
+    assert (
+        sum(len(duty.legs) for pairing in pairings for duty in pairing.duty_periods)
+        == 13
+    )
+
+
+def test_parse_is_lazy():
+    text = (
+        "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\nLEG 1 1 BOS 0700 JFK 0800 320 1:00\n"
+    )
+    text += "RLS 0815\nTTL 1:00 1:00 2:15\nnot a bid package\n"
+    pairings = parse_bid_package(io.StringIO(text))
+    assert next(pairings).number == "1"
+    with pytest.raises(ParseError) as error:
+        next(pairings)
+    assert error.value.line_number == 6
+
+
+@pytest.mark.parametrize(
+    "text, line_number",
+    [
+        ("RPT 0600\n", 1),
+        ("SEQ 1 OPS 1 BASE BOS\n", 1),
+        ("SEQ 1 OPS 1 BASE BOS EQP 320\nLEG 1 1 BOS 0700 JFK 0800 320 1:00\n", 2),
+        ("SEQ 1 OPS 1 BASE BOS EQP 320\n\nRPT 0600\nRLS 0700\n", 4),
+        ("SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\nLEG 1 1 BOS 0700 JFK\n", 3),
+        (
+            "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\nLEG 1 1 BOS 0700 JFK 0800 320 1:00\n",
+            3,
+        ),
+        # Out of range for the columnar layout.
+        ("SEQ 1 OPS 70000 BASE BOS EQP 320\n", 1),
+        (
+            "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\n"
+            "LEG 300 1 BOS 0700 JFK 0800 320 1:00\n",
+            3,
+        ),
+        (
+            "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\n"
+            "LEG 0 1 BOS 0700 JFK 0800 320 1:00\n",
+            3,
+        ),
+        (
+            "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\n"
+            "LEG 1 1 BOS 0700 JFK 0800 320 1200:00\n",
+            3,
+        ),
+        (
+            "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\n"
+            "LEG 1 1 BOS 0700 JFK 0800 320 1:00\nRLS 0830\n"
+            "TTL 99999999:00 1:00 1:00\n",
+            5,
+        ),
+    ],
+)
+def test_parse_errors(text: str, line_number: int):
+    with pytest.raises(ParseError) as error:
+        list(parse_bid_package(io.StringIO(text)))
+    assert error.value.line_number == line_number
+    assert str(error.value).startswith(f"Line {line_number}:")
+
+
+def test_cli_parse(runner: CliRunner, bid_package_path, tmp_path):
+    result = runner.invoke(app, ["parse", str(bid_package_path)])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record["number"] for record in records][:2] == ["5012", "5013"]
+    assert records[0]["duty_periods"][0]["legs"][1]["deadhead"] is True
+    output = tmp_path / "pairings.jsonl"
+    result = runner.invoke(app, ["parse", str(bid_package_path), "-o", str(output)])
+    assert result.exit_code == 0
+    assert output.read_text().splitlines() == [json.dumps(record) for record in records]
+
+
+def test_cli_parse_error(runner: CliRunner, tmp_path):
+    bad_package = tmp_path / "bad.txt"
+    bad_package.write_text("SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 25:00\n")
+    result = runner.invoke(app, ["parse", str(bad_package)])
+    assert result.exit_code == 1
+    assert "Line 2:" in result.stderr
+
+
+@pytest.mark.parametrize("cache", ["--cache", "--no-cache"])
+def test_cli_parse_missing(runner: CliRunner, bid_package_path, tmp_path, cache):
+    result = runner.invoke(app, ["parse", str(tmp_path / "missing.txt"), cache])
+    assert result.exit_code == 1
+    assert result.stderr.startswith("Error: ")
+    assert "missing.txt" in result.stderr
+    output = tmp_path / "missing" / "pairings.jsonl"
+    result = runner.invoke(app, ["parse", str(bid_package_path), "-o", str(output)])
+    assert result.exit_code == 1
+    assert result.stderr.startswith("Error: ")
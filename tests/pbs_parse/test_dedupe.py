@@ -0,0 +1,142 @@
+"""Test cases for finding duplicate files."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash import dedupe
+from pbs_parse.snippets.hash.dedupe import DedupeStats, find_duplicates, sample_hash
+from pbs_parse.snippets.hash.multi_file_hash import walk_files
+
+BIG = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="archive")
+def archive_(tmp_path: Path) -> Path:
+    archive = tmp_path / "archive"
+    (archive / "sub").mkdir(parents=True)
+    (archive / "big.txt").write_bytes(BIG)
+    (archive / "sub" / "big_copy.txt").write_bytes(BIG)
+    # Same size, ends, and sample, different middle.
+    middle = len(BIG) // 2
+    (archive / "big_edit.txt").write_bytes(BIG[:middle] + b"X" + BIG[middle + 1 :])
+    (archive / "small.txt").write_bytes(b"small")
+    (archive / "sub" / "small_copy.txt").write_bytes(b"small")
+    (archive / "other.txt").write_bytes(b"other")
+    (archive / "empty.txt").write_bytes(b"")
+    (archive / "sub" / "empty.txt").write_bytes(b"")
+    os.link(archive / "big.txt", archive / "big_link.txt")
+    return archive
+
+
+def test_sample_hash(tmp_path: Path):
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(BIG)
+    assert sample_hash(file_path, hashlib.md5(), len(BIG), 2**10) == (
+        hashlib.md5(BIG[: 2**10] + BIG[-(2**10) :]).hexdigest()
+    )
+    assert sample_hash(file_path, hashlib.md5(), len(BIG), len(BIG) // 2) == (
+        hashlib.md5(BIG).hexdigest()
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_find_duplicates(archive: Path, jobs: int):
+    stats = DedupeStats()
+    groups = find_duplicates(
+        walk_files(archive), hashlib.md5, jobs=jobs, sample_size=2**10, stats=stats
+    )
+    assert [(group.size, group.file_paths) for group in groups] == [
+        (len(BIG), [archive / "big.txt", archive / "sub" / "big_copy.txt"]),
+        (5, [archive / "small.txt", archive / "sub" / "small_copy.txt"]),
+    ]
+    assert groups[0].file_hash == hashlib.md5(BIG).hexdigest()
+    assert groups[1].file_hash == hashlib.md5(b"small").hexdigest()
+    assert groups[0].hash_method == "md5"
+    assert groups[0].wasted_bytes == len(BIG)
+    # The hard link, and the empty files, are skipped.
+    assert stats.files == 6
+    assert stats.sampled_files == 6
+    # The edited copy matches on the sample, so is hashed whole.
+    assert stats.hashed_files == 3
+    assert stats.bytes_read == 3 * 2**11 + 3 * 5 + 3 * len(BIG)
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_find_duplicates_skips_errors(
+    archive: Path, monkeypatch: pytest.MonkeyPatch, jobs: int
+):
+    def flaky_sample_hash(file_path: Path, *args) -> str:
+        if file_path.name == "small_copy.txt":
+            raise PermissionError(13, "Permission denied", str(file_path))
+        digest = sample_hash(file_path, *args)
+        if file_path.name == "big_copy.txt":
+            # Removed before the whole file is hashed.
+            file_path.unlink()
+        return digest
+
+    monkeypatch.setattr(dedupe, "sample_hash", flaky_sample_hash)
+    stats = DedupeStats()
+    file_paths = [*walk_files(archive), archive / "gone.txt"]
+    groups = find_duplicates(
+        file_paths, hashlib.md5, jobs=jobs, sample_size=2**10, stats=stats
+    )
+    assert groups == []
+    assert stats.files == 6
+    assert stats.skipped == 3
+    assert stats.sampled_files == 5
+    assert stats.hashed_files == 2
+
+
+def test_find_duplicates_min_size(archive: Path):
+    groups = find_duplicates(walk_files(archive), hashlib.md5, min_size=0)
+    assert [archive / "empty.txt", archive / "sub" / "empty.txt"] in [
+        group.file_paths for group in groups
+    ]
+    groups = find_duplicates(walk_files(archive), hashlib.md5, min_size=6)
+    assert len(groups) == 1
+
+
+def test_cli_dedupe(runner: CliRunner, archive: Path):
+    result = runner.invoke(app, ["dedupe", str(archive), "--algo", "sha256"])
+    assert result.exit_code == 0
+    big = hashlib.sha256(BIG).hexdigest()
+    small = hashlib.sha256(b"small").hexdigest()
+    assert result.stdout == (
+        f"{big}  {archive / 'big.txt'}\n"
+        f"{big}  {archive / 'sub' / 'big_copy.txt'}\n"
+        "\n"
+        f"{small}  {archive / 'small.txt'}\n"
+        f"{small}  {archive / 'sub' / 'small_copy.txt'}\n"
+    )
+    assert "2 groups of duplicates" in result.stderr
+    result = runner.invoke(app, ["dedupe", str(archive / "other.txt")])
+    assert result.exit_code == 0
+    assert result.stdout == ""
+    result = runner.invoke(app, ["dedupe", str(archive), "--sample-size", "auto"])
+    assert result.exit_code == 2
+
+
+def test_cli_dedupe_skips_errors(
+    runner: CliRunner, archive: Path, monkeypatch: pytest.MonkeyPatch
+):
+    def flaky_sample_hash(file_path: Path, *args) -> str:
+        if file_path.name == "small_copy.txt":
+            raise PermissionError(13, "Permission denied", str(file_path))
+        return sample_hash(file_path, *args)
+
+    monkeypatch.setattr(dedupe, "sample_hash", flaky_sample_hash)
+    result = runner.invoke(app, ["dedupe", str(archive)])
+    assert result.exit_code == 0
+    assert "1 groups of duplicates" in result.stderr
+    assert "Skipped 1 files that could not be read." in result.stderr
@@ -0,0 +1,156 @@
+"""Test cases for watching directories."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash import dir_watch
+from pbs_parse.snippets.hash.dir_watch import (
+    DirectoryWatcher,
+    InotifyBackend,
+    inotify_available,
+)
+from pbs_parse.snippets.hash.hash_cache import HashCache
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="drop_dir")
+def drop_dir_(tmp_path: Path) -> Path:
+    drop_dir = tmp_path / "drop"
+    (drop_dir / "sub").mkdir(parents=True)
+    (drop_dir / "a.txt").write_text("a")
+    (drop_dir / "sub" / "b.txt").write_text("b")
+    (drop_dir / ".a.txt.part").write_text("partial")
+    return drop_dir
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def md5(text: str) -> str:
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def test_once_and_restart(drop_dir: Path, tmp_path: Path):
+    state_path = tmp_path / "state.sqlite3"
+    with HashCache(state_path) as state:
+        watcher = DirectoryWatcher([drop_dir], state, hashlib.md5, settle=0)
+        results = {result.file_path: result.file_hash for result in watcher.watch(True)}
+    assert results == {drop_dir / "a.txt": md5("a"), drop_dir / "sub/b.txt": md5("b")}
+
+    (drop_dir / "c.txt").write_text("c")
+    (drop_dir / "a.txt").write_text("changed")
+    with HashCache(state_path) as state:
+        watcher = DirectoryWatcher([drop_dir], state, hashlib.md5, settle=0)
+        results = {result.file_path: result.file_hash for result in watcher.watch(True)}
+    assert results == {
+        drop_dir / "a.txt": md5("changed"),
+        drop_dir / "c.txt": md5("c"),
+    }
+
+
+def test_settle(drop_dir: Path, tmp_path: Path):
+    clock = FakeClock()
+    with HashCache(tmp_path / "state.sqlite3") as state:
+        watcher = DirectoryWatcher(
+            [drop_dir], state, hashlib.md5, settle=2, patterns=["a.*"], clock=clock
+        )
+        watcher.scan()
+        assert watcher.pending == [drop_dir / "a.txt"]
+        clock.now = 1
+        assert list(watcher.ready()) == []
+        # Still being written, so the settle time starts again.
+        with open(drop_dir / "a.txt", "a") as file_out:
+            file_out.write("more")
+        os.utime(drop_dir / "a.txt", ns=(0, 10**9))
+        clock.now = 2.5
+        watcher.scan()
+        assert list(watcher.ready()) == []
+        clock.now = 4.5
+        (result,) = watcher.ready()
+        assert result.file_hash == md5("amore")
+        assert watcher.pending == []
+        watcher.scan()
+        assert watcher.pending == []
+        (drop_dir / "a.txt").unlink()
+        watcher.check(drop_dir / "a.txt")
+        assert list(watcher.ready()) == []
+
+
+def test_unreadable_file_is_skipped(
+    drop_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    make_hashed_file = dir_watch.cached_make_hashed_file
+
+    def flaky_make_hashed_file(file_path: Path, *args, **kwargs):
+        if file_path.name == "a.txt":
+            raise PermissionError(13, "Permission denied", str(file_path))
+        return make_hashed_file(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(dir_watch, "cached_make_hashed_file", flaky_make_hashed_file)
+    errors = []
+    with HashCache(tmp_path / "state.sqlite3") as state:
+        watcher = DirectoryWatcher(
+            [drop_dir],
+            state,
+            hashlib.md5,
+            settle=0,
+            on_error=lambda path, error: errors.append(path),
+        )
+        results = [result.file_path for result in watcher.watch(True)]
+        assert results == [drop_dir / "sub" / "b.txt"]
+        assert errors == [drop_dir / "a.txt"]
+        # Not retried until it changes.
+        watcher.scan()
+        assert watcher.pending == []
+        os.utime(drop_dir / "a.txt", ns=(0, 10**9))
+        watcher.scan()
+        assert watcher.pending == [drop_dir / "a.txt"]
+
+
+@pytest.mark.skipif(not inotify_available(), reason="needs inotify")
+def test_inotify_backend(drop_dir: Path):
+    backend = InotifyBackend([drop_dir])
+    try:
+        assert backend.wait(0) == set()
+        (drop_dir / "sub" / "c.txt").write_text("c")
+        assert backend.wait(1) == {drop_dir / "sub" / "c.txt"}
+        (drop_dir / "new").mkdir()
+        assert backend.wait(1) == {drop_dir / "new"}
+        (drop_dir / "new" / "d.txt").write_text("d")
+        assert drop_dir / "new" / "d.txt" in backend.wait(1)  # type: ignore[operator]
+        # Hidden directories are not watched, as the scan skips them.
+        (drop_dir / ".hidden").mkdir()
+        assert backend.wait(1) == set()
+        (drop_dir / ".hidden" / "e.txt").write_text("e")
+        assert backend.wait(0.1) == set()
+    finally:
+        backend.close()
+
+
+def test_cli_watch_once(runner: CliRunner, drop_dir: Path, tmp_path: Path):
+    args = ["watch", str(drop_dir), "--once", "--settle", "0", "--pattern", "b.*"]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert result.stdout == f"{md5('b')}  {drop_dir / 'sub' / 'b.txt'}\n"
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert result.stdout == ""
+    result = runner.invoke(app, [*args, "--state", str(tmp_path / "other.sqlite3")])
+    assert result.stdout == f"{md5('b')}  {drop_dir / 'sub' / 'b.txt'}\n"
+    result = runner.invoke(app, [*args, "--backend", "nope"])
+    assert result.exit_code == 2
@@ -0,0 +1,115 @@
+"""Test cases for the file_hash snippet."""
+
+import gzip
+import os
+from hashlib import blake2b, md5, sha256
+from pathlib import Path
+
+import pytest
+
+from pbs_parse.snippets.hash.file_hash import (
+    auto_block_size,
+    hash_binary_file,
+    hash_file,
+    iter_file_blocks,
+    make_hashed_file,
+    make_multi_hashed_file,
+)
+
+READ_MODES = ["read", "readinto", "mmap"]
+
+
+@pytest.fixture(name="data_file")
+def data_file_(tmp_path: Path) -> Path:
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(os.urandom(2**20 + 123))
+    return file_path
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_read_modes_match(data_file: Path, read_mode) -> None:
+    expected = md5(data_file.read_bytes()).hexdigest()
+    assert hash_file(data_file, md5(), block_size=4096, read_mode=read_mode) == expected
+    result = make_hashed_file(data_file, md5(), read_mode=read_mode)
+    assert result.file_hash == expected
+    assert result.hash_method == "md5"
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_empty_file(tmp_path: Path, read_mode) -> None:
+    file_path = tmp_path / "empty.bin"
+    file_path.touch()
+    assert hash_file(file_path, md5(), read_mode=read_mode) == md5().hexdigest()
+
+
+def test_mmap_from_current_position(data_file: Path) -> None:
+    data = data_file.read_bytes()
+    with open(data_file, "rb") as file_handle:
+        file_handle.seek(1000)
+        blocks = [
+            bytes(block) for block in iter_file_blocks(file_handle, 2**16, "mmap")
+        ]
+        assert file_handle.read() == b""
+    assert b"".join(blocks) == data[1000:]
+
+
+def test_mmap_falls_back_for_pipe(data_file: Path) -> None:
+    data = data_file.read_bytes()
+    read_fd, write_fd = os.pipe()
+    with open(write_fd, "wb") as writer:
+        # Small enough to fit in the pipe buffer without a reader.
+        writer.write(data[:4096])
+    with open(read_fd, "rb") as reader:
+        digest = hash_binary_file(reader, md5(), read_mode="mmap")
+    assert digest == md5(data[:4096]).hexdigest()
+
+
+def test_mmap_not_used_for_compressed_stream(tmp_path: Path) -> None:
+    data = b"decompressed content " * 1000
+    file_path = tmp_path / "data.gz"
+    file_path.write_bytes(gzip.compress(data))
+    digest = hash_binary_file(gzip.open(file_path, "rb"), md5(), read_mode="mmap")
+    assert digest == md5(data).hexdigest()
+
+
+@pytest.mark.parametrize(
+    "file_size,preferred_size,expected",
+    [
+        (0, 4096, 4096),
+        (1000, 4096, 4096),
+        (100_000, 4096, 2**17),
+        (10 * 2**30, 4096, 2**20),
+        (10 * 2**30, 4 * 2**20, 4 * 2**20),
+        (3000, 1536, 4608),
+    ],
+)
+def test_auto_block_size(file_size: int, preferred_size: int, expected: int) -> None:
+    assert auto_block_size(file_size, preferred_size) == expected
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_auto_block_size_hash(data_file: Path, read_mode) -> None:
+    expected = md5(data_file.read_bytes()).hexdigest()
+    assert hash_file(data_file, md5(), block_size="auto", read_mode=read_mode) == (
+        expected
+    )
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_multi_hash_single_pass(data_file: Path, read_mode) -> None:
+    data = data_file.read_bytes()
+    result = make_multi_hashed_file(
+        data_file, [md5(), sha256(), blake2b()], read_mode=read_mode
+    )
+    assert result.hash_method == "md5"
+    assert result.file_hash == md5(data).hexdigest()
+    assert result.digests == {
+        "md5": md5(data).hexdigest(),
+        "sha256": sha256(data).hexdigest(),
+        "blake2b": blake2b(data).hexdigest(),
+    }
+
+
+def test_single_hashed_file_digests(data_file: Path) -> None:
+    result = make_hashed_file(data_file, sha256())
+    assert result.digests == {"sha256": result.file_hash}
@@ -0,0 +1,108 @@
+"""Test cases for the persistent hash cache."""
+
+import os
+from hashlib import md5, sha1
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash.hash_cache import (
+    HashCache,
+    cached_make_hashed_file,
+    cached_make_multi_hashed_file,
+)
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="data_file")
+def data_file_(tmp_path: Path) -> Path:
+    file_path = tmp_path / "data" / "data.txt"
+    file_path.parent.mkdir()
+    file_path.write_bytes(b"original content")
+    return file_path
+
+
+def test_cache_hit_and_miss(tmp_path: Path, data_file: Path) -> None:
+    with HashCache(tmp_path / "cache.sqlite3") as hash_cache:
+        assert hash_cache.get(data_file, "md5") is None
+        result = cached_make_hashed_file(data_file, md5(), hash_cache)
+        assert result.file_hash == md5(b"original content").hexdigest()
+        assert hash_cache.get(data_file, "md5") == result.file_hash
+        assert hash_cache.get(data_file, "sha256") is None
+    # Persists after closing.
+    with HashCache(tmp_path / "cache.sqlite3") as hash_cache:
+        assert hash_cache.get(data_file, "md5") == result.file_hash
+        # A changed file is a miss.
+        data_file.write_bytes(b"changed content!")
+        stat = data_file.stat()
+        os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert hash_cache.get(data_file, "md5") is None
+        result = cached_make_hashed_file(data_file, md5(), hash_cache)
+        assert result.file_hash == md5(b"changed content!").hexdigest()
+
+
+def test_cache_lru_eviction(tmp_path: Path) -> None:
+    paths = []
+    for index in range(5):
+        path = tmp_path / f"file_{index}.txt"
+        path.write_text(str(index))
+        paths.append(path)
+    with HashCache(tmp_path / "cache.sqlite3", max_entries=3) as hash_cache:
+        for path in paths[:3]:
+            cached_make_hashed_file(path, md5(), hash_cache)
+        # Use the first file, so the second is now the least recently used.
+        assert hash_cache.get(paths[0], "md5") is not None
+        for path in paths[3:]:
+            cached_make_hashed_file(path, md5(), hash_cache)
+        assert hash_cache.evict() == 2
+        assert len(hash_cache) == 3
+        assert hash_cache.get(paths[0], "md5") is not None
+        assert hash_cache.get(paths[1], "md5") is None
+        assert hash_cache.get(paths[2], "md5") is None
+
+
+def test_cache_invalidate_directory(tmp_path: Path, data_file: Path) -> None:
+    sibling = tmp_path / "data0.txt"
+    sibling.write_text("not below data/")
+    with HashCache(tmp_path / "cache.sqlite3") as hash_cache:
+        cached_make_hashed_file(data_file, md5(), hash_cache)
+        cached_make_hashed_file(sibling, md5(), hash_cache)
+        assert hash_cache.invalidate([data_file.parent]) == 1
+        assert hash_cache.get(data_file, "md5") is None
+        assert hash_cache.get(sibling, "md5") is not None
+        assert hash_cache.invalidate() == 1
+
+
+def test_cli_cache(runner: CliRunner, tmp_path: Path, data_file: Path) -> None:
+    cache_path = tmp_path / "cache.sqlite3"
+    args = ["hash", "--cache", "--cache-path", str(cache_path), str(data_file)]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    with HashCache(cache_path) as hash_cache:
+        assert len(hash_cache) == 1
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert md5(b"original content").hexdigest() in result.stdout
+    result = runner.invoke(
+        app, ["cache", "invalidate", "--cache-path", str(cache_path), str(data_file)]
+    )
+    assert result.exit_code == 0
+    assert "Removed 1 entries" in result.stdout
+
+
+def test_cache_multi_hash(tmp_path: Path, data_file: Path) -> None:
+    with HashCache(tmp_path / "cache.sqlite3") as hash_cache:
+        cached_make_hashed_file(data_file, md5(), hash_cache)
+        result = cached_make_multi_hashed_file(data_file, [md5(), sha1()], hash_cache)
+        assert result.digests == {
+            "md5": md5(b"original content").hexdigest(),
+            "sha1": sha1(b"original content").hexdigest(),
+        }
+        assert hash_cache.get(data_file, "sha1") == result.digests["sha1"]
@@ -0,0 +1,82 @@
+"""Test cases for the hash while copying snippet."""
+
+import io
+import os
+import socket
+from hashlib import md5
+from pathlib import Path
+
+import pytest
+
+from pbs_parse.snippets.hash import hash_copy
+from pbs_parse.snippets.hash.hash_copy import copy_and_hash_file, tee_hash
+
+
+@pytest.fixture(name="data_file")
+def data_file_(tmp_path: Path) -> Path:
+    file_path = tmp_path / "source.bin"
+    file_path.write_bytes(os.urandom(2**20 + 17))
+    return file_path
+
+
+@pytest.mark.parametrize("read_mode", ["read", "readinto", "mmap"])
+def test_copy_and_hash_file(tmp_path: Path, data_file: Path, read_mode) -> None:
+    destination = tmp_path / "archive" / "copy.bin"
+    destination.parent.mkdir()
+    result = copy_and_hash_file(data_file, destination, md5(), read_mode=read_mode)
+    assert destination.read_bytes() == data_file.read_bytes()
+    assert result.file_path == destination
+    assert result.file_hash == md5(destination.read_bytes()).hexdigest()
+    assert result.hash_method == "md5"
+
+
+def test_copy_refuses_to_overwrite(tmp_path: Path, data_file: Path) -> None:
+    destination = tmp_path / "copy.bin"
+    destination.write_bytes(b"existing")
+    with pytest.raises(FileExistsError):
+        copy_and_hash_file(data_file, destination, md5())
+    assert destination.read_bytes() == b"existing"
+    copy_and_hash_file(data_file, destination, md5(), overwrite=True)
+    assert destination.read_bytes() == data_file.read_bytes()
+
+
+def test_failed_copy_is_removed(
+    tmp_path: Path, data_file: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    iter_file_blocks = hash_copy.iter_file_blocks
+
+    def failing_blocks(*args, **kwargs):
+        yield next(iter_file_blocks(*args, **kwargs))
+        raise OSError(5, "Input/output error")
+
+    destination = tmp_path / "copy.bin"
+    with monkeypatch.context() as patch:
+        patch.setattr(hash_copy, "iter_file_blocks", failing_blocks)
+        with pytest.raises(OSError):
+            copy_and_hash_file(data_file, destination, md5())
+    assert not destination.exists()
+    # The retry is not refused by the partial copy.
+    copy_and_hash_file(data_file, destination, md5())
+    assert destination.read_bytes() == data_file.read_bytes()
+
+
+def test_tee_hash_to_raw_file(tmp_path: Path) -> None:
+    blocks = [os.urandom(size) for size in (1, 70_000, 3)]
+    destination = tmp_path / "raw.bin"
+    with open(destination, "wb", buffering=0) as raw_out:
+        digest = tee_hash(iter(blocks), md5(), raw_out)
+    assert destination.read_bytes() == b"".join(blocks)
+    assert digest == md5(b"".join(blocks)).hexdigest()
+
+
+def test_tee_hash_to_socket() -> None:
+    data = b"bid package " * 100
+    left, right = socket.socketpair()
+    with left, right:
+        digest = tee_hash(iter([data[:500], data[500:]]), md5(), left)
+        left.shutdown(socket.SHUT_WR)
+        received = io.BytesIO()
+        while chunk := right.recv(4096):
+            received.write(chunk)
+    assert received.getvalue() == data
+    assert digest == md5(data).hexdigest()
@@ -0,0 +1,129 @@
+"""Test cases for the hash algorithm registry."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash import hash_registry
+from pbs_parse.snippets.hash.file_hash import make_hashed_file
+from pbs_parse.snippets.hash.hash_registry import (
+    FAST_ALIAS,
+    HashAlgorithm,
+    UnavailableAlgorithmError,
+    UnknownAlgorithmError,
+    algorithm_names,
+    is_available,
+    new_hasher,
+    register,
+    resolve_algorithm,
+)
+from pbs_parse.snippets.hash.tree_hash import TREE_HASH_NAME
+
+DATA = b"pbs_parse hash registry " * 1000
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="data_file")
+def data_file_(tmp_path: Path) -> Path:
+    data_file = tmp_path / "data.bin"
+    data_file.write_bytes(DATA)
+    return data_file
+
+
+@pytest.fixture(name="no_fast_backends")
+def no_fast_backends_(monkeypatch):
+    for name, algorithm in list(hash_registry.REGISTRY.items()):
+        monkeypatch.setitem(
+            hash_registry.REGISTRY,
+            name,
+            HashAlgorithm(name, "pbs_parse_missing_module", algorithm.constructor),
+        )
+
+
+def test_hashlib_algorithms(data_file: Path):
+    hasher = new_hasher("sha256")
+    hasher.update(DATA)
+    assert hasher.hexdigest() == hashlib.sha256(DATA).hexdigest()
+    assert new_hasher(TREE_HASH_NAME).name == TREE_HASH_NAME
+    assert {"md5", "sha256", TREE_HASH_NAME, "xxh3_64", "blake3"} <= set(
+        algorithm_names()
+    )
+
+
+@pytest.mark.parametrize(
+    "name,module,constructor",
+    [
+        ("xxh3_64", "xxhash", "xxh3_64"),
+        ("xxh3_128", "xxhash", "xxh3_128"),
+        ("blake3", "blake3", "blake3"),
+    ],
+)
+def test_fast_backends(data_file: Path, name: str, module: str, constructor: str):
+    backend = pytest.importorskip(module)
+    expected = getattr(backend, constructor)(DATA).hexdigest()
+    hasher = new_hasher(name)
+    assert hasher.name == name
+    copy = hasher.copy()
+    hasher.update(DATA)
+    assert hasher.hexdigest() == expected
+    assert copy.hexdigest() != expected
+    result = make_hashed_file(data_file, new_hasher(name))
+    assert (result.hash_method, result.file_hash) == (name, expected)
+
+
+def test_unavailable_backend(no_fast_backends):
+    with pytest.raises(UnavailableAlgorithmError, match=r"pbs-parse\[fast\]|install"):
+        new_hasher("xxh3_64")
+    assert not is_available("xxh3_64")
+    assert resolve_algorithm(FAST_ALIAS) == "blake2b"
+    assert new_hasher(FAST_ALIAS).name == "blake2b"
+
+
+def test_unknown_algorithm():
+    with pytest.raises(UnknownAlgorithmError):
+        new_hasher("no-such-hash")
+    assert not is_available("no-such-hash")
+
+
+def test_register(monkeypatch):
+    monkeypatch.setattr(hash_registry, "REGISTRY", dict(hash_registry.REGISTRY))
+    with pytest.raises(ValueError):
+        register(HashAlgorithm("md5", "hashlib", "md5"))
+    register(HashAlgorithm("sha256-copy", "hashlib", "sha256"))
+    hasher = new_hasher("sha256-copy")
+    hasher.update(DATA)
+    assert hasher.name == "sha256-copy"
+    assert hasher.hexdigest() == hashlib.sha256(DATA).hexdigest()
+
+
+def test_cli_hash_algo(runner: CliRunner, data_file: Path):
+    result = runner.invoke(app, ["hash", "--algo", "sha256", str(data_file)])
+    assert result.exit_code == 0
+    assert result.stdout == f"{hashlib.sha256(DATA).hexdigest()}  {data_file}\n"
+    result = runner.invoke(app, ["hash-algorithms"])
+    assert result.exit_code == 0
+    assert (
+        f"{FAST_ALIAS:<14} alias for {resolve_algorithm(FAST_ALIAS)}" in result.stdout
+    )
+
+
+@pytest.mark.usefixtures("no_fast_backends")
+def test_cli_fast_fallback(runner: CliRunner, data_file: Path):
+    result = runner.invoke(
+        app, ["hash", "--algo", "fast", "--algo", "md5", str(data_file)]
+    )
+    assert result.exit_code == 0
+    assert f"BLAKE2B ({data_file}) = {hashlib.blake2b(DATA).hexdigest()}" in (
+        result.stdout
+    )
+    result = runner.invoke(app, ["hash", "--algo", "xxh3_64", str(data_file)])
+    assert result.exit_code == 2
+    assert "Hash algorithm 'xxh3_64' requires" in result.stderr
@@ -0,0 +1,84 @@
+"""Test cases for the logging snippets."""
+
+import logging
+import threading
+from pathlib import Path
+
+from pbs_parse.snippets.logging.logging import (
+    queue_handler,
+    queue_rotating_file_logger,
+    rotating_file_handler,
+)
+
+
+class BlockingHandler(logging.Handler):
+    """Holds every record until released, to show callers don't wait on it."""
+
+    def __init__(self):
+        super().__init__()
+        self.unblock = threading.Event()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.unblock.wait(timeout=5)
+        self.messages.append(self.format(record))
+
+
+def test_rotating_file_handler_sizes(tmp_path: Path):
+    handler = rotating_file_handler(
+        tmp_path, "sizes", logging.INFO, max_bytes=2**20, backup_count=3
+    )
+    assert handler.maxBytes == 2**20
+    assert handler.backupCount == 3
+    handler.close()
+
+
+def test_queue_handler_does_not_block():
+    blocking = BlockingHandler()
+    handler, listener = queue_handler(blocking)
+    test_logger = logging.getLogger("test_queue_handler_does_not_block")
+    test_logger.propagate = False
+    test_logger.addHandler(handler)
+    test_logger.setLevel(logging.INFO)
+    try:
+        items = ["a"]
+        for index in range(100):
+            test_logger.info("record %d %s", index, items)
+        items.append("b")
+        assert blocking.messages == []
+        blocking.unblock.set()
+    finally:
+        listener.stop()
+        test_logger.removeHandler(handler)
+    assert len(blocking.messages) == 100
+    assert blocking.messages[-1] == "record 99 ['a']"
+    # Stopping again is a no op.
+    listener.stop()
+
+
+def test_queue_rotating_file_logger(tmp_path: Path):
+    test_logger, listener = queue_rotating_file_logger(
+        "test_queue_rotating_file_logger",
+        tmp_path,
+        logging.INFO,
+        max_bytes=4096,
+        backup_count=2,
+    )
+    test_logger.propagate = False
+    try:
+        for index in range(500):
+            test_logger.info("parsed line %d", index)
+    finally:
+        listener.stop()
+        for handler in test_logger.handlers:
+            test_logger.removeHandler(handler)
+        for handler in listener.handlers:
+            handler.close()
+    log_files = sorted(path.name for path in tmp_path.iterdir())
+    assert log_files == [
+        "test_queue_rotating_file_logger.log",
+        "test_queue_rotating_file_logger.log.1",
+        "test_queue_rotating_file_logger.log.2",
+    ]
+    last = (tmp_path / "test_queue_rotating_file_logger.log").read_text()
+    assert "parsed line 499" in last
@@ -0,0 +1,133 @@
+"""Test cases for manifest create and verify."""
+
+import io
+import shutil
+import subprocess
+from hashlib import md5
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash.manifest import (
+    format_manifest_line,
+    parse_manifest_line,
+    verify_manifest,
+    write_manifest,
+)
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="file_tree")
+def file_tree_(tmp_path: Path) -> Path:
+    root = tmp_path / "packages"
+    (root / "2026-11").mkdir(parents=True)
+    for index in range(20):
+        (root / "2026-11" / f"package_{index:02}.txt").write_text(f"package {index}")
+    (root / "odd\\name.txt").write_text("backslash")
+    (root / "top.txt").write_text("top")
+    return root
+
+
+@pytest.mark.parametrize(
+    "name", ["plain.txt", "with space.txt", "back\\slash.txt", "new\nline.txt"]
+)
+def test_line_round_trip(name: str) -> None:
+    line = format_manifest_line("abc123", name)
+    assert line.endswith("\n")
+    assert parse_manifest_line(line) == ("abc123", name)
+
+
+def test_parse_binary_mode_line() -> None:
+    assert parse_manifest_line("ABC123 *file.bin\n") == ("abc123", "file.bin")
+    with pytest.raises(ValueError):
+        parse_manifest_line("abc123 file.bin\n")
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_write_and_verify(file_tree: Path, jobs: int) -> None:
+    manifest = io.StringIO()
+    count = write_manifest(file_tree, manifest, md5, jobs=jobs)
+    assert count == 22
+    lines = manifest.getvalue().splitlines()
+    assert lines[0] == f"{md5(b'package 0').hexdigest()}  2026-11/package_00.txt"
+    assert lines[-1] == f"{md5(b'top').hexdigest()}  top.txt"
+    manifest.seek(0)
+    checks = list(verify_manifest(manifest, file_tree, md5, jobs=jobs))
+    assert len(checks) == 22
+    assert {check.status for check in checks} == {"OK"}
+
+
+def test_verify_reports_failures(file_tree: Path) -> None:
+    manifest = io.StringIO()
+    write_manifest(file_tree, manifest, md5)
+    (file_tree / "2026-11" / "package_05.txt").write_text("changed")
+    (file_tree / "2026-11" / "package_07.txt").unlink()
+    manifest.seek(0)
+    checks = verify_manifest(manifest, file_tree, md5, jobs=3)
+    failed = [check for check in checks if check.status != "OK"]
+    assert [(check.file_path.name, check.status) for check in failed] == [
+        ("package_05.txt", "FAILED"),
+        ("package_07.txt", "UNREADABLE"),
+    ]
+
+
+@pytest.mark.skipif(shutil.which("md5sum") is None, reason="needs md5sum")
+def test_md5sum_compatible(runner: CliRunner, file_tree: Path, tmp_path: Path) -> None:
+    manifest_path = tmp_path / "packages.md5"
+    result = runner.invoke(
+        app, ["manifest", "create", "-j", "2", "-o", str(manifest_path), str(file_tree)]
+    )
+    assert result.exit_code == 0
+    assert "Wrote 22 entries" in result.stdout
+    completed = subprocess.run(
+        ["md5sum", "-c", "--quiet", str(manifest_path)], cwd=file_tree
+    )
+    assert completed.returncode == 0
+
+
+def test_cli_verify(runner: CliRunner, file_tree: Path) -> None:
+    manifest_path = file_tree / "packages.md5"
+    result = runner.invoke(
+        app, ["manifest", "create", "-o", str(manifest_path), str(file_tree)]
+    )
+    assert result.exit_code == 0
+    assert "packages.md5" not in manifest_path.read_text()
+    assert ".tmp-" not in manifest_path.read_text()
+    verify = ["manifest", "verify", "--root", str(file_tree), str(manifest_path)]
+    result = runner.invoke(app, [*verify, "-j", "4"])
+    assert result.exit_code == 0
+    assert result.stdout.count(": OK") == 22
+    (file_tree / "2026-11" / "package_03.txt").write_text("changed")
+    (file_tree / "2026-11" / "package_09.txt").write_text("changed")
+    result = runner.invoke(app, [*verify, "-q"])
+    assert result.exit_code == 1
+    assert result.stdout.count("FAILED") == 2
+    assert ": OK" not in result.stdout
+    result = runner.invoke(app, [*verify, "--fail-fast", "-j", "2"])
+    assert result.exit_code == 1
+    assert result.stdout.count("FAILED") == 1
+
+
+def test_cli_missing_paths(runner: CliRunner, file_tree: Path, tmp_path: Path) -> None:
+    manifest_path = tmp_path / "packages.md5"
+    manifest_path.write_text("earlier\n")
+    result = runner.invoke(
+        app, ["manifest", "create", "-o", str(manifest_path), str(tmp_path / "nope")]
+    )
+    assert result.exit_code == 1
+    assert result.stderr.startswith("Error: ")
+    # The earlier manifest is kept, and no temporary file is left behind.
+    assert manifest_path.read_text() == "earlier\n"
+    assert not (tmp_path / ".tmp-packages.md5").exists()
+    result = runner.invoke(
+        app, ["manifest", "verify", "--root", str(file_tree), str(tmp_path / "nope")]
+    )
+    assert result.exit_code == 1
+    assert result.stderr.startswith("Error: ")
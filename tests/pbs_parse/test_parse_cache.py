@@ -0,0 +1,147 @@
+"""Test cases for the parse result cache."""
+
+import json
+import os
+from importlib import resources
+from pathlib import Path
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+from typer.testing import CliRunner
+
+from pbs_parse.bid_package import parse_cache as parse_cache_module
+from pbs_parse.bid_package.parse_cache import (
+    ParseCache,
+    cached_parse_bid_package,
+    cached_parse_json_lines,
+    file_digest,
+)
+from pbs_parse.bid_package.parser import (
+    PARSER_VERSION,
+    ParseError,
+    parse_bid_package_file,
+)
+from pbs_parse.bid_package.serialize import pairing_to_json
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash import hash_cache as hash_cache_module
+from pbs_parse.snippets.hash.hash_cache import HashCache
+
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="bid_package")
+def bid_package_(tmp_path: Path) -> Path:
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    bid_package = tmp_path / "bid_package.txt"
+    bid_package.write_text(file_resource.read_text(encoding="utf-8"))
+    return bid_package
+
+
+@pytest.fixture(name="parse_cache")
+def parse_cache_(tmp_path: Path) -> ParseCache:
+    return ParseCache(tmp_path / "parse_cache")
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("The bid package was read on a cache hit.")
+
+
+def test_hit_matches_parse(bid_package: Path, parse_cache: ParseCache):
+    expected = list(parse_bid_package_file(bid_package))
+    assert list(cached_parse_bid_package(bid_package, parse_cache)) == expected
+    assert len(parse_cache) == 1
+    assert list(cached_parse_bid_package(bid_package, parse_cache)) == expected
+    lines = [pairing_to_json(pairing) for pairing in expected]
+    assert list(cached_parse_json_lines(bid_package, parse_cache)) == lines
+    assert list(cached_parse_json_lines(bid_package, parse_cache)) == lines
+    assert len(parse_cache) == 2
+
+
+def test_hit_does_not_read_package(
+    bid_package: Path, parse_cache: ParseCache, tmp_path: Path, monkeypatch
+):
+    with HashCache(tmp_path / "hash_cache.sqlite3") as hash_cache:
+        expected = list(cached_parse_bid_package(bid_package, parse_cache, hash_cache))
+        monkeypatch.setattr(hash_cache_module, "hash_file_multi", fail)
+        monkeypatch.setattr(parse_cache_module, "parse_bid_package_parallel", fail)
+        cached = list(cached_parse_bid_package(bid_package, parse_cache, hash_cache))
+    assert cached == expected
+
+
+def test_edited_package_is_parsed_again(bid_package: Path, parse_cache: ParseCache):
+    before = list(cached_parse_bid_package(bid_package, parse_cache))
+    bid_package.write_text(bid_package.read_text().replace("SEQ 5012", "SEQ 6012"))
+    after = list(cached_parse_bid_package(bid_package, parse_cache))
+    assert before[0].number == "5012"
+    assert after[0].number == "6012"
+    assert len(parse_cache) == 2
+
+
+def test_parser_version_in_key(bid_package: Path, parse_cache: ParseCache, monkeypatch):
+    list(cached_parse_bid_package(bid_package, parse_cache))
+    digest = file_digest(bid_package)
+    (entry,) = parse_cache.entries()
+    assert entry.name == f"{digest}.v{PARSER_VERSION}.pickle"
+    monkeypatch.setattr(parse_cache_module, "PARSER_VERSION", "next")
+    assert parse_cache.open_entry(digest, "pickle") is None
+
+
+def test_evicts_least_recently_used(tmp_path: Path):
+    parse_cache = ParseCache(tmp_path / "parse_cache", max_bytes=250)
+    for index, digest in enumerate(["a", "b"]):
+        with parse_cache.write_entry(digest, "test") as file_out:
+            file_out.write(b"x" * 100)
+        os.utime(parse_cache.entry_path(digest, "test"), ns=(index, index))
+    # Reading "a" makes "b" the least recently used.
+    parse_cache.open_entry("a", "test").close()  # type: ignore[union-attr]
+    with parse_cache.write_entry("c", "test") as file_out:
+        file_out.write(b"x" * 100)
+    names = {entry.name.split(".")[0] for entry in parse_cache.entries()}
+    assert names == {"a", "c"}
+    assert parse_cache.nbytes() == 200
+
+
+def test_early_stop_discards_entry(bid_package: Path, parse_cache: ParseCache):
+    pairings = cached_parse_bid_package(bid_package, parse_cache)
+    next(pairings)
+    pairings.close()
+    assert len(parse_cache) == 0
+    assert not list(parse_cache.cache_dir.iterdir())
+
+
+def test_parse_error_discards_entry(tmp_path: Path, parse_cache: ParseCache):
+    bad_package = tmp_path / "bad.txt"
+    bad_package.write_text("SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 25:00\n")
+    with pytest.raises(ParseError):
+        list(cached_parse_json_lines(bad_package, parse_cache))
+    assert not list(parse_cache.cache_dir.iterdir())
+
+
+def test_cli_parse_cache(runner: CliRunner, bid_package: Path, tmp_path: Path):
+    cache_dir = tmp_path / "parse_cache"
+    args = ["parse", "--cache-dir", str(cache_dir), str(bid_package)]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert len(ParseCache(cache_dir)) == 1
+    cached = runner.invoke(app, args)
+    assert cached.exit_code == 0
+    assert cached.stdout == result.stdout
+    assert json.loads(cached.stdout.splitlines()[0])["number"] == "5012"
+
+    uncached_dir = tmp_path / "uncached"
+    args = ["parse", "--no-cache", "--cache-dir", str(uncached_dir), str(bid_package)]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert result.stdout == cached.stdout
+    assert not uncached_dir.exists()
+
+    result = runner.invoke(app, ["cache", "clear", "--cache-dir", str(cache_dir)])
+    assert result.exit_code == 0
+    assert result.stdout == f"Removed 1 entries from {cache_dir}\n"
+    assert len(ParseCache(cache_dir)) == 0
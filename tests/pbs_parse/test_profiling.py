@@ -0,0 +1,90 @@
+"""Test cases for the phase timer, and the --profile options."""
+
+import json
+import pstats
+from hashlib import md5, sha256
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash.file_hash import (
+    hash_file,
+    hash_file_multi,
+    iter_file_blocks,
+)
+from pbs_parse.snippets.profiling.phase_timer import PhaseTimer, TimedHasher
+
+DATA = bytes(range(256)) * 1000
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="data_file")
+def data_file_(tmp_path: Path) -> Path:
+    data_file = tmp_path / "data.bin"
+    data_file.write_bytes(DATA)
+    return data_file
+
+
+def test_timed_hasher(data_file: Path):
+    timer = PhaseTimer("test")
+    hasher = TimedHasher(md5(), timer)
+    assert hasher.name == "md5"
+    assert hash_file(data_file, hasher, block_size=2**14) == md5(DATA).hexdigest()
+    record = timer.to_dict()
+    assert record["bytes"] == len(DATA)
+    assert record["phases"]["read"]["bytes"] == len(DATA)
+    assert record["phases"]["hash"]["bytes"] == len(DATA)
+    assert record["phases"]["hash"]["calls"] == -(-len(DATA) // 2**14)
+
+
+def test_timed_hashers_share_a_read(data_file: Path):
+    timer = PhaseTimer("test")
+    hashers = [TimedHasher(md5(), timer), TimedHasher(sha256(), timer, False)]
+    digests = hash_file_multi(data_file, hashers)
+    assert digests == {"md5": md5(DATA).hexdigest(), "sha256": sha256(DATA).hexdigest()}
+    assert timer.byte_count() == len(DATA)
+    assert timer.phases["hash"].byte_count == 2 * len(DATA)
+
+
+def test_iterate_and_phase(data_file: Path):
+    timer = PhaseTimer("test")
+    with open(data_file, "rb") as file_handle, timer.phase("parse", len(DATA)):
+        blocks = list(timer.iterate(iter_file_blocks(file_handle, 2**16)))
+    assert b"".join(blocks) == DATA
+    timer.stop()
+    assert timer.phases["read"].byte_count == len(DATA)
+    assert timer.phases["parse"].calls == 1
+    assert timer.elapsed_ns == timer.elapsed_ns
+    report = timer.format_report()
+    assert report.splitlines()[0] == "Profile: test"
+    assert "parse" in report and "wall" in report
+
+
+def test_cli_profile(runner: CliRunner, data_file: Path, tmp_path: Path):
+    json_path = tmp_path / "timings.jsonl"
+    stats_path = tmp_path / "hash.prof"
+    args = ["--profile-json", str(json_path), "--cprofile", str(stats_path)]
+    for _ in range(2):
+        result = runner.invoke(app, [*args, "hash", "-j", "2", str(data_file)])
+        assert result.exit_code == 0
+    records = [json.loads(line) for line in json_path.read_text().splitlines()]
+    assert len(records) == 2
+    assert records[0]["name"] == "hash"
+    assert records[0]["bytes"] == len(DATA)
+    assert set(records[0]["phases"]) == {"read", "hash", "write"}
+    assert pstats.Stats(str(stats_path)).total_calls > 0
+
+
+def test_cli_profile_report(runner: CliRunner, data_file: Path):
+    result = runner.invoke(app, ["--profile", "hash-md5", str(data_file)])
+    assert result.exit_code == 0
+    assert md5(DATA).hexdigest() in result.stdout
+    assert "Profile: hash-md5" in result.stderr
+    assert "Profile" not in result.stdout
@@ -0,0 +1,134 @@
+"""Test cases for the JSON lines server."""
+
+import asyncio
+import io
+import json
+import socket
+import threading
+from hashlib import md5, sha256
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.server.jsonl_server import serve_stream, serve_unix_socket
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="data_files")
+def data_files_(tmp_path: Path) -> list[Path]:
+    data_files = []
+    for index in range(10):
+        data_file = tmp_path / f"package_{index}.txt"
+        data_file.write_bytes(f"package {index}".encode() * 1000)
+        data_files.append(data_file)
+    return data_files
+
+
+def requests_text(requests: list[dict]) -> str:
+    return "".join(json.dumps(request) + "\n" for request in requests)
+
+
+def by_id(text: str) -> dict:
+    responses = [json.loads(line) for line in text.splitlines()]
+    return {response["id"]: response for response in responses}
+
+
+def test_serve_stream(data_files: list[Path]):
+    requests = [
+        {"id": index, "op": "hash", "path": str(data_file), "algo": "sha256"}
+        for index, data_file in enumerate(data_files)
+    ]
+    requests.append({"id": "missing", "op": "hash", "path": "no/such/file"})
+    requests.append({"id": "bad", "op": "unknown"})
+    output = io.StringIO()
+    state = asyncio.run(
+        serve_stream(io.StringIO(requests_text(requests) + "\n"), output, jobs=3)
+    )
+    assert state.requests == 12
+    assert state.errors == 2
+    responses = by_id(output.getvalue())
+    for index, data_file in enumerate(data_files):
+        response = responses[index]
+        assert response["ok"]
+        assert response["result"]["file_hash"] == (
+            sha256(data_file.read_bytes()).hexdigest()
+        )
+        assert response["latency_ms"] >= 0
+    assert not responses["missing"]["ok"]
+    assert responses["missing"]["error"].startswith("FileNotFoundError")
+    assert responses["bad"]["error"] == "ValueError: Unknown op 'unknown'."
+
+
+def test_serve_unix_socket(tmp_path: Path, data_files: list[Path]):
+    socket_path = tmp_path / "pbs.sock"
+    ready = threading.Event()
+    server = threading.Thread(
+        target=asyncio.run,
+        args=(serve_unix_socket(socket_path, jobs=2, on_ready=ready.set),),
+    )
+    server.start()
+    assert ready.wait(timeout=5)
+    try:
+        clients = [socket.socket(socket.AF_UNIX), socket.socket(socket.AF_UNIX)]
+        for client in clients:
+            client.connect(str(socket_path))
+        for index, data_file in enumerate(data_files):
+            request = {"id": index, "op": "hash", "path": str(data_file)}
+            clients[index % 2].sendall(requests_text([request]).encode())
+        for client_index, client in enumerate(clients):
+            with client.makefile("r") as responses:
+                for _ in range(len(data_files) // 2):
+                    response = json.loads(responses.readline())
+                    assert response["id"] % 2 == client_index
+                    data_file = data_files[response["id"]]
+                    assert response["result"]["file_hash"] == (
+                        md5(data_file.read_bytes()).hexdigest()
+                    )
+        clients[0].sendall(requests_text([{"id": "stop", "op": "shutdown"}]).encode())
+        with clients[0].makefile("r") as responses:
+            assert json.loads(responses.readline())["id"] == "stop"
+        for client in clients:
+            client.close()
+    finally:
+        server.join(timeout=5)
+    assert not server.is_alive()
+    assert not socket_path.exists()
+
+
+def test_cli_serve(runner: CliRunner, data_files: list[Path]):
+    requests = [{"id": 1, "op": "hash", "path": str(data_files[0])}, {"op": "ping"}]
+    result = runner.invoke(app, ["serve", "-j", "2"], input=requests_text(requests))
+    assert result.exit_code == 0
+    responses = by_id(result.stdout)
+    assert responses[1]["result"]["file_hash"] == (
+        md5(data_files[0].read_bytes()).hexdigest()
+    )
+    assert responses[None]["ok"]
+    assert responses[None]["result"] == {}
+
+
+def test_serve_parse(tmp_path: Path):
+    bid_package = tmp_path / "bid_package.txt"
+    bid_package.write_text(
+        "SEQ 1 OPS 1 BASE BOS EQP 320\nRPT 0600\n"
+        "LEG 1 1 BOS 0700 JFK 0800 320 1:00\nLEG 1 2 JFK 0900 BOS 1000 320 1:00\n"
+        "RLS 1015\nTTL 2:00 2:00 4:15\n"
+    )
+    requests = [
+        {"id": 1, "op": "parse", "path": str(bid_package)},
+        {"id": 2, "op": "parse", "path": str(bid_package), "records": True},
+    ]
+    output = io.StringIO()
+    asyncio.run(serve_stream(io.StringIO(requests_text(requests)), output))
+    responses = by_id(output.getvalue())
+    result = responses[1]["result"]
+    assert (result["pairings"], result["duty_periods"], result["legs"]) == (1, 1, 2)
+    assert "records" not in result
+    assert responses[2]["result"]["records"][0]["number"] == "1"
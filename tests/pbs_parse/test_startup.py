@@ -0,0 +1,69 @@
+"""Check that starting the CLI stays fast, see `python -X importtime`."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import pbs_parse
+from pbs_parse.cli import main_typer
+from pbs_parse.snippets.hash import tree_hash
+
+# Generous, to allow for slow CI machines. A heavy import shows up in
+# HEAVY_MODULES long before it breaks the budget.
+IMPORT_BUDGET_US = 750_000
+HEAVY_MODULES = {
+    "asyncio",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "sqlite3",
+    "pbs_parse.snippets.hash.hash_cache",
+    "pbs_parse.snippets.hash.multi_file_hash",
+    "pbs_parse.snippets.hash.tree_hash",
+    "pbs_parse.snippets.profiling.phase_timer",
+}
+
+
+def import_times(*args: str) -> tuple[dict[str, int], int]:
+    """
+    Run the CLI with `-X importtime`.
+
+    Returns:
+        The cumulative import time of each module, and the total, in us.
+    """
+    src_dir = str(Path(pbs_parse.__file__).parent.parent)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "pbs_parse.cli.main_typer", *args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": src_dir},
+        check=True,
+    )
+    times = {}
+    total = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+        # Nested imports are already part of their parent's time.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return times, total
+
+
+@pytest.mark.parametrize("args", [["--help"], ["hash-md5", __file__]])
+def test_startup_import_budget(args: list[str]):
+    times, total = import_times(*args)
+    assert "pbs_parse.cli" in times
+    assert not HEAVY_MODULES & times.keys()
+    assert total < IMPORT_BUDGET_US
+
+
+def test_copied_constants():
+    assert main_typer.TREE_HASH_NAME == tree_hash.TREE_HASH_NAME
+    assert main_typer.parse_block_size(main_typer.DEFAULT_CHUNK_SIZE) == (
+        tree_hash.DEFAULT_CHUNK_SIZE
+    )
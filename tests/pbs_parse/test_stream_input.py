@@ -0,0 +1,188 @@
+"""Test cases for hashing stdin, and compressed input."""
+
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import zipfile
+from importlib import resources
+from pathlib import Path
+
+import pytest
+from tests.resources import RESOURCES_ANCHOR
+from typer.testing import CliRunner
+
+from pbs_parse.bid_package.parser import (
+    parse_bid_package_file,
+    parse_bid_package_input,
+)
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash.stream_input import (
+    UnsupportedArchiveError,
+    detect_compression,
+    hash_input,
+    open_decompressed,
+)
+
+DATA = b"".join(b"line %d of the stream\n" % index for index in range(20000))
+DATA_MD5 = hashlib.md5(DATA).hexdigest()
+BID_PACKAGE_ANCHOR = "bid_packages_1/bid_package_1.txt"
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+class Unseekable(io.RawIOBase):
+    """A pipe like stream, that can't seek."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        # Short reads, like a pipe.
+        return self._data.readinto(memoryview(buffer)[:1000])
+
+
+class UnseekableWriter(io.RawIOBase):
+    """A pipe like output, that can't seek."""
+
+    def __init__(self, buffer: io.BytesIO):
+        self.buffer = buffer
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        return self.buffer.write(data)
+
+
+def zip_bytes(members: dict[str, bytes], stream: bool, method: int) -> bytes:
+    """Write a zip. A stream writes data descriptors, like `zip -` does."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(
+        UnseekableWriter(buffer) if stream else buffer, "w", method
+    ) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+COMPRESSED = {
+    "gzip": gzip.compress(DATA),
+    "bz2": bz2.compress(DATA),
+    "xz": lzma.compress(DATA),
+    "zip": zip_bytes({"data.txt": DATA}, stream=False, method=zipfile.ZIP_DEFLATED),
+}
+
+
+@pytest.mark.parametrize("compression", list(COMPRESSED))
+def test_hash_input(tmp_path: Path, compression: str):
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(COMPRESSED[compression])
+    assert detect_compression(COMPRESSED[compression]) == compression
+    assert hash_input(file_path, hashlib.md5(), decompress=True) == DATA_MD5
+    assert hash_input(file_path, hashlib.md5()) == (
+        hashlib.md5(COMPRESSED[compression]).hexdigest()
+    )
+    with open_decompressed(Unseekable(COMPRESSED[compression])) as stream:
+        assert stream.read() == DATA
+
+
+def test_uncompressed(tmp_path: Path):
+    assert detect_compression(DATA) is None
+    file_path = tmp_path / "data.txt"
+    file_path.write_bytes(DATA)
+    assert hash_input(file_path, hashlib.md5(), decompress=True) == DATA_MD5
+    with open_decompressed(Unseekable(b"abc")) as stream:
+        assert stream.read() == b"abc"
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("method", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_zip_members(stream: bool, method: int):
+    data = zip_bytes(
+        {"dir/": b"", "first.txt": b"first", "data.txt": DATA}, stream, method
+    )
+    if stream and method == zipfile.ZIP_STORED:
+        # Stored members with data descriptors have no length to stream.
+        with pytest.raises(UnsupportedArchiveError):
+            with open_decompressed(Unseekable(data)) as member:
+                member.read()
+        return
+    for archive in (io.BytesIO(data), Unseekable(data)):
+        with open_decompressed(archive) as member:  # type: ignore[arg-type]
+            assert member.read() == b"first"
+    with open_decompressed(Unseekable(data), member="data.txt") as member:
+        assert member.read() == DATA
+    for archive in (io.BytesIO(data), Unseekable(data)):
+        with pytest.raises(UnsupportedArchiveError):
+            with open_decompressed(archive, member="missing") as member:  # type: ignore[arg-type]
+                member.read()
+
+
+def test_zip_bad_crc():
+    data = bytearray(
+        zip_bytes({"data.txt": DATA}, stream=False, method=zipfile.ZIP_STORED)
+    )
+    data[100] ^= 0xFF
+    with pytest.raises(zipfile.BadZipFile):
+        with open_decompressed(Unseekable(bytes(data))) as member:
+            member.read()
+
+
+def test_parse_bid_package_input(tmp_path: Path):
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    with resources.as_file(file_resource) as bid_package:
+        expected = list(parse_bid_package_file(bid_package))
+        compressed = tmp_path / "bid_package.txt.xz"
+        compressed.write_bytes(lzma.compress(bid_package.read_bytes()))
+    assert list(parse_bid_package_input(compressed)) == expected
+
+
+def test_cli_hash_md5_stdin(runner: CliRunner, tmp_path: Path):
+    result = runner.invoke(app, ["hash-md5", "-"], input=DATA)
+    assert result.exit_code == 0
+    assert result.stdout == f"{DATA_MD5}  -\n"
+    result = runner.invoke(
+        app, ["hash-md5", "--decompress", "-"], input=COMPRESSED["gzip"]
+    )
+    assert result.stdout == f"{DATA_MD5}  -\n"
+    file_path = tmp_path / "data.zip"
+    file_path.write_bytes(COMPRESSED["zip"])
+    result = runner.invoke(app, ["hash-md5", "--decompress", str(file_path)])
+    assert result.stdout == f"{DATA_MD5}  data.zip\n"
+    result = runner.invoke(
+        app, ["hash-md5", "--decompress", "--member", "nope", str(file_path)]
+    )
+    assert result.exit_code == 1
+    assert "no member 'nope'" in result.stderr
+    result = runner.invoke(app, ["hash-md5", "--cache", "-"], input=DATA)
+    assert result.exit_code == 2
+
+
+def test_cli_parse_stdin(runner: CliRunner):
+    file_resource = resources.files(RESOURCES_ANCHOR).joinpath(BID_PACKAGE_ANCHOR)
+    text = file_resource.read_bytes()
+    result = runner.invoke(app, ["parse", "-"], input=gzip.compress(text))
+    assert result.exit_code == 0
+    numbers = [json.loads(line)["number"] for line in result.stdout.splitlines()]
+    assert numbers == ["5012", "5013", "5014", "5015", "5016"]
+    result = runner.invoke(app, ["parse", "-", "-j", "2"], input=text)
+    assert result.exit_code == 2
+
+
+def test_cli_parse_missing(runner: CliRunner, tmp_path: Path):
+    missing = str(tmp_path / "missing.txt.gz")
+    for args in (["parse", missing], ["--profile", "parse", missing]):
+        result = runner.invoke(app, args)
+        assert result.exit_code == 1
+        assert result.stderr.startswith("Error: ")
+        assert "missing.txt.gz" in result.stderr
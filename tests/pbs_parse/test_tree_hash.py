@@ -0,0 +1,244 @@
+"""Test cases for the tree hash, and resumable hashing."""
+
+import json
+import os
+from hashlib import md5
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+from pbs_parse.snippets.hash.file_hash import hash_file_resumable, make_hashed_file
+from pbs_parse.snippets.hash.tree_hash import (
+    TreeHasher,
+    find_corrupt_chunks,
+    hash_file_tree,
+)
+
+CHUNK_SIZE = 1000
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptedTreeHasher(TreeHasher):
+    """Fails after hashing `limit` bytes, like a dropped network mount."""
+
+    def __init__(self, limit: int, **kwargs):
+        super().__init__(**kwargs)
+        self.limit = limit
+        self.updated = 0
+
+    def update(self, data: bytes, /) -> None:
+        if self.updated >= self.limit:
+            raise Interrupted()
+        self.updated += len(data)
+        super().update(data)
+
+
+@pytest.fixture(name="data")
+def data_() -> bytes:
+    return os.urandom(CHUNK_SIZE * 10 + 123)
+
+
+@pytest.mark.parametrize("step", [1, 7, 999, 1000, 1001, 100_000])
+def test_tree_hash_is_independent_of_update_size(data: bytes, step: int) -> None:
+    expected = TreeHasher(data, chunk_size=CHUNK_SIZE).hexdigest()
+    hasher = TreeHasher(chunk_size=CHUNK_SIZE)
+    for start in range(0, len(data), step):
+        hasher.update(data[start : start + step])
+    assert hasher.hexdigest() == expected
+    assert hasher.bytes_hashed == len(data)
+
+
+def test_tree_hash_leaf_count() -> None:
+    assert len(TreeHasher(chunk_size=CHUNK_SIZE).all_leaf_digests()) == 1
+    exact = TreeHasher(b"x" * CHUNK_SIZE * 2, chunk_size=CHUNK_SIZE)
+    assert len(exact.all_leaf_digests()) == 2
+    assert exact.hexdigest() != TreeHasher(b"x" * CHUNK_SIZE * 2).hexdigest()
+
+
+def test_checkpoint_and_restore(data: bytes) -> None:
+    hasher = TreeHasher(data[:4500], chunk_size=CHUNK_SIZE)
+    state = json.loads(json.dumps(hasher.checkpoint()))
+    assert state["offset"] == 4000
+    restored = TreeHasher(chunk_size=CHUNK_SIZE)
+    restored.restore(state)
+    restored.update(data[state["offset"] :])
+    assert restored.hexdigest() == TreeHasher(data, chunk_size=CHUNK_SIZE).hexdigest()
+    with pytest.raises(ValueError):
+        TreeHasher(chunk_size=CHUNK_SIZE * 2).restore(state)
+
+
+def test_resume_after_interruption(tmp_path: Path, data: bytes) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    checkpoint_path = tmp_path / "checkpoints" / "package.json"
+    with pytest.raises(Interrupted):
+        hash_file_resumable(
+            file_path,
+            InterruptedTreeHasher(limit=6000, chunk_size=CHUNK_SIZE),
+            checkpoint_path,
+            block_size=512,
+            checkpoint_interval=0,
+        )
+    assert json.loads(checkpoint_path.read_text())["hasher"]["offset"] > 0
+    resumed = InterruptedTreeHasher(limit=len(data), chunk_size=CHUNK_SIZE)
+    digest = hash_file_resumable(file_path, resumed, checkpoint_path, block_size=512)
+    assert digest == TreeHasher(data, chunk_size=CHUNK_SIZE).hexdigest()
+    assert resumed.updated < len(data)
+    assert not checkpoint_path.exists()
+
+
+def test_changed_file_restarts(tmp_path: Path, data: bytes) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    checkpoint_path = tmp_path / "package.json"
+    with pytest.raises(Interrupted):
+        hash_file_resumable(
+            file_path,
+            InterruptedTreeHasher(limit=6000, chunk_size=CHUNK_SIZE),
+            checkpoint_path,
+            block_size=512,
+            checkpoint_interval=0,
+        )
+    file_path.write_bytes(data[::-1])
+    resumed = InterruptedTreeHasher(limit=len(data), chunk_size=CHUNK_SIZE)
+    digest = hash_file_resumable(file_path, resumed, checkpoint_path)
+    assert digest == TreeHasher(data[::-1], chunk_size=CHUNK_SIZE).hexdigest()
+    assert resumed.updated == len(data)
+
+
+@pytest.mark.parametrize(
+    "hasher_state",
+    [
+        None,
+        [],
+        {"hash_method": "blake2b-tree", "chunk_size": CHUNK_SIZE, "offset": 0},
+        {"hash_method": "blake2b-tree", "chunk_size": CHUNK_SIZE, "leaf_digests": []},
+        {
+            "hash_method": "blake2b-tree",
+            "chunk_size": CHUNK_SIZE,
+            "offset": 1000,
+            "leaf_digests": [7],
+        },
+    ],
+)
+def test_malformed_checkpoint_restarts(
+    tmp_path: Path, data: bytes, hasher_state
+) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    file_stat = file_path.stat()
+    checkpoint_path = tmp_path / "package.json"
+    saved = {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}
+    if hasher_state is not None:
+        saved["hasher"] = hasher_state
+    for checkpoint in (saved, [saved]):
+        checkpoint_path.write_text(json.dumps(checkpoint))
+        hasher = InterruptedTreeHasher(limit=len(data), chunk_size=CHUNK_SIZE)
+        digest = hash_file_resumable(file_path, hasher, checkpoint_path)
+        assert digest == TreeHasher(data, chunk_size=CHUNK_SIZE).hexdigest()
+        assert hasher.updated == len(data)
+
+
+def test_make_hashed_file_needs_resumable_hasher(tmp_path: Path) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(b"data")
+    with pytest.raises(TypeError):
+        make_hashed_file(file_path, md5(), checkpoint_path=tmp_path / "state.json")
+    result = make_hashed_file(
+        file_path, TreeHasher(), checkpoint_path=tmp_path / "state.json"
+    )
+    assert result.hash_method == "blake2b-tree"
+    assert result.file_hash == TreeHasher(b"data").hexdigest()
+
+
+def test_cli_resume(tmp_path: Path) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(b"bid package")
+    checkpoint_dir = tmp_path / "checkpoints"
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "hash",
+            "--algo",
+            "blake2b-tree",
+            "--resume",
+            "--checkpoint-dir",
+            str(checkpoint_dir),
+            str(file_path),
+        ],
+    )
+    assert result.exit_code == 0
+    assert f"{TreeHasher(b'bid package').hexdigest()}  {file_path}" in result.stdout
+    assert list(checkpoint_dir.iterdir()) == []
+    result = runner.invoke(app, ["hash", "--resume", str(file_path)])
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_parallel_tree_hash_matches(tmp_path: Path, data: bytes, jobs: int) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    result = hash_file_tree(file_path, chunk_size=CHUNK_SIZE, jobs=jobs)
+    assert result.file_hash == TreeHasher(data, chunk_size=CHUNK_SIZE).hexdigest()
+    assert len(result.leaf_digests) == 11
+
+
+def test_find_corrupt_chunks(tmp_path: Path, data: bytes) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    expected = hash_file_tree(file_path, chunk_size=CHUNK_SIZE)
+    corrupted = bytearray(data)
+    corrupted[3500] ^= 0xFF
+    corrupted[9999] ^= 0xFF
+    file_path.write_bytes(corrupted)
+    assert find_corrupt_chunks(file_path, expected, jobs=3) == [3, 9]
+    assert find_corrupt_chunks(file_path, expected, indexes=[0, 1, 9]) == [9]
+    file_path.write_bytes(data[: CHUNK_SIZE * 5])
+    assert find_corrupt_chunks(file_path, expected) == [5, 6, 7, 8, 9, 10]
+
+
+def test_cli_tree_hash(tmp_path: Path, data: bytes) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    chunks_path = tmp_path / "chunks.json"
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        ["tree-hash", "-j", "2", "--chunks-out", str(chunks_path), str(file_path)],
+    )
+    assert result.exit_code == 0
+    assert TreeHasher(data).hexdigest() in result.stdout
+    result = runner.invoke(
+        app, ["tree-hash", "--verify", str(chunks_path), str(file_path)]
+    )
+    assert result.exit_code == 0
+    assert "OK" in result.stdout
+    file_path.write_bytes(data[:-1])
+    result = runner.invoke(
+        app, ["tree-hash", "--verify", str(chunks_path), str(file_path)]
+    )
+    assert result.exit_code == 1
+    assert "chunk 0 (bytes 0-10123) FAILED" in result.stdout
+
+
+def test_cli_tree_hash_errors(tmp_path: Path, data: bytes) -> None:
+    file_path = tmp_path / "package.txt"
+    file_path.write_bytes(data)
+    runner = CliRunner()
+    result = runner.invoke(app, ["tree-hash", str(tmp_path / "missing.txt")])
+    assert result.exit_code == 1
+    assert result.stderr.startswith("Error: ")
+    for text in ("not json", '{"file_hash": "abc"}', "[1, 2]"):
+        chunks_path = tmp_path / "chunks.json"
+        chunks_path.write_text(text)
+        result = runner.invoke(
+            app, ["tree-hash", "--verify", str(chunks_path), str(file_path)]
+        )
+        assert result.exit_code == 1
+        assert result.stderr.startswith("Error: ")
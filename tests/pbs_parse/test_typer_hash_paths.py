@@ -0,0 +1,114 @@
+"""Test cases for the hash command."""
+
+from hashlib import md5, sha256
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pbs_parse.cli.main_typer import app
+
+
+@pytest.fixture
+def runner() -> CliRunner:
+    """Fixture for invoking command-line interfaces."""
+    return CliRunner()
+
+
+@pytest.fixture(name="file_tree")
+def file_tree_(tmp_path: Path) -> Path:
+    """A small directory tree of files with known content."""
+    (tmp_path / "sub").mkdir()
+    for index in range(5):
+        (tmp_path / f"file_{index}.txt").write_bytes(b"x" * index * 100_000)
+        (tmp_path / "sub" / f"nested_{index}.dat").write_bytes(bytes([index]) * 10)
+    return tmp_path
+
+
+def expected_lines(paths: list[Path]) -> list[str]:
+    return [f"{md5(path.read_bytes()).hexdigest()}  {path}" for path in paths]
+
+
+@pytest.mark.parametrize("jobs", ["1", "4"])
+def test_hash_directory(runner: CliRunner, file_tree: Path, jobs: str) -> None:
+    result = runner.invoke(app, ["hash", "--jobs", jobs, str(file_tree)])
+    print(result.stdout)
+    assert result.exit_code == 0
+    expected = sorted(file_tree.glob("*.txt")) + sorted(file_tree.glob("sub/*.dat"))
+    assert result.stdout.splitlines() == expected_lines(expected)
+
+
+def test_hash_glob_and_order(runner: CliRunner, file_tree: Path) -> None:
+    last = file_tree / "file_4.txt"
+    result = runner.invoke(
+        app, ["hash", "-j", "3", str(last), str(file_tree / "sub" / "*.dat")]
+    )
+    assert result.exit_code == 0
+    expected = [last] + sorted(file_tree.glob("sub/*.dat"))
+    assert result.stdout.splitlines() == expected_lines(expected)
+
+
+def test_hash_processes(runner: CliRunner, file_tree: Path) -> None:
+    result = runner.invoke(
+        app, ["hash", "-j", "2", "--processes", "--algo", "sha256", str(file_tree)]
+    )
+    assert result.exit_code == 0
+    path = file_tree / "file_3.txt"
+    assert f"{sha256(path.read_bytes()).hexdigest()}  {path}" in result.stdout
+
+
+def test_hash_missing_path(runner: CliRunner, tmp_path: Path) -> None:
+    result = runner.invoke(app, ["hash", str(tmp_path / "missing.txt")])
+    assert result.exit_code == 1
+
+
+def test_hash_bad_algorithm(runner: CliRunner, tmp_path: Path) -> None:
+    result = runner.invoke(app, ["hash", "--algo", "nope", str(tmp_path)])
+    assert result.exit_code == 2
+
+
+def test_hash_block_size_and_read_mode(runner: CliRunner, file_tree: Path) -> None:
+    path = file_tree / "file_4.txt"
+    result = runner.invoke(
+        app, ["hash", "--block-size", "4K", "--read-mode", "mmap", str(path)]
+    )
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == expected_lines([path])
+
+
+def test_hash_benchmark(runner: CliRunner, file_tree: Path) -> None:
+    path = file_tree / "file_4.txt"
+    result = runner.invoke(
+        app,
+        [
+            "hash-benchmark",
+            "--algo",
+            "md5",
+            "--algo",
+            "sha1",
+            "--block-size",
+            "16K",
+            "--block-size",
+            "auto",
+            "--repeat",
+            "1",
+            str(path),
+        ],
+    )
+    print(result.stdout)
+    assert result.exit_code == 0
+    assert len(result.stdout.splitlines()) == 2 + 4
+    assert "sha1" in result.stdout
+
+
+def test_hash_multiple_algorithms(runner: CliRunner, file_tree: Path) -> None:
+    path = file_tree / "file_2.txt"
+    data = path.read_bytes()
+    result = runner.invoke(
+        app, ["hash", "--algo", "md5", "--algo", "sha256", "-j", "2", str(path)]
+    )
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [
+        f"MD5 ({path}) = {md5(data).hexdigest()}",
+        f"SHA256 ({path}) = {sha256(data).hexdigest()}",
+    ]